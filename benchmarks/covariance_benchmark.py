@@ -0,0 +1,98 @@
+"""Benchmark degli stimatori di covarianza al crescere del numero di asset.
+
+Per ogni stimatore registrato misura il tempo (migliore su ``--repeat`` esecuzioni)
+e il picco di memoria allocata (tracemalloc) su rendimenti sintetici generati
+localmente da un modello a fattori.
+
+Uso: python benchmarks/covariance_benchmark.py --assets 10 100 500 2000 --periods 1260
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from model.covariance.estimators import estimate_covariance  # noqa: E402
+
+CONFIGS = {
+    "empirical": {"method": "empirical"},
+    "lw-constant_variance": {
+        "method": "ledoit-wolf",
+        "shrinkage_target": "constant_variance",
+    },
+    "lw-single_factor": {"method": "ledoit-wolf", "shrinkage_target": "single_factor"},
+    "lw-constant_correlation": {
+        "method": "ledoit-wolf",
+        "shrinkage_target": "constant_correlation",
+    },
+    "oas": {"method": "oas"},
+    "ewma": {"method": "ewma"},
+    "factor": {"method": "factor"},
+}
+
+
+def synthetic_returns(n_assets: int, n_periods: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(scale=0.01, size=(n_assets, 5))
+    factors = rng.normal(size=(n_periods, 5))
+    noise = rng.normal(scale=0.01, size=(n_periods, n_assets))
+    return factors @ loadings.T + noise + rng.uniform(0, 1e-3, n_assets)
+
+
+def measure(
+    returns: np.ndarray, config: SimpleNamespace, repeat: int
+) -> tuple[float, float]:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        estimate_covariance(returns, config)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    estimate_covariance(returns, config)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--assets", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000, 2000]
+    )
+    parser.add_argument("--periods", type=int, default=1260)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--estimators", nargs="+", default=list(CONFIGS), choices=list(CONFIGS)
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'estimator':<26}{'assets':>8}{'periods':>9}"
+        f"{'time [ms]':>12}{'peak [MiB]':>12}"
+    )
+    for n_assets in args.assets:
+        returns = synthetic_returns(n_assets, args.periods)
+        for name in args.estimators:
+            config = SimpleNamespace(
+                shrinkage=None,
+                shrinkage_target="constant_variance",
+                halflife=60.0,
+                n_factors=3,
+            )
+            config.__dict__.update(CONFIGS[name])
+            elapsed, peak = measure(returns, config, args.repeat)
+            print(
+                f"{name:<26}{n_assets:>8}{args.periods:>9}"
+                f"{elapsed * 1e3:>12.2f}{peak:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark del tempo di avvio a freddo degli entry point CLI.
+
+Ogni script viene caricato in un nuovo interprete con ``runpy.run_path`` e
+``run_name`` diverso da ``__main__``: si misurano import e codice a livello di
+modulo, non l'esecuzione della pipeline. Il tempo riportato è il migliore su
+``--repeat`` avvii, al netto dell'avvio dell'interprete vuoto. Se uno script
+supera ``--budget`` secondi il processo termina con codice 1.
+
+Uso: python benchmarks/startup_benchmark.py --repeat 5 --budget 0.3 [--importtime 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = ["scripts/main.py", "scripts/run_pipeline.py"]
+LOADER = "import runpy, sys; runpy.run_path(sys.argv[1], run_name='__startup__')"
+
+
+def measure(args: list, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args], cwd=ROOT, check=True, capture_output=True
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slowest_imports(script: str, top: int) -> list:
+    """Moduli con il tempo di import cumulato maggiore (python -X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOADER, script],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line.split("|")
+        rows.append((int(cumulative_us), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.3,
+        help="secondi massimi oltre l'interprete vuoto",
+    )
+    parser.add_argument(
+        "--importtime", type=int, default=0, help="mostra i N import più lenti"
+    )
+    args = parser.parse_args()
+
+    baseline = min(measure(["-c", "pass"], args.repeat))
+    print(f"{'script':<28}{'best':>10}{'median':>10}{'net':>10}")
+    print(f"{'(interprete vuoto)':<28}{baseline:>10.3f}")
+    failed = []
+    for script in args.scripts:
+        timings = measure(["-c", LOADER, script], args.repeat)
+        net = min(timings) - baseline
+        print(
+            f"{script:<28}{min(timings):>10.3f}"
+            f"{statistics.median(timings):>10.3f}{net:>10.3f}"
+        )
+        if net > args.budget:
+            failed.append(script)
+        for cumulative_us, module in (
+            slowest_imports(script, args.importtime) if args.importtime else []
+        ):
+            print(f"    {cumulative_us / 1e6:>8.3f}s {module}")
+
+    if failed:
+        print(f"Budget di avvio ({args.budget:.3f}s) superato: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""Benchmark dell'ottimizzatore, degli stimatori di covarianza e della pipeline dati.
+
+Su rendimenti sintetici generati localmente misura, per ogni combinazione di
+``--assets`` e ``--periods``, il tempo (migliore su ``--repeat`` esecuzioni) e
+il picco di memoria allocata (tracemalloc) delle fasi:
+
+- ``construct``: costruzione di ``MarkowitzOptimizer``;
+- ``covariance/<metodo>``: ``_calculate_covariance`` per ogni stimatore registrato;
+- ``efficient_frontier`` e ``max_sharpe_ratio``;
+- ``cleaner`` e ``validator``: ``DataCleaner`` (caricamento, valori mancanti,
+  outlier, rendimenti) e ``DataValidator`` su prezzi sintetici in CSV;
+- ``cleaning_plan``: pulizia, rendimenti e controlli come ``CleaningPlan`` fuso
+  sui prezzi già caricati.
+
+Le fasi risolte con SLSQP (differenze finite, O(n^3) per iterazione) vengono
+saltate oltre ``--slsqp-limit`` asset. Con ``--save-baseline`` i risultati
+vengono scritti nel file di baseline; altrimenti, se il file esiste, ogni fase
+più lenta (o con picco di memoria maggiore) della baseline oltre ``--tolerance``
+viene segnalata e il processo termina con codice 1. I log fino al livello INFO
+sono disattivati durante le misure (``--verbose`` per mantenerli).
+
+Uso:
+    python benchmarks/suite_benchmark.py --assets 10 100 500 2000 \
+        --periods 252 1260 [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.append(str(ROOT / "src" / "data_pipelines"))
+from covariance_benchmark import synthetic_returns  # noqa: E402
+from model.covariance.estimators import COVARIANCE_ESTIMATORS  # noqa: E402
+from model.efficient_frontier.markowitz_optimizer import (  # noqa: E402
+    MarkowitzOptimizer,
+    ModelConfig,
+)
+from data_cleaner import DataCleaner  # noqa: E402
+from data_validation import DataValidator  # noqa: E402
+
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+# Differenze assolute sotto queste soglie sono rumore di misura, non regressioni
+NOISE_FLOOR = {"seconds": 1e-3, "peak_mib": 0.1}
+
+
+def model_config(
+    returns: pd.DataFrame, solver: str, frontier_method: str, points: int
+) -> ModelConfig:
+    """Vincoli 0 <= w <= 0.1, target tra il rendimento medio e i 10 asset migliori."""
+    mu = np.sort(returns.mean().to_numpy())
+    return ModelConfig(
+        covariance={"method": "ledoit-wolf"},
+        optimization={
+            "min_weight": 0.0,
+            "max_weight": 0.1,
+            "target_return": {
+                "min": float(mu.mean()),
+                "max": float(mu[-10:].mean()),
+                "step": points,
+            },
+            "solver": solver,
+            "frontier_method": frontier_method,
+        },
+        cache={"enabled": False},
+    )
+
+
+def synthetic_prices(returns: pd.DataFrame, data_path: Path) -> None:
+    """Prezzi in CSV (Date, Close) per ticker, nel formato letto da ``DataCleaner``."""
+    prices = 100 * np.exp(returns.cumsum())
+    for ticker in prices.columns:
+        frame = prices[[ticker]].rename(columns={ticker: "Close"})
+        frame.to_csv(data_path / f"{ticker}.csv", index_label="Date")
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "peak_mib": peak / 2**20}
+
+
+def stages(
+    n_assets: int, n_periods: int, args: argparse.Namespace, data_path: Path
+) -> Dict[str, Callable[[], object]]:
+    values = synthetic_returns(n_assets, n_periods)
+    index = pd.bdate_range("2000-01-03", periods=n_periods)
+    returns = pd.DataFrame(
+        values, index=index, columns=[f"A{i:04d}" for i in range(n_assets)]
+    )
+    config = model_config(returns, args.solver, args.frontier_method, args.points)
+    optimizer = MarkowitzOptimizer(returns, config=config)
+    slsqp = n_assets <= args.slsqp_limit
+
+    result = {"construct": lambda: MarkowitzOptimizer(returns, config=config)}
+    for method in COVARIANCE_ESTIMATORS:
+        estimator = MarkowitzOptimizer(returns, config=config)
+        estimator.config = config.model_copy(
+            update={
+                "covariance": config.covariance.model_copy(update={"method": method})
+            }
+        )
+        result[f"covariance/{method}"] = estimator._calculate_covariance
+    if slsqp or args.solver != "slsqp":
+        result["efficient_frontier"] = optimizer.efficient_frontier
+    if slsqp or config.optimization.sharpe_solver != "slsqp":
+        result["max_sharpe_ratio"] = optimizer.max_sharpe_ratio
+
+    synthetic_prices(returns, data_path)
+    tickers = list(returns.columns)
+    cleaner = DataCleaner(data_path, tickers, store_path=data_path / "store")
+
+    def clean() -> pd.DataFrame:
+        stage = DataCleaner(data_path, tickers, store_path=data_path / "store")
+        stage.handle_missing_values()
+        stage.remove_outliers()
+        return stage.compute_returns(log_returns=True)
+
+    def validate() -> Dict[str, bool]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return DataValidator(cleaner.get_clean_data()).validate()
+
+    def plan() -> Dict[str, object]:
+        return (
+            cleaner.plan()
+            .fill()
+            .remove_outliers()
+            .returns(log_returns=True)
+            .validate()
+            .run()
+        )
+
+    result["cleaner"] = clean
+    result["validator"] = validate
+    result["cleaning_plan"] = plan
+    return result
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> list:
+    """Fasi peggiorate rispetto alla baseline oltre la tolleranza relativa."""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, value in current.items():
+            if (
+                value > reference[metric] * (1 + tolerance)
+                and value - reference[metric] > NOISE_FLOOR[metric]
+            ):
+                regressions.append(
+                    f"{key} {metric}: {value:.4g} (baseline {reference[metric]:.4g})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--assets", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--periods", type=int, nargs="+", default=[252, 1260])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--points", type=int, default=10, help="punti della frontiera efficiente"
+    )
+    parser.add_argument(
+        "--solver", default="active-set", choices=["slsqp", "active-set"]
+    )
+    parser.add_argument(
+        "--frontier-method", default="warm-start", choices=["grid", "cla", "warm-start"]
+    )
+    parser.add_argument(
+        "--slsqp-limit",
+        type=int,
+        default=250,
+        help="numero massimo di asset per le fasi SLSQP",
+    )
+    parser.add_argument(
+        "--stages", nargs="+", default=None, help="prefissi delle fasi da eseguire"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="peggioramento relativo ammesso"
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--verbose", action="store_true", help="mantiene i log INFO durante le misure"
+    )
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    results = {}
+    print(
+        f"{'stage':<34}{'assets':>8}{'periods':>9}{'time [ms]':>12}{'peak [MiB]':>12}"
+    )
+    for n_assets in args.assets:
+        for n_periods in args.periods:
+            with tempfile.TemporaryDirectory() as tmp:
+                for name, func in stages(n_assets, n_periods, args, Path(tmp)).items():
+                    if args.stages and not any(
+                        name.startswith(prefix) for prefix in args.stages
+                    ):
+                        continue
+                    measured = measure(func, args.repeat)
+                    results[f"{name}/n={n_assets}/T={n_periods}"] = measured
+                    seconds, peak = measured["seconds"], measured["peak_mib"]
+                    print(
+                        f"{name:<34}{n_assets:>8}{n_periods:>9}"
+                        f"{seconds * 1e3:>12.2f}{peak:>12.1f}"
+                    )
+
+    if args.save_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Baseline salvata in {args.baseline} ({len(results)} misure)")
+        return 0
+    if not args.baseline.exists():
+        print(f"Nessuna baseline in {args.baseline}: confronto saltato")
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.tolerance
+    )
+    if regressions:
+        print(f"Regressioni rispetto alla baseline (tolleranza {args.tolerance:.0%}):")
+        print("\n".join(f"  {line}" for line in regressions))
+        return 1
+    print("Nessuna regressione rispetto alla baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
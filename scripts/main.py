@@ -1,20 +1,34 @@
+import sys
 from pathlib import Path
-import pandas as pd
-import numpy as np
-from src.model.efficient_frontier.markowitz_optimizer import MarkowitzOptimizer
-from src.model.postprocessing.visualizer import Visualizer
-from src.utils.logger import setup_logger
+from typing import TYPE_CHECKING
+
+# I moduli del modello importano relativamente a src/, quelli della pipeline a
+# src/data_pipelines/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src"), str(ROOT / "src" / "data_pipelines")]
+
+from src.utils.logger import setup_logger  # noqa: E402
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = setup_logger(name=__name__)
 
-def calculate_returns(prices: pd.DataFrame) -> pd.DataFrame:
-    return np.log(prices / prices.shift(1)).dropna()
+
+def calculate_returns(prices: "pd.DataFrame") -> "pd.DataFrame":
+    from data_pipelines.feature_engineering import compute_returns
+
+    return compute_returns(prices, log_returns=True)
+
 
 def main():
-    data_path = Path('data/raw')
-    output_dir = Path('results')
+    # Import differiti: pandas, scipy e matplotlib si caricano solo quando si ottimizza
+    from src.model.efficient_frontier.markowitz_optimizer import MarkowitzOptimizer
+    from src.model.postprocessing.visualizer import Visualizer
+
+    output_dir = Path("results")
     output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     try:
         prices = ""
         returns = calculate_returns(prices)
@@ -23,15 +37,18 @@ def main():
 
         visualizer = Visualizer(optimizer)
 
-        visualizer.plot_efficient_frontier(output_path=output_dir / 'efficient_frontier.png')
+        visualizer.plot_efficient_frontier(
+            output_path=output_dir / "efficient_frontier.png"
+        )
 
         sharpes = optimizer.max_sharpe_ratio()
         visualizer.plot_weights_distribution(
-            weights=dict(zip(returns.columns, sharpes['weights'])),
-            output_path=output_dir / 'allocazione_pesi.png'
+            weights=dict(zip(returns.columns, sharpes["weights"])),
+            output_path=output_dir / "allocazione_pesi.png",
         )
     except Exception as e:
         logger.error(f"Errore durante l'esecuzione dello script: {e}")
 
-if __name__ == '__main__':
+
+if __name__ == "__main__":
     main()
@@ -0,0 +1,84 @@
+"""Pulizia, validazione ed export dei prezzi scaricati (``make run``).
+
+Ticker e percorsi predefiniti vengono letti da parameters/data_parameters.yaml.
+
+Uso:
+    python scripts/run_pipeline.py [--tickers AAPL MSFT] [--outlier-threshold 3]
+        [--normalize minmax] [--chunk-rows 100000] [--features-path data/features]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# I moduli della pipeline importano relativamente a src/ e a src/data_pipelines/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src"), str(ROOT / "src" / "data_pipelines")]
+
+from src.utils.helpers import load_config  # noqa: E402
+from src.utils.logger import setup_logger  # noqa: E402
+
+logger = setup_logger(name=__name__)
+
+
+def main() -> int:
+    config = load_config(ROOT / "parameters" / "data_parameters.yaml")
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tickers", nargs="+", default=config["tickers"])
+    parser.add_argument("--input-dir", default=ROOT / config["path_raw"])
+    parser.add_argument("--output-dir", default=ROOT / config["path_processed"])
+    parser.add_argument(
+        "--store-path",
+        default=ROOT / config["path_store"] if config.get("price_store") else None,
+    )
+    parser.add_argument(
+        "--fill-method", default="ffill", choices=["ffill", "bfill", "interpolate"]
+    )
+    parser.add_argument(
+        "--outlier-threshold",
+        type=float,
+        default=3.0,
+        help="soglia dello z-score, 0 = nessuna rimozione",
+    )
+    parser.add_argument("--normalize", default=None, choices=["minmax", "zscore"])
+    parser.add_argument(
+        "--features-path",
+        default=ROOT / config["path_features"] if config.get("features") else None,
+        help="archivio delle feature (aggiornato in coda)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=config.get("chunk_rows", 0),
+        help="righe per blocco dall'archivio, 0 = tutto in memoria",
+    )
+    args = parser.parse_args()
+
+    # Import differito: pandas si carica solo dopo il parsing degli argomenti
+    from data_pipelines.data_pipelines import run_pipeline
+
+    try:
+        report = run_pipeline(
+            tickers=args.tickers,
+            input_dir=args.input_dir,
+            output_dir=args.output_dir,
+            store_path=args.store_path,
+            fill_method=args.fill_method,
+            outlier_threshold=args.outlier_threshold or None,
+            normalize=args.normalize,
+            chunk_rows=args.chunk_rows or None,
+            features_path=args.features_path,
+            feature_windows=config.get("feature_windows", [21, 63]),
+            ewma_spans=config.get("ewma_spans", [21]),
+        )
+    except Exception as e:
+        logger.error(f"Errore durante l'esecuzione della pipeline: {e}")
+        return 1
+    logger.info(f"Controlli di validazione: {report['checks']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Motore di download asincrono con rate limiting e concorrenza limitata.
+
+Ogni ticker viene elaborato da una funzione ticker -> bool che esegue una sola
+richiesta al provider: un'eccezione o False fanno ripetere il tentativo. Le
+funzioni sincrone girano in un thread (``asyncio.to_thread``), le coroutine
+direttamente nel loop. Il motore applica:
+
+- un token bucket globale (``rate`` richieste al secondo, raffiche fino a ``burst``);
+- al più ``concurrency`` ticker in corso contemporaneamente;
+- un timeout per tentativo;
+- ``max_retries`` tentativi con backoff esponenziale e jitter completo.
+
+Con funzioni sincrone il timeout interrompe l'attesa ma non il thread, che
+termina in background: il risultato di un tentativo scaduto viene ignorato, ma
+i suoi effetti collaterali (file scritti) vanno serializzati dalla funzione.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Union
+import numpy as np
+
+ProcessFunction = Callable[[str], Union[bool, Awaitable[bool]]]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Il rate limit deve essere positivo")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Attende finché è disponibile un token e lo consuma."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random) -> float:
+    """Backoff esponenziale, jitter uniforme in [0, min(cap, base * 2^attempt)]."""
+    return rng.uniform(0, min(cap, base * 2**attempt))
+
+
+class AsyncFetchEngine:
+    def __init__(
+        self,
+        process: ProcessFunction,
+        concurrency: int = 5,
+        rate: float = 2.0,
+        burst: Optional[float] = None,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        seed: Optional[int] = None,
+    ):
+        self.process = process
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._rng = random.Random(seed)
+
+    async def _call(self, ticker: str) -> bool:
+        if asyncio.iscoroutinefunction(self.process):
+            return bool(await self.process(ticker))
+        return bool(await asyncio.to_thread(self.process, ticker))
+
+    async def _fetch(
+        self, ticker: str, bucket: TokenBucket, semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        report = {"success": False, "attempts": 0, "latency": np.nan, "error": None}
+        async with semaphore:
+            for attempt in range(self.max_retries):
+                await bucket.acquire()
+                report["attempts"] = attempt + 1
+                call_start = time.perf_counter()
+                try:
+                    report["success"] = await asyncio.wait_for(
+                        self._call(ticker), self.timeout
+                    )
+                    report["error"] = None if report["success"] else "failed"
+                except asyncio.TimeoutError:
+                    report["error"] = "timeout"
+                except Exception as e:
+                    report["error"] = str(e)
+                report["latency"] = time.perf_counter() - call_start
+                if report["success"]:
+                    break
+                if attempt + 1 < self.max_retries:
+                    await asyncio.sleep(
+                        backoff_delay(
+                            attempt, self.backoff, self.max_backoff, self._rng
+                        )
+                    )
+        report["elapsed"] = time.perf_counter() - start
+        return report
+
+    async def run_async(self, tickers: Sequence[str]) -> Dict[str, Any]:
+        bucket = TokenBucket(self.rate, self.burst)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        reports = await asyncio.gather(
+            *(self._fetch(ticker, bucket, semaphore) for ticker in tickers)
+        )
+        elapsed = time.perf_counter() - start
+        latency = np.array([r["latency"] for r in reports], dtype=float)
+        succeeded = sum(r["success"] for r in reports)
+        return {
+            "tickers": dict(zip(tickers, reports)),
+            "succeeded": succeeded,
+            "elapsed": elapsed,
+            "throughput": succeeded / elapsed if elapsed > 0 else np.nan,
+            "latency_p50": (
+                float(np.nanpercentile(latency, 50))
+                if np.isfinite(latency).any()
+                else np.nan
+            ),
+            "latency_p95": (
+                float(np.nanpercentile(latency, 95))
+                if np.isfinite(latency).any()
+                else np.nan
+            ),
+        }
+
+    def run(self, tickers: Sequence[str]) -> Dict[str, Any]:
+        """Elabora tutti i ticker: report per ticker, throughput e latenze."""
+        return asyncio.run(self.run_async(tickers))
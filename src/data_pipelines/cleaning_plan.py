@@ -0,0 +1,216 @@
+"""Piano lazy di pulizia e validazione della matrice dei prezzi.
+
+``CleaningPlan`` registra i passi richiesti senza eseguirli; ``run`` li fonde in
+al più tre passaggi per colonna su un'unica copia float64 dei prezzi (in ordine
+Fortran, quindi con colonne contigue):
+
+1. ``fill``: conteggio e riempimento dei valori mancanti, maschera delle righe
+   ancora incomplete (eliminate come con ``dropna``);
+2. ``remove_outliers``: media e deviazione standard sulle righe complete e
+   maschera |x - media| < threshold * std, cioè lo z-score senza materializzarlo;
+3. compattazione in place delle righe mantenute, statistiche di validazione sui
+   prezzi puliti e trasformazione finale (``normalize`` o ``returns``).
+
+I passi vengono applicati sempre in quest'ordine, qualunque sia l'ordine di
+registrazione; registrare due volte lo stesso passo (o sia ``normalize`` sia
+``returns``) mantiene l'ultima richiesta. Le temporanee hanno la dimensione di
+una colonna, quindi la memoria resta vicina a una copia dei dati. I controlli di
+``validate`` si applicano ai prezzi puliti, prima della trasformazione finale.
+"""
+
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from data_validation import CHECKS, evaluate_checks
+
+FILL_METHODS = ["ffill", "bfill", "interpolate"]
+NORMALIZE_METHODS = ["minmax", "zscore"]
+
+
+def _fill_column(column: np.ndarray, missing: np.ndarray, method: str) -> None:
+    """Riempie in place i valori mancanti di una colonna (semantica di pandas)."""
+    positions = np.arange(column.shape[0])
+    if method == "ffill":
+        source = np.maximum.accumulate(np.where(missing, 0, positions))
+    elif method == "bfill":
+        source = np.minimum.accumulate(
+            np.where(missing, positions[-1], positions)[::-1]
+        )[::-1]
+    else:
+        valid = np.flatnonzero(~missing)
+        if valid.size == 0:
+            return
+        gaps = np.flatnonzero(missing)
+        filled = np.interp(gaps, valid, column[valid])
+        # Come DataFrame.interpolate(): i valori mancanti iniziali restano tali
+        filled[gaps < valid[0]] = np.nan
+        column[gaps] = filled
+        return
+    column[:] = column[source]
+
+
+class CleaningPlan:
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices
+        self._fill: Optional[str] = None
+        self._threshold: Optional[float] = None
+        self._transform: Optional[tuple] = None
+        self._checks: Optional[Dict[str, Any]] = None
+
+    def fill(self, method: str = "ffill") -> "CleaningPlan":
+        """Riempimento dei valori mancanti; le righe incomplete vengono eliminate."""
+        if method not in FILL_METHODS:
+            raise ValueError("Method must be 'ffill', 'bfill', or 'interpolate'.")
+        self._fill = method
+        return self
+
+    def remove_outliers(self, threshold: float = 3.0) -> "CleaningPlan":
+        """Eliminazione delle righe con almeno uno z-score di modulo >= threshold."""
+        if threshold <= 0:
+            raise ValueError("La soglia degli outlier deve essere positiva")
+        self._threshold = threshold
+        return self
+
+    def normalize(self, method: str = "minmax") -> "CleaningPlan":
+        if method not in NORMALIZE_METHODS:
+            raise ValueError("Method must be 'minmax' or 'zscore'.")
+        self._transform = ("normalize", method)
+        return self
+
+    def returns(self, log_returns: bool = False) -> "CleaningPlan":
+        self._transform = ("returns", log_returns)
+        return self
+
+    def validate(
+        self,
+        checks: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> "CleaningPlan":
+        if checks is not None and set(checks) - set(CHECKS):
+            raise ValueError(
+                "Controlli di validazione non validi: "
+                f"{sorted(set(checks) - set(CHECKS))}"
+            )
+        self._checks = {
+            "checks": checks,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        return self
+
+    @property
+    def steps(self) -> List[str]:
+        """Passi registrati, nell'ordine in cui vengono eseguiti."""
+        steps = []
+        if self._fill is not None:
+            steps.append(f"fill({self._fill})")
+        if self._threshold is not None:
+            steps.append(f"remove_outliers({self._threshold})")
+        if self._transform is not None:
+            steps.append(f"{self._transform[0]}({self._transform[1]})")
+        if self._checks is not None:
+            steps.append("validate")
+        return steps
+
+    def run(self) -> Dict[str, Any]:
+        """Esegue il piano: restituisce ``data`` (DataFrame pulito) e ``report``."""
+        values = np.array(
+            self.prices.to_numpy(dtype=float, copy=False),
+            dtype=float,
+            order="F",
+            copy=True,
+        )
+        n_rows, n_columns = values.shape
+        keep = np.ones(n_rows, dtype=bool)
+        missing = np.zeros(n_columns, dtype=np.int64)
+        passes = 0
+
+        if self._fill is not None:
+            passes += 1
+            for j in range(n_columns):
+                column = values[:, j]
+                gaps = np.isnan(column)
+                missing[j] = np.count_nonzero(gaps)
+                if missing[j]:
+                    _fill_column(column, gaps, self._fill)
+                    keep &= ~np.isnan(column)
+        incomplete = int(n_rows - np.count_nonzero(keep))
+
+        outliers = 0
+        if self._threshold is not None:
+            passes += 1
+            complete = keep.copy()
+            for j in range(n_columns):
+                column = values[:, j]
+                mean = np.mean(column, where=complete)
+                std = np.std(column, ddof=1, where=complete)
+                if std > 0:
+                    # Confronti con NaN falsi: le righe incomplete vengono eliminate
+                    # come con gli z-score
+                    keep &= np.abs(column - mean) < self._threshold * std
+                else:
+                    keep &= ~np.isnan(column)
+            outliers = int(np.count_nonzero(complete) - np.count_nonzero(keep))
+
+        n_kept = int(np.count_nonzero(keep))
+        compact = n_kept < n_rows
+        statistics = {"missing": 0, "negatives": 0}
+        if compact or self._transform is not None or self._checks is not None:
+            passes += 1
+            rows = np.flatnonzero(keep) if compact else None
+            for j in range(n_columns):
+                column = values[:, j]
+                if compact:
+                    column[:n_kept] = column[rows]
+                column = column[:n_kept]
+                statistics["missing"] += int(np.count_nonzero(np.isnan(column)))
+                statistics["negatives"] += int(np.count_nonzero(column < 0))
+                self._apply_transform(column)
+
+        index = self.prices.index[keep] if compact else self.prices.index
+        report = {
+            "steps": self.steps,
+            "passes": passes,
+            "rows_in": n_rows,
+            "rows_out": n_kept,
+            "columns": n_columns,
+            "missing_values": dict(zip(self.prices.columns, missing.tolist())),
+            "incomplete_rows": incomplete,
+            "outlier_rows": outliers,
+            "checks": {},
+            "errors": [],
+        }
+        if self._checks is not None:
+            outcome = evaluate_checks(index, statistics, **self._checks)
+            report["checks"] = outcome["results"]
+            report["errors"] = outcome["errors"]
+        report["valid"] = not report["errors"]
+
+        data = values[:n_kept]
+        if self._transform is not None and self._transform[0] == "returns":
+            data, index = data[:-1], index[1:]
+        return {
+            "data": pd.DataFrame(
+                data, index=index, columns=self.prices.columns, copy=False
+            ),
+            "report": report,
+        }
+
+    def _apply_transform(self, column: np.ndarray) -> None:
+        """Trasformazione finale in place di una colonna compattata (come pandas)."""
+        if self._transform is None or column.size == 0:
+            return
+        kind, option = self._transform
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if kind == "returns":
+                ratio = column[1:] / column[:-1]
+                column[:-1] = np.log(ratio) if option else ratio - 1.0
+            elif option == "minmax":
+                low, high = np.nanmin(column), np.nanmax(column)
+                column -= low
+                column /= high - low
+            else:
+                mean, std = np.nanmean(column), np.nanstd(column, ddof=1)
+                column -= mean
+                column /= std
@@ -1,199 +1,702 @@
-from typing import Any, Dict, List, Optional
-import retry
-import yfinance as yf
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+import threading
+from functools import partial
+from retry.api import retry_call
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 from concurrent.futures import ThreadPoolExecutor
-import logging
-from pydantic import BaseModel, HttpUrl, field_validator
-from datetime import datetime
-from requests.exceptions import RequestException
+from pydantic import BaseModel, field_validator
+from src.data_pipelines.async_fetcher import AsyncFetchEngine
+from src.data_pipelines.price_store import PriceStore
 from src.utils.helpers import load_config
 from src.utils.logger import setup_logger
 
 # Configurazione logger
 logger = setup_logger(name=__name__)
 
+
 class DataConfig(BaseModel):
     tickers: list[str]
     start_date: str
     end_date: str
-    interval: str = '1d'
+    interval: str = "1d"
     auto_adjust: bool = True
     threads: int = 5
     max_retries: int = 3
     backoff: int = 2
-    path_raw: Path = Path('data/raw')
-    fields: list[str] = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
-    format: str = 'csv'
+    path_raw: Path = Path("data/raw")
+    path_store: Path = Path("data/store")
+    price_store: bool = True
+    fields: list[str] = ["Date", "Open", "High", "Low", "Close", "Volume"]
+    format: str = "csv"
     strict_validation: bool = True
+    incremental: bool = False
+    engine: str = "threads"
+    rate_limit: float = 2.0
+    burst: Optional[float] = None
+    timeout: float = 30.0
+    batch_size: int = 0
 
-    @field_validator('start_date', 'end_date')
+    @field_validator("engine")
+    @classmethod
+    def validate_engine(cls, value: str) -> str:
+        if value not in ["threads", "async"]:
+            raise ValueError(f"Motore di download non valido: {value}")
+        return value
+
+    @field_validator("start_date", "end_date")
     @classmethod
     def validate_dates(cls, value: str) -> str:
         try:
-            datetime.strptime(value, '%Y-%m-%d')
+            datetime.strptime(value, "%Y-%m-%d")
             return value
         except ValueError:
             raise ValueError(f"Formato data non valido: {value}. Usare 'YYYY-MM-DD'")
 
-# Caricamento e validazione configurazione
-config = load_config('parameters/data_parameters.yaml')
-params = DataConfig(**config)
 
-@retry.retry(tries=params.max_retries, delay=params.backoff, logger=logger)
-def fetch_data(ticker: str) -> Optional[pd.DataFrame]:
-    """Fetch dati storici con gestione errori avanzata"""
-    try:
-        logger.info(f"Downloading data for {ticker}...")
-        
-        data = yf.download(
-            tickers=ticker,
-            start=params.start_date,
-            end=params.end_date,
-            interval=params.interval,
-            progress=False,
-            auto_adjust=params.auto_adjust,
-            group_by='ticker'  # Modifica cruciale
-        )
+class LazyConfig:
+    """Configurazione caricata e validata al primo accesso, non all'import del modulo"""
 
-        # Gestione MultiIndex
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(1)  # Prendi il nome del ticker
-        else:
-            data.columns = [f"{col}_{ticker}" for col in data.columns]
-
-        # Reset e pulizia
-        data = data.reset_index()
-        data.columns = data.columns.str.title()
-        
-        # Aggiungi colonna ticker
-        data['Ticker'] = ticker
-        
-        # Rinomina colonne chiave
-        data = data.rename(columns={
-            f'Open_{ticker}': 'Open',
-            f'High_{ticker}': 'High',
-            f'Low_{ticker}': 'Low',
-            f'Close_{ticker}': 'Close',
-            f'Volume_{ticker}': 'Volume'
-        })[params.fields + ['Ticker']]
-
-        # Validazione tipi dati
-        data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        data[numeric_cols] = data[numeric_cols].apply(pd.to_numeric, errors='coerce')
-        
-        return data.dropna()
+    def __init__(self, config_path: str):
+        object.__setattr__(self, "_config_path", config_path)
+        object.__setattr__(self, "_config", None)
+
+    def _load(self) -> DataConfig:
+        if self._config is None:
+            object.__setattr__(
+                self, "_config", DataConfig(**load_config(self._config_path))
+            )
+        return self._config
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._load(), name, value)
+
+
+# Caricamento e validazione configurazione (differiti)
+params = LazyConfig("parameters/data_parameters.yaml")
+
+
+def _download(
+    downloader: Optional[Callable[..., pd.DataFrame]],
+    tries: Optional[int] = None,
+    **kwargs: Any,
+) -> pd.DataFrame:
+    """Richiesta al provider con retry; yfinance viene importato solo se serve.
 
+    ``tries`` (per default ``params.max_retries``) vale 1 quando i tentativi
+    sono gestiti dal chiamante, come nel motore asincrono.
+    """
+    if downloader is None:
+        import yfinance as yf
+
+        downloader = yf.download
+    return retry_call(
+        downloader,
+        fkwargs=kwargs,
+        tries=params.max_retries if tries is None else tries,
+        delay=params.backoff,
+        logger=logger,
+    )
+
+
+# Manifest della copertura per ticker nella cartella dei dati grezzi
+MANIFEST_FILE = "manifest.json"
+
+
+def fetch_data(
+    ticker: str,
+    start: Optional[str] = None,
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+) -> Optional[pd.DataFrame]:
+    """Fetch dati storici con gestione errori avanzata.
+
+    ``start`` sostituisce ``params.start_date`` (download incrementale);
+    ``downloader`` sostituisce ``yf.download`` (stessa firma).
+    """
+    try:
+        return download_ticker(ticker, start=start, downloader=downloader)
     except Exception as e:
         logger.error(f"Errore su {ticker}: {str(e)}")
         return None
-    
+
+
+def download_ticker(
+    ticker: str,
+    start: Optional[str] = None,
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+    tries: Optional[int] = None,
+) -> pd.DataFrame:
+    """Come ``fetch_data``, ma gli errori del provider vengono propagati"""
+    logger.info(f"Downloading data for {ticker}...")
+
+    data = _download(
+        downloader,
+        tries=tries,
+        tickers=ticker,
+        start=start or params.start_date,
+        end=params.end_date,
+        interval=params.interval,
+        progress=False,
+        auto_adjust=params.auto_adjust,
+        group_by="ticker",  # Modifica cruciale
+    )
+
+    # Nessuna riga nell'intervallo (es. aggiornamento incrementale senza nuove date)
+    if data.empty:
+        return pd.DataFrame(columns=params.fields + ["Ticker"])
+
+    # Gestione MultiIndex
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(1)  # Prendi il nome del ticker
+    else:
+        data.columns = [f"{col}_{ticker}" for col in data.columns]
+
+    # Reset e pulizia
+    data = data.reset_index()
+    data.columns = data.columns.str.title()
+
+    # Aggiungi colonna ticker
+    data["Ticker"] = ticker
+
+    # Rinomina colonne chiave
+    data = data.rename(
+        columns={
+            f"Open_{ticker}": "Open",
+            f"High_{ticker}": "High",
+            f"Low_{ticker}": "Low",
+            f"Close_{ticker}": "Close",
+            f"Volume_{ticker}": "Volume",
+        }
+    )[params.fields + ["Ticker"]]
+
+    # Validazione tipi dati
+    data["Date"] = pd.to_datetime(data["Date"], errors="coerce")
+    numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
+    data[numeric_cols] = data[numeric_cols].apply(pd.to_numeric, errors="coerce")
+
+    return data.dropna()
+
+
 def validate_data(data: pd.DataFrame) -> bool:
     """Validazione dati"""
     required_columns = {
-        'Date': 'datetime64[ns]',
-        'Open': 'float64',
-        'High': 'float64',
-        'Low': 'float64',
-        'Close': 'float64',
-        'Volume': 'int64',
-        'Ticker': 'object'
+        "Date": "datetime64[ns]",
+        "Open": "float64",
+        "High": "float64",
+        "Low": "float64",
+        "Close": "float64",
+        "Volume": "int64",
+        "Ticker": "object",
     }
 
     if not all(col in data.columns for col in required_columns.keys()):
         logger.error("Missing columns in data")
         return False
-    
+
     for col, dtype in required_columns.items():
         if not np.issubdtype(data[col].dtype, np.dtype(dtype)):
             logger.error(f"Invalid dtype for column {col}")
             return False
-    
+
     return True
 
+
+def _replace_file(output_file: Path, write: Callable[[Path], None]) -> None:
+    """Scrive su un file temporaneo nella stessa cartella e lo sostituisce."""
+    tmp = output_file.with_name(f".{output_file.name}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, output_file)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def save_data_parquet(data: pd.DataFrame, ticker: str) -> bool:
     """Salva i dati in formato parquet con compressione"""
     try:
         params.path_raw.mkdir(parents=True, exist_ok=True)
         output_file = params.path_raw / f"{ticker}.parquet"
-        
-        data.to_parquet(
+
+        _replace_file(
             output_file,
-            engine='pyarrow',
-            compression='snappy',
-            index=False
+            lambda path: data.to_parquet(
+                path, engine="pyarrow", compression="snappy", index=False
+            ),
         )
-        
+
         logger.info(f"Data saved successfully for {ticker}")
         return True
     except Exception as e:
         logger.error(f"Error saving {ticker}: {str(e)}")
         return False
-    
+
+
 def save_data_csv(data: pd.DataFrame, ticker: str) -> bool:
     """Salva i dati in formato CSV"""
     try:
         params.path_raw.mkdir(parents=True, exist_ok=True)
         output_file = params.path_raw / f"{ticker}.csv"
-        
+
         # Formattazione per le date
-        data['Date'] = data['Date'].dt.strftime('%Y-%m-%d')
+        data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
 
-        data.to_csv(
+        _replace_file(
             output_file,
-            index=False,
-            encoding='utf-8',
-            date_format='%Y-%m-%d'
+            lambda path: data.to_csv(
+                path, index=False, encoding="utf-8", date_format="%Y-%m-%d"
+            ),
         )
-        
+
         logger.info(f"Data saved successfully for {ticker}")
         return True
     except Exception as e:
         logger.error(f"Error saving {ticker}: {str(e)}")
         return False
 
-def process_ticker(ticker: str) -> bool:
-    """Pipeline completa per un singolo ticker"""
-    try:
-        data = fetch_data(ticker)
 
+def file_checksum(path: Path) -> str:
+    """SHA-256 del file, letto a blocchi"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    """Copertura e checksum dei file per ticker salvati"""
+    path = params.path_raw / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]]) -> None:
+    params.path_raw.mkdir(parents=True, exist_ok=True)
+    _replace_file(
+        params.path_raw / MANIFEST_FILE,
+        lambda path: path.write_text(json.dumps(manifest, indent=2, sort_keys=True)),
+    )
+
+
+def load_stored_data(
+    ticker: str, manifest: Dict[str, Dict[str, Any]]
+) -> Optional[pd.DataFrame]:
+    """Dati già salvati per il ticker, solo se coerenti con il checksum del manifest"""
+    entry = manifest.get(ticker)
+    output_file = params.path_raw / f"{ticker}.{params.format}"
+    if (
+        entry is None
+        or entry.get("format") != params.format
+        or not output_file.exists()
+    ):
+        return None
+    if file_checksum(output_file) != entry["sha256"]:
+        logger.warning(f"Checksum non valido per {ticker}: download completo")
+        return None
+    if params.format == "parquet":
+        return pd.read_parquet(output_file)
+    return pd.read_csv(output_file, parse_dates=["Date"])
+
+
+def coverage_entry(data: pd.DataFrame, ticker: str) -> Dict[str, Any]:
+    dates = pd.to_datetime(data["Date"])
+    return {
+        "format": params.format,
+        "first_date": dates.min().strftime("%Y-%m-%d"),
+        "last_date": dates.max().strftime("%Y-%m-%d"),
+        "rows": int(len(data)),
+        "sha256": file_checksum(params.path_raw / f"{ticker}.{params.format}"),
+    }
+
+
+def resume_point(
+    ticker: str, manifest: Optional[Dict[str, Dict[str, Any]]]
+) -> tuple[Optional[pd.DataFrame], Optional[str]]:
+    """Dati salvati e data da cui riprendere il download (None = intervallo completo)"""
+    stored = (
+        load_stored_data(ticker, manifest)
+        if params.incremental and manifest is not None
+        else None
+    )
+    if stored is None:
+        return None, None
+    return stored, (
+        pd.Timestamp(manifest[ticker]["last_date"]) + pd.Timedelta(days=1)
+    ).strftime("%Y-%m-%d")
+
+
+def save_ticker(
+    ticker: str,
+    data: pd.DataFrame,
+    stored: Optional[pd.DataFrame],
+    frames: Optional[Dict[str, pd.DataFrame]],
+    manifest: Optional[Dict[str, Dict[str, Any]]],
+) -> bool:
+    """Unisce i nuovi dati a quelli salvati e aggiorna file, manifest e frames"""
+    if stored is not None and data.empty:
+        logger.info(f"Nessun nuovo dato per {ticker}")
+        return True
+    # save_data_csv converte le date in stringhe
+    snapshot = data.copy() if frames is not None else None
+    if stored is not None:
+        logger.info(f"{ticker}: {len(data)} nuove righe")
+        data = (
+            pd.concat([stored, data], ignore_index=True)
+            .drop_duplicates(subset="Date", keep="last")
+            .sort_values("Date", ignore_index=True)
+        )
+    merged = data.copy() if manifest is not None else None
+
+    if params.format == "csv":
+        saved = save_data_csv(data, ticker)
+    elif params.format == "parquet":
+        saved = save_data_parquet(data, ticker)
+    else:
+        logger.error(f"Invalid format: {params.format}")
+        return False
+
+    if saved and frames is not None:
+        frames[ticker] = snapshot
+    if saved and manifest is not None:
+        manifest[ticker] = coverage_entry(merged, ticker)
+    return saved
+
+
+def process_ticker(
+    ticker: str,
+    frames: Optional[Dict[str, pd.DataFrame]] = None,
+    manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+) -> bool:
+    """Pipeline completa per un singolo ticker.
+
+    Se ``frames`` è indicato, i dati scaricati vi vengono registrati per il
+    consolidamento nell'archivio colonnare. Con ``params.incremental`` e un
+    ``manifest`` viene scaricata solo la coda successiva all'ultima data
+    salvata, unita ai dati esistenti; il manifest viene aggiornato in place.
+    """
+    try:
+        data, stored = download_update(ticker, manifest, downloader)
         if data is None:
-            return False
-        
-        if params.strict_validation and not validate_data(data):
-            logger.error(f"Data validation failed for {ticker}")
-            return False
-        
-        # Conversione 
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        data[numeric_cols] = data[numeric_cols].apply(pd.to_numeric)
-
-        if params.format == 'csv':
-            return save_data_csv(data, ticker)
-        elif params.format == 'parquet':
-            return save_data_parquet(data, ticker)
-        else:
-            logger.error(f"Invalid format: {params.format}")
-            return False
-    
+            return True
+        return save_ticker(ticker, data, stored, frames, manifest)
+
     except Exception as e:
         logger.error(f"Error processing {ticker}: {str(e)}")
         return False
 
 
-def main():
+def download_update(
+    ticker: str,
+    manifest: Optional[Dict[str, Dict[str, Any]]],
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+    tries: Optional[int] = None,
+) -> tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Nuovi dati validati del ticker e dati salvati con cui unirli.
+
+    I nuovi dati sono None se il ticker è già aggiornato. Errori del provider
+    e validazione fallita sollevano un'eccezione.
+    """
+    stored, start = resume_point(ticker, manifest)
+    if start is not None and start >= params.end_date:
+        logger.info(f"{ticker} già aggiornato al {manifest[ticker]['last_date']}")
+        return None, stored
+
+    data = download_ticker(ticker, start=start, downloader=downloader, tries=tries)
+    if params.strict_validation and not data.empty and not validate_data(data):
+        raise ValueError(f"Data validation failed for {ticker}")
+
+    # Conversione
+    numeric_cols = ["Open", "High", "Low", "Close", "Volume"]
+    data[numeric_cols] = data[numeric_cols].apply(pd.to_numeric)
+    return data, stored
+
+
+def reshape_batch(data: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    """Risultato multi-ticker (ticker x campo) in formato lungo Date/campi/Ticker.
+
+    Una sola ``stack`` sul livello dei ticker e una conversione di tipo
+    dell'intero blocco, senza cicli né ``apply`` per colonna.
+    """
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    # Il livello dei ticker dipende da group_by: si riconosce dai valori
+    level = 0 if set(data.columns.get_level_values(0)) <= set(tickers) else 1
+    long = data.stack(level=level, future_stack=True)
+    long.index.names = ["Date", "Ticker"]
+    long.columns = long.columns.str.title()
+    long = long.reset_index()
+
+    # Le righe dei ticker senza quotazione in una data sono tutte NaN
+    long["Date"] = pd.to_datetime(long["Date"], errors="coerce")
+    long = long.dropna(subset=params.fields)[params.fields + ["Ticker"]]
+    dtypes = {
+        f: np.int64 if f == "Volume" else np.float64
+        for f in params.fields
+        if f != "Date"
+    }
+    return long.astype(dtypes).reset_index(drop=True)
+
+
+def fetch_batch(
+    tickers: List[str],
+    start: Optional[str] = None,
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+) -> Optional[pd.DataFrame]:
+    """Fetch di un gruppo di ticker con una richiesta al provider (formato lungo)"""
+    try:
+        logger.info(f"Downloading batch of {len(tickers)} tickers...")
+        data = _download(
+            downloader,
+            tickers=tickers,
+            start=start or params.start_date,
+            end=params.end_date,
+            interval=params.interval,
+            progress=False,
+            auto_adjust=params.auto_adjust,
+            group_by="ticker",
+        )
+        if data.empty:
+            return pd.DataFrame(columns=params.fields + ["Ticker"])
+        return reshape_batch(data, tickers)
+
+    except Exception as e:
+        logger.error(f"Errore sul batch {tickers[0]}..{tickers[-1]}: {str(e)}")
+        return None
+
+
+def process_batch(
+    tickers: List[str],
+    frames: Optional[Dict[str, pd.DataFrame]] = None,
+    manifest: Optional[Dict[str, Dict[str, Any]]] = None,
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+) -> List[bool]:
+    """Pipeline per un gruppo di ticker: una richiesta, poi suddivisione per ticker.
+
+    In modalità incrementale il batch parte dalla data di ripresa più vecchia;
+    le righe già salvate vengono deduplicate nell'unione.
+    """
+    resume = {ticker: resume_point(ticker, manifest) for ticker in tickers}
+    pending = [
+        t for t in tickers if resume[t][1] is None or resume[t][1] < params.end_date
+    ]
+    results = {t: True for t in tickers}
+    if not pending:
+        return [True] * len(tickers)
+    starts = [resume[t][1] for t in pending]
+    start = None if any(s is None for s in starts) else min(starts)
+
+    data = fetch_batch(pending, start=start, downloader=downloader)
+    if data is None:
+        return [t not in pending for t in tickers]
+    if params.strict_validation and not data.empty and not validate_data(data):
+        logger.error(f"Data validation failed for batch {pending[0]}..{pending[-1]}")
+        return [t not in pending for t in tickers]
+
+    received = set(data["Ticker"].unique())
+    for ticker in pending:
+        if ticker not in received and resume[ticker][0] is None:
+            logger.error(f"Nessun dato per {ticker}")
+            results[ticker] = False
+    stored = {
+        t: resume[t][0] for t in pending if results[t] and resume[t][0] is not None
+    }
+    try:
+        results.update(save_batch(data, stored, frames, manifest))
+    except Exception as e:
+        logger.error(
+            f"Errore nel salvataggio del batch {pending[0]}..{pending[-1]}: {str(e)}"
+        )
+        results.update({t: False for t in pending})
+    return [results[t] for t in tickers]
+
+
+def save_batch(
+    data: pd.DataFrame,
+    stored: Dict[str, pd.DataFrame],
+    frames: Optional[Dict[str, pd.DataFrame]],
+    manifest: Optional[Dict[str, Dict[str, Any]]],
+) -> Dict[str, bool]:
+    """Salva un batch in formato lungo: unione, ordinamento e conversione una volta.
+
+    I dati salvati (``stored``) e quelli nuovi vengono uniti e deduplicati come
+    un unico blocco; il blocco viene convertito una volta (tabella Arrow o date
+    in stringa per il CSV) e ogni file del ticker ne è una fetta contigua. Il
+    formato resta un file per ticker, letto da ``DataLoader`` e dal manifest.
+    """
+    received = set(data["Ticker"])
+    if params.format not in ("csv", "parquet"):
+        logger.error(f"Invalid format: {params.format}")
+        return {t: False for t in received | stored.keys()}
+    results = {t: True for t in stored}
+    if frames is not None:
+        frames.update(
+            {
+                t: group.reset_index(drop=True)
+                for t, group in data.groupby("Ticker", sort=False)
+            }
+        )
+    for ticker in stored.keys() - received:
+        logger.info(f"Nessun nuovo dato per {ticker}")
+
+    updated = [frame.assign(Ticker=t) for t, frame in stored.items() if t in received]
+    merged = (
+        pd.concat([*updated, data], ignore_index=True)
+        .drop_duplicates(subset=["Ticker", "Date"], keep="last")
+        .sort_values(["Ticker", "Date"], ignore_index=True)
+    )
+    names, starts = np.unique(merged["Ticker"].to_numpy(dtype=str), return_index=True)
+    bounds = zip(names, starts, [*starts[1:], len(merged)])
+
+    params.path_raw.mkdir(parents=True, exist_ok=True)
+    if params.format == "parquet":
+        import pyarrow.parquet as pq
+        from pyarrow import Table
+
+        table = Table.from_pandas(merged, preserve_index=False)
+
+        def write(path: Path, start: int, stop: int) -> None:
+            pq.write_table(table.slice(start, stop - start), path, compression="snappy")
+
+    else:
+        text = merged.assign(Date=merged["Date"].dt.strftime("%Y-%m-%d"))
+
+        def write(path: Path, start: int, stop: int) -> None:
+            text.iloc[start:stop].to_csv(path, index=False, encoding="utf-8")
+
+    for ticker, start, stop in bounds:
+        ticker = str(ticker)
+        try:
+            _replace_file(
+                params.path_raw / f"{ticker}.{params.format}",
+                lambda path: write(path, start, stop),
+            )
+            if manifest is not None:
+                manifest[ticker] = coverage_entry(merged.iloc[start:stop], ticker)
+            results[ticker] = True
+        except Exception as e:
+            logger.error(f"Error saving {ticker}: {str(e)}")
+            results[ticker] = False
+    logger.info(f"Batch salvato: {len(names)} ticker, {len(merged)} righe")
+    return results
+
+
+def build_price_store(
+    frames: Dict[str, pd.DataFrame], incremental: bool = False
+) -> bool:
+    """Consolida i dati scaricati nell'archivio colonnare (incrementale)"""
+    try:
+        store = PriceStore(params.path_store)
+        if incremental:
+            store.update(frames)
+        else:
+            store.write(frames, params.fields)
+        logger.info(
+            f"Archivio dei prezzi aggiornato in {params.path_store} ({len(frames)} "
+            "ticker)"
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Errore nella scrittura dell'archivio dei prezzi: {str(e)}")
+        return False
+
+
+def run_async_engine(
+    frames: Optional[Dict[str, pd.DataFrame]],
+    manifest: Dict[str, Dict[str, Any]],
+    downloader: Optional[Callable[..., pd.DataFrame]] = None,
+) -> List[bool]:
+    """Download con il motore asincrono (rate limit, timeout e backoff con jitter).
+
+    Ogni tentativo del motore è una sola richiesta al provider e ne propaga gli
+    errori, così retry e backoff passano dal token bucket. Un tentativo scaduto
+    continua nel suo thread: il salvataggio è serializzato per ticker e il
+    risultato di un tentativo superato da uno successivo viene scartato.
+    """
+    locks = {ticker: threading.Lock() for ticker in params.tickers}
+    attempts: Dict[str, int] = {}
+
+    def process(ticker: str) -> bool:
+        with locks[ticker]:
+            attempt = attempts[ticker] = attempts.get(ticker, 0) + 1
+        data, stored = download_update(ticker, manifest, downloader, tries=1)
+        with locks[ticker]:
+            if attempts[ticker] != attempt:
+                logger.warning(f"{ticker}: risultato del tentativo {attempt} scartato")
+                return False
+            if data is None:
+                return True
+            return save_ticker(ticker, data, stored, frames, manifest)
+
+    engine = AsyncFetchEngine(
+        process,
+        concurrency=params.threads,
+        rate=params.rate_limit,
+        burst=params.burst,
+        timeout=params.timeout,
+        max_retries=params.max_retries,
+        backoff=params.backoff,
+    )
+    report = engine.run(params.tickers)
+    for ticker, entry in report["tickers"].items():
+        logger.info(
+            f"{ticker}: success={entry['success']} attempts={entry['attempts']} "
+            f"latency={entry['latency']:.3f}s"
+        )
+    logger.info(
+        f"Throughput: {report['throughput']:.2f} ticker/s, "
+        f"latenza p50 {report['latency_p50']:.3f}s, p95 {report['latency_p95']:.3f}s"
+    )
+    return [entry["success"] for entry in report["tickers"].values()]
+
+
+def main(downloader: Optional[Callable[..., pd.DataFrame]] = None):
     """Esecuzione parallela con ThreadPool"""
     logger.info("Starting data pipeline...")
-    
-    with ThreadPoolExecutor(max_workers=params.threads) as executor:
-        results = executor.map(process_ticker, params.tickers)
-    
+    frames: Optional[Dict[str, pd.DataFrame]] = {} if params.price_store else None
+    manifest = load_manifest()
+    process = partial(
+        process_ticker, frames=frames, manifest=manifest, downloader=downloader
+    )
+
+    if params.batch_size > 0:
+        batches = [
+            params.tickers[i : i + params.batch_size]
+            for i in range(0, len(params.tickers), params.batch_size)
+        ]
+        process_group = partial(
+            process_batch, frames=frames, manifest=manifest, downloader=downloader
+        )
+        with ThreadPoolExecutor(max_workers=params.threads) as executor:
+            results = [
+                ok for batch in executor.map(process_group, batches) for ok in batch
+            ]
+    elif params.engine == "async":
+        results = run_async_engine(frames, manifest, downloader)
+    else:
+        with ThreadPoolExecutor(max_workers=params.threads) as executor:
+            results = list(executor.map(process, params.tickers))
+
     success_rate = sum(results) / len(params.tickers)
     logger.info(f"Pipeline completed. Success rate: {success_rate:.2%}")
+    save_manifest(manifest)
+
+    if frames:
+        build_price_store(
+            frames,
+            incremental=params.incremental and PriceStore(params.path_store).exists(),
+        )
+
 
-if __name__ == '__main__':
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
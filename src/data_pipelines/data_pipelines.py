@@ -1,28 +1,47 @@
 import pandas as pd
 import pathlib as pa
-from typing import List, Dict, Optional
-from logging import logger
-from data_cleaner import DataCleaner
-from data_validation import DataValidator
+from typing import Any, List, Dict, Optional
+from cleaning_plan import CleaningPlan
+from feature_engineering import FeatureEngineer
+from price_store import PriceStore, default_store_path
+from streaming import stream_clean
 from utils.logger import setup_logger
 
-setup_logger(name=__name__)
+logger = setup_logger(name=__name__)
+
 
 # 1. Data Loader (già visto)
-class DataLoader: # Carica i dati storici di azioni 
-    def __init__(self, data_path: str, tickers: List[str]):
+class DataLoader:  # Carica i dati storici di azioni
+    def __init__(
+        self, data_path: str, tickers: List[str], store_path: Optional[str] = None
+    ):
         self.data_path = pa.Path(data_path)
         self.tickers = tickers
+        self.store = PriceStore(
+            store_path if store_path is not None else default_store_path(self.data_path)
+        )
 
-    def load(self) -> pd.DataFrame: # Per ogni ticker cerca il file CSV corrispondente
+    def load(
+        self,
+    ) -> (
+        pd.DataFrame
+    ):  # Legge dall'archivio colonnare se presente, altrimenti un CSV per ticker
+        if self.store.exists():
+            tickers = [t for t in self.tickers if t in self.store.tickers]
+            for ticker in set(self.tickers) - set(tickers):
+                logger.warning(f"Ticker {ticker} non presente nell'archivio!")
+            logger.info(
+                f"Caricamento di {len(tickers)} ticker dall'archivio {self.store.root}"
+            )
+            return self.store.read("Close", tickers).ffill().dropna()
         dfs = []
         for ticker in self.tickers:
             try:
                 df = pd.read_csv(
                     self.data_path / f"{ticker}.csv",
-                    parse_dates=['Date'],
-                    usecols=['Date', 'Close'],
-                    index_col='Date'
+                    parse_dates=["Date"],
+                    usecols=["Date", "Close"],
+                    index_col="Date",
                 )
                 df.columns = [ticker]
                 dfs.append(df)
@@ -44,34 +63,172 @@ class DataExporter:
         df.to_parquet(path)
         logger.info(f"Dati esportati in {path}")
 
+
 # 5. Pipeline Coordinata
-def run_pipeline(tickers: List[str], input_dir: str, output_dir: str):
-    """Esegue: Caricamento → Pulizia → Validazione → Export."""
+def run_pipeline(
+    tickers: List[str],
+    input_dir: str,
+    output_dir: str,
+    store_path: Optional[str] = None,
+    fill_method: str = "ffill",
+    outlier_threshold: Optional[float] = 3.0,
+    normalize: Optional[str] = None,
+    checks: Optional[List[str]] = None,
+    chunk_rows: Optional[int] = None,
+    features_path: Optional[str] = None,
+    feature_windows: List[int] = (21, 63),
+    ewma_spans: List[int] = (21,),
+) -> Dict[str, Any]:
+    """Esegue: Caricamento → Pulizia e validazione (piano fuso) → Export → Feature.
+
+    ``normalize`` ('minmax' o 'zscore') è facoltativo: i prezzi esportati vengono
+    usati per calcolare i rendimenti. Con ``chunk_rows`` l'archivio dei prezzi
+    viene elaborato a blocchi (``stream_clean``) e vengono esportati anche i
+    rendimenti. Con ``features_path`` le feature di rendimento e di rischio
+    (``FeatureEngineer``) vengono aggiornate in coda con le nuove date.
+    Restituisce il report della pulizia.
+    """
+    if chunk_rows:
+        report = _run_streaming(
+            tickers,
+            input_dir,
+            output_dir,
+            store_path,
+            fill_method,
+            outlier_threshold,
+            normalize,
+            checks,
+            chunk_rows,
+        )
+        if features_path is not None:
+            store = PriceStore(
+                store_path if store_path is not None else default_store_path(input_dir)
+            )
+            report["features"] = _update_features(
+                features_path, feature_windows, ewma_spans, store, tickers
+            )
+        return report
+
     # Step 1: Load
-    loader = DataCleaner._load_data(input_dir, tickers)
+    loader = DataLoader(input_dir, tickers, store_path)
     data = loader.load()
 
-    # Step 2: Clean
-    cleaned_data = (
-        DataCleaner(data)
-        .remove_outliers(threshold=3.0) # Rimozione outliers
-        .normalize(method='minmax') #oppure Z-score
-        .get_data()
+    # Step 2-3: Clean + Validate, registrati nel piano ed eseguiti
+    # in pochi passaggi sui prezzi
+    plan = CleaningPlan(data).fill(fill_method)
+    if outlier_threshold is not None:
+        plan.remove_outliers(threshold=outlier_threshold)
+    if normalize is not None:
+        plan.normalize(method=normalize)
+    result = plan.validate(checks).run()
+    report = result["report"]
+    logger.info(
+        f"Pulizia completata in {report['passes']} passaggi: "
+        f"{report['rows_out']}/{report['rows_in']} righe mantenute "
+        f"({report['incomplete_rows']} incomplete, {report['outlier_rows']} con "
+        "outlier)"
     )
-
-    # Step 3: Validate, verifica l'integrità dei dati puliti
-    validator = DataValidator(cleaned_data)
-    if not validator.run_checks():
-        raise ValueError("Validazione fallita. Interrompo la pipeline.")
+    if not report["valid"]:
+        raise ValueError(
+            f"Validazione fallita ({' '.join(report['errors'])}). Interrompo la "
+            "pipeline."
+        )
 
     # Step 4: Export, caricamento dei dati (puliti)
     output_path = pa.Path(output_dir) / "cleaned_stocks.parquet"
-    DataExporter.to_parquet(cleaned_data, output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    DataExporter.to_parquet(result["data"], output_path)
+
+    # Step 5: Feature dai prezzi non filtrati, solo per le date non ancora elaborate
+    if features_path is not None:
+        report["features"] = _update_features(
+            features_path, feature_windows, ewma_spans, loader.store, tickers, data
+        )
+    return report
+
+
+def _update_features(
+    features_path: str,
+    windows: List[int],
+    spans: List[int],
+    store: PriceStore,
+    tickers: List[str],
+    data: Optional[pd.DataFrame] = None,
+) -> Dict[str, Any]:
+    """Aggiorna l'archivio delle feature dai prezzi (o da ``data``)."""
+    engineer = FeatureEngineer(features_path, windows=windows, spans=spans)
+    if store.exists():
+        result = engineer.update_from_store(
+            store, tickers=[t for t in tickers if t in store.tickers]
+        )
+    else:
+        result = engineer.update(data)
+    mode = "ricalcolate" if result["mode"] == "full" else "aggiornate"
+    logger.info(
+        f"Feature {mode} in {features_path}: {result['rows']} nuove date, "
+        f"{len(result['fields'])} campi"
+    )
+    return result
+
+
+def _run_streaming(
+    tickers: List[str],
+    input_dir: str,
+    output_dir: str,
+    store_path: Optional[str],
+    fill_method: str,
+    outlier_threshold: Optional[float],
+    normalize: Optional[str],
+    checks: Optional[List[str]],
+    chunk_rows: int,
+) -> Dict[str, Any]:
+    """Pulizia ed export a blocchi: la memoria dipende da ``chunk_rows``."""
+    if fill_method != "ffill" or normalize is not None:
+        raise ValueError(
+            "La modalità a blocchi supporta solo il forward-fill, senza normalizzazione"
+        )
+    store = PriceStore(
+        store_path if store_path is not None else default_store_path(input_dir)
+    )
+    if not store.exists():
+        raise ValueError(
+            f"La modalità a blocchi richiede l'archivio dei prezzi: {store.root} non "
+            "trovato"
+        )
+    available = [t for t in tickers if t in store.tickers]
+    for ticker in set(tickers) - set(available):
+        logger.warning(f"Ticker {ticker} non presente nell'archivio!")
+    output_path = pa.Path(output_dir) / "cleaned_stocks.parquet"
+    returns_path = pa.Path(output_dir) / "cleaned_returns.parquet"
+    report = stream_clean(
+        store,
+        output_path=output_path,
+        returns_path=returns_path,
+        tickers=available,
+        chunk_rows=chunk_rows,
+        outlier_threshold=outlier_threshold,
+        checks=checks,
+    )
+    logger.info(
+        f"Pulizia a blocchi completata ({report['chunks']} blocchi da {chunk_rows} "
+        f"righe, {report['passes']} passaggi): "
+        f"{report['rows_out']}/{report['rows_in']} righe mantenute"
+    )
+    if not report["valid"]:
+        output_path.unlink(missing_ok=True)
+        returns_path.unlink(missing_ok=True)
+        raise ValueError(
+            f"Validazione fallita ({' '.join(report['errors'])}). Interrompo la "
+            "pipeline."
+        )
+    logger.info(f"Dati esportati in {output_path} e {returns_path}")
+    return report
+
 
 # Esecuzione
 if __name__ == "__main__":
     run_pipeline(
-        tickers=['AAPL', 'GOOGL', 'MSFT'],
+        tickers=["AAPL", "GOOGL", "MSFT"],
         input_dir="../data/raw",
-        output_dir="../data/processed"
-    )
\ No newline at end of file
+        output_dir="../data/processed",
+    )
@@ -1,11 +1,77 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
-from data_cleaner import DataCleaner
+from typing import Any, Dict, List, Optional
+
+CHECKS = ["missing", "duplicates", "negative_prices", "date_range"]
+DEFAULT_CHECKS = ["missing", "duplicates", "negative_prices"]
+
+
+def price_statistics(values: np.ndarray) -> Dict[str, int]:
+    """Valori nulli e prezzi negativi contati colonna per colonna."""
+    missing = negatives = 0
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        missing += int(np.count_nonzero(np.isnan(column)))
+        negatives += int(np.count_nonzero(column < 0))
+    return {"missing": missing, "negatives": negatives}
+
+
+def evaluate_checks(
+    index: Optional[pd.Index],
+    statistics: Dict[str, Any],
+    checks: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Esito dei controlli dall'indice e da statistiche già calcolate.
+
+    Le statistiche sono quelle di ``price_statistics``.
+
+    Senza indice (elaborazione a blocchi) date duplicate e copertura vengono lette
+    da ``statistics['duplicates']``, ``statistics['first']`` e ``statistics['last']``.
+    """
+    checks = DEFAULT_CHECKS if checks is None else checks
+    unknown = set(checks) - set(CHECKS)
+    if unknown:
+        raise ValueError(f"Controlli di validazione non validi: {sorted(unknown)}")
+    results, errors = {}, []
+    if "missing" in checks:
+        results["missing_values"] = statistics["missing"] == 0
+        if not results["missing_values"]:
+            errors.append("ERRORE: Sono presenti valori nulli nel DataFrame.")
+    if "duplicates" in checks:
+        results["duplicate_dates"] = not (
+            index.duplicated().any() if index is not None else statistics["duplicates"]
+        )
+        if not results["duplicate_dates"]:
+            errors.append("ERRORE: Date duplicate nell'indice.")
+    if "negative_prices" in checks:
+        results["negative_prices"] = statistics["negatives"] == 0
+        if not results["negative_prices"]:
+            errors.append("ERRORE: Prezzi negativi rilevati.")
+    if "date_range" in checks:
+        if start_date is None or end_date is None:
+            raise ValueError("Il controllo date_range richiede start_date e end_date")
+        if index is not None:
+            first, last = (index.min(), index.max()) if len(index) else (None, None)
+        else:
+            first, last = statistics.get("first"), statistics.get("last")
+        results["date_range"] = (
+            first is not None
+            and first <= pd.to_datetime(start_date)
+            and last >= pd.to_datetime(end_date)
+        )
+        if not results["date_range"]:
+            errors.append(
+                f"ERRORE: Dati mancanti per l'intervallo {start_date} - {end_date}."
+            )
+    return {"results": results, "errors": errors}
+
 
 class DataValidator:
     def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+        # Solo lettura: nessuna copia del DataFrame
+        self.df = df
         self.errors = []
 
     def check_missing_values(self) -> bool:
@@ -31,39 +97,46 @@ class DataValidator:
 
     def check_date_range(self, start_date: str, end_date: str) -> bool:
         """Verifica se il DataFrame copre l'intervallo di date richiesto."""
-        if self.df.index.min() > pd.to_datetime(start_date) or self.df.index.max() < pd.to_datetime(end_date):
-            self.errors.append(f"ERRORE: Dati mancanti per l'intervallo {start_date} - {end_date}.")
+        if self.df.index.min() > pd.to_datetime(
+            start_date
+        ) or self.df.index.max() < pd.to_datetime(end_date):
+            self.errors.append(
+                f"ERRORE: Dati mancanti per l'intervallo {start_date} - {end_date}."
+            )
             return False
         return True
 
-    def validate(self, checks: Optional[List[str]] = None) -> Dict[str, bool]:
-        """Esegue tutti i controlli e restituisce un report."""
-        if checks is None:
-            checks = ['missing', 'duplicates', 'negative_prices']
-
-        results = {}
-        if 'missing' in checks:
-            results['missing_values'] = self.check_missing_values()
-        if 'duplicates' in checks:
-            results['duplicate_dates'] = self.check_duplicate_dates()
-        if 'negative_prices' in checks:
-            results['negative_prices'] = self.check_negative_prices()
-        if 'date_range' in checks:
-            results['date_range'] = self.check_date_range()
-        
+    def validate(
+        self,
+        checks: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Dict[str, bool]:
+        """Esegue tutti i controlli in un solo passaggio e restituisce un report."""
+        values = self.df.to_numpy(dtype=float, copy=False)
+        outcome = evaluate_checks(
+            self.df.index, price_statistics(values), checks, start_date, end_date
+        )
+        self.errors.extend(outcome["errors"])
+
         if self.errors:
             print("\n".join(self.errors))
         else:
             print("Tutti i controlli superati.")
-        
-        return results
 
+        return outcome["results"]
+
+
+if __name__ == "__main__":
+    from data_cleaner import DataCleaner
 
-cleaner = DataCleaner(data_path='../data/raw', tickers=['AAPL', 'GOOGL', 'MSFT'])
-cleaned_data = cleaner.get_clean_data()
+    cleaner = DataCleaner(data_path="../data/raw", tickers=["AAPL", "GOOGL", "MSFT"])
+    cleaned_data = cleaner.get_clean_data()
 
-validator = DataValidator(cleaned_data)
-validation_report = validator.validate(checks=['missing', 'duplicates', 'negative_prices'])
+    validator = DataValidator(cleaned_data)
+    validation_report = validator.validate(
+        checks=["missing", "duplicates", "negative_prices"]
+    )
 
-print("\nReport di validazione:")
-print(validation_report)
\ No newline at end of file
+    print("\nReport di validazione:")
+    print(validation_report)
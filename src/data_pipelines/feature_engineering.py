@@ -0,0 +1,397 @@
+"""Feature di rendimento e di rischio in un archivio colonnare aggiornato in coda.
+
+``FeatureEngineer`` calcola in forma vettoriale, sui prezzi con forward-fill:
+
+- ``returns`` e ``log_returns`` (finestra 1);
+- ``volatility``: deviazione standard mobile dei rendimenti (ddof=1);
+- ``correlation``: correlazione mobile di ogni ticker con il mercato (media
+  equipesata dei rendimenti disponibili) o con il ticker ``benchmark``;
+- ``ewma_mean`` e ``ewma_volatility``: media e volatilità esponenziali con
+  ``alpha = 2 / (span + 1)`` (ricorsione di ``ewm(adjust=False)``, varianza
+  ``bias=True``), la finestra è lo span.
+
+Le finestre mobili usano somme cumulate, calcolate una volta per tutte le
+finestre, quindi costano O(date x ticker) per qualunque finestra; sono NaN
+finché la finestra non è piena. I rendimenti di base di volatilità,
+correlazioni e momenti esponenziali sono semplici o logaritmici
+(``log_returns``).
+
+Ogni feature è un campo ``{feature}_{finestra}`` di un ``PriceStore`` (matrice
+date x ticker), quindi la chiave è (ticker, feature, finestra). ``update``
+elabora solo le date successive all'ultima salvata e le aggiunge in coda
+all'archivio: lo stato necessario (ultimo prezzo e momenti esponenziali per
+ticker) è nel manifest, le code delle finestre mobili sono gli ultimi
+rendimenti salvati.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from price_store import PriceStore
+from streaming import forward_fill
+
+FEATURES = [
+    "returns",
+    "log_returns",
+    "volatility",
+    "correlation",
+    "ewma_mean",
+    "ewma_volatility",
+]
+
+
+def feature_name(feature: str, window: int) -> str:
+    """Nome del campo dell'archivio per la coppia (feature, finestra)."""
+    if feature not in FEATURES:
+        raise ValueError(f"Feature non valida: {feature}. Valori ammessi: {FEATURES}")
+    return f"{feature}_{window}"
+
+
+def compute_returns(prices: pd.DataFrame, log_returns: bool = False) -> pd.DataFrame:
+    """Rendimenti semplici o logaritmici, senza le righe con valori mancanti."""
+    values = prices.to_numpy(dtype=float, copy=False)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = values[1:] / values[:-1]
+        returns = np.log(ratio) if log_returns else ratio - 1.0
+    return pd.DataFrame(
+        returns, index=prices.index[1:], columns=prices.columns, copy=False
+    ).dropna()
+
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """Somme cumulate per colonna, con una riga iniziale di zeri (colonne contigue)."""
+    out = np.zeros((values.shape[0] + 1,) + values.shape[1:], order="F")
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _windowed(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Somme mobili di ``window`` righe, NaN nelle prime ``window - 1``."""
+    out = np.full((cumulative.shape[0] - 1,) + cumulative.shape[1:], np.nan, order="F")
+    if out.shape[0] >= window:
+        np.subtract(cumulative[window:], cumulative[:-window], out=out[window - 1 :])
+    return out
+
+
+def _cancellation(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """Errore di arrotondamento delle somme mobili di una somma cumulata crescente."""
+    out = np.zeros((cumulative.shape[0] - 1,) + cumulative.shape[1:], order="F")
+    if out.shape[0] >= window:
+        out[window - 1 :] = 16 * np.finfo(float).eps * cumulative[window:]
+    return out
+
+
+def _centered(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Valori meno la media di colonna, zero dove non validi."""
+    counts = valid.sum(axis=0)
+    mean = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    return np.where(valid, values - mean, 0.0)
+
+
+def rolling_statistics(
+    returns: np.ndarray, market: np.ndarray, windows: Sequence[int]
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """Volatilità (ddof=1) e correlazione con ``market`` mobili per ogni finestra.
+
+    Le somme cumulate si calcolano una volta per tutte le finestre; il
+    risultato è NaN se la finestra contiene valori mancanti e la correlazione
+    anche se una delle due serie è costante.
+    """
+    returns = np.asfortranarray(returns)
+    valid = np.isfinite(returns)
+    market_valid = np.isfinite(market)
+    x = _centered(returns, valid)
+    m = _centered(market, market_valid)[:, None]
+    cumulative = {
+        "count": _cumulative(valid.astype(float)),
+        "x": _cumulative(x),
+        "xx": _cumulative(x * x),
+        "xm": _cumulative(x * m),
+        "market_count": _cumulative(market_valid.astype(float))[:, None],
+        "m": _cumulative(m),
+        "mm": _cumulative(m * m),
+    }
+    statistics = {}
+    for window in windows:
+        sums = {key: _windowed(c, window) for key, c in cumulative.items()}
+        complete = sums["count"] == window
+        sx, sm = sums["x"], sums["m"]
+        var_x = sums["xx"] - sx * sx / window
+        var_m = sums["mm"] - sm * sm / window
+        # Su finestre costanti la differenza delle somme cumulate lascia solo
+        # l'errore di arrotondamento: la varianza è nulla e la correlazione NaN
+        var_x[var_x <= _cancellation(cumulative["xx"], window)] = 0.0
+        var_m[var_m <= _cancellation(cumulative["mm"], window)] = 0.0
+        cov = sums["xm"] - sx * sm / window
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = np.clip(cov / np.sqrt(var_x * var_m), -1.0, 1.0)
+        statistics[window] = {
+            "volatility": np.where(complete, np.sqrt(var_x / (window - 1)), np.nan),
+            "correlation": np.where(
+                complete & (sums["market_count"] == window) & (var_x > 0) & (var_m > 0),
+                correlation,
+                np.nan,
+            ),
+        }
+    return statistics
+
+
+def ewma_moments(
+    returns: np.ndarray, span: int, mean: np.ndarray, variance: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Media e varianza esponenziali per colonna dallo stato (``mean``, ``variance``).
+
+    Stato NaN: la colonna non è ancora iniziata e parte dal primo rendimento
+    valido. ``mean`` e ``variance`` vengono aggiornati in place con l'ultimo
+    valore, così un blocco successivo prosegue la stessa ricorsione.
+    """
+    alpha = 2.0 / (span + 1.0)
+    out_mean = np.full(returns.shape, np.nan)
+    out_variance = np.full(returns.shape, np.nan)
+    for j in range(returns.shape[1]):
+        column = returns[:, j]
+        begin = 0
+        if np.isnan(mean[j]):
+            valid = np.flatnonzero(np.isfinite(column))
+            if valid.size == 0:
+                continue
+            begin = valid[0]
+            mean[j], variance[j] = column[begin], 0.0
+        x = column[begin:]
+        if x.size == 0:
+            continue
+        # m_t = (1 - alpha) m_{t-1} + alpha x_t
+        m = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * mean[j]])[0]
+        # v_t = (1 - alpha) (v_{t-1} + alpha (x_t - m_{t-1})^2)
+        previous = np.concatenate(([mean[j]], m[:-1]))
+        v = lfilter(
+            [alpha * (1.0 - alpha)],
+            [1.0, alpha - 1.0],
+            (x - previous) ** 2,
+            zi=[(1.0 - alpha) * variance[j]],
+        )[0]
+        out_mean[begin:, j], out_variance[begin:, j] = m, v
+        mean[j], variance[j] = m[-1], v[-1]
+    return out_mean, out_variance
+
+
+class FeatureEngineer:
+    def __init__(
+        self,
+        root: str,
+        windows: Sequence[int] = (21, 63),
+        spans: Sequence[int] = (21,),
+        log_returns: bool = False,
+        benchmark: Optional[str] = None,
+    ):
+        if any(w < 2 for w in windows) or any(s < 1 for s in spans):
+            raise ValueError(
+                "Le finestre mobili devono avere almeno 2 righe e gli span essere "
+                "positivi"
+            )
+        self.store = PriceStore(root)
+        self.windows = sorted(set(int(w) for w in windows))
+        self.spans = sorted(set(int(s) for s in spans))
+        self.log_returns = log_returns
+        self.benchmark = benchmark
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return {
+            "windows": self.windows,
+            "spans": self.spans,
+            "log_returns": self.log_returns,
+            "benchmark": self.benchmark,
+        }
+
+    @property
+    def fields(self) -> List[str]:
+        """Campi calcolati, nell'ordine in cui vengono salvati."""
+        fields = [feature_name("returns", 1), feature_name("log_returns", 1)]
+        for window in self.windows:
+            fields += [
+                feature_name("volatility", window),
+                feature_name("correlation", window),
+            ]
+        for span in self.spans:
+            fields += [
+                feature_name("ewma_mean", span),
+                feature_name("ewma_volatility", span),
+            ]
+        return fields
+
+    def compute(self, prices: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Tutte le feature sull'intera storia dei prezzi, senza archivio."""
+        arrays, _ = self._compute(
+            prices, self._initial_state(list(prices.columns)), tail=None
+        )
+        return {
+            name: pd.DataFrame(
+                values, index=prices.index, columns=prices.columns, copy=False
+            )
+            for name, values in arrays.items()
+        }
+
+    def build(self, prices: pd.DataFrame) -> Dict[str, Any]:
+        """Ricalcola tutte le feature e sostituisce l'archivio."""
+        tickers = list(prices.columns)
+        arrays, state = self._compute(prices, self._initial_state(tickers), tail=None)
+        self.store.write_arrays(
+            prices.index.to_numpy(dtype="datetime64[ns]"),
+            tickers,
+            arrays,
+            {"config": self.config, "state": state},
+        )
+        return {
+            "mode": "full",
+            "rows": len(prices),
+            "dates": len(prices),
+            "tickers": tickers,
+            "fields": list(arrays),
+        }
+
+    def update(self, prices: pd.DataFrame) -> Dict[str, Any]:
+        """Aggiunge le feature delle date successive all'ultima salvata.
+
+        Ricalcola tutto (``build``) se l'archivio manca o è stato creato con
+        ticker o parametri diversi; in quel caso ``prices`` deve contenere
+        l'intera storia.
+        """
+        if not prices.index.is_monotonic_increasing:
+            raise ValueError("L'indice dei prezzi deve essere ordinato per data")
+        tickers = list(prices.columns)
+        if (
+            not self.store.exists()
+            or self.store.tickers != tickers
+            or self.store.metadata.get("config") != self.config
+        ):
+            return self.build(prices)
+        last = self.store.dates[-1]
+        new = prices[prices.index > last]
+        if new.empty:
+            return {
+                "mode": "incremental",
+                "rows": 0,
+                "dates": len(self.store.dates),
+                "tickers": tickers,
+                "fields": self.store.fields,
+            }
+        tail_rows = max(self.windows, default=1) - 1
+        basis = feature_name("log_returns" if self.log_returns else "returns", 1)
+        tail = (
+            np.asarray(
+                self.store.array(basis)[max(len(self.store.dates) - tail_rows, 0) :]
+            )
+            if tail_rows
+            else None
+        )
+        arrays, state = self._compute(new, self.store.metadata["state"], tail)
+        self.store.append(
+            new.index.to_numpy(dtype="datetime64[ns]"),
+            arrays,
+            {"config": self.config, "state": state},
+        )
+        return {
+            "mode": "incremental",
+            "rows": len(new),
+            "dates": len(self.store.dates),
+            "tickers": tickers,
+            "fields": list(arrays),
+        }
+
+    def update_from_store(
+        self,
+        prices: PriceStore,
+        field: str = "Close",
+        tickers: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Come ``update``, leggendo solo le date non ancora elaborate."""
+        tickers = list(tickers) if tickers is not None else prices.tickers
+        start = None
+        if (
+            self.store.exists()
+            and self.store.tickers == tickers
+            and self.store.metadata.get("config") == self.config
+        ):
+            start = self.store.dates[-1]
+        return self.update(prices.read(field, tickers, start=start))
+
+    def read(
+        self,
+        feature: str,
+        window: int,
+        tickers: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Feature (date x ticker) per finestra, ticker e intervallo di date."""
+        return self.store.read(feature_name(feature, window), tickers, start, end)
+
+    def _initial_state(self, tickers: List[str]) -> Dict[str, Any]:
+        nan = [float("nan")] * len(tickers)
+        return {
+            "last_price": nan,
+            "ewma": {str(span): {"mean": nan, "variance": nan} for span in self.spans},
+        }
+
+    def _compute(
+        self, prices: pd.DataFrame, state: Dict[str, Any], tail: Optional[np.ndarray]
+    ) -> tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Feature di un blocco di prezzi dallo stato salvato."""
+        values = np.array(
+            prices.to_numpy(dtype=float, copy=False), dtype=float, order="F", copy=True
+        )
+        carry = np.array(state["last_price"], dtype=float)
+        previous = carry.copy()
+        forward_fill(values, carry)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.empty_like(values)
+            ratio[0] = values[0] / previous
+            ratio[1:] = values[1:] / values[:-1]
+            simple = ratio - 1.0
+            logarithmic = np.log(ratio)
+        arrays = {
+            feature_name("returns", 1): simple,
+            feature_name("log_returns", 1): logarithmic,
+        }
+
+        returns = logarithmic if self.log_returns else simple
+        n_tail = 0 if tail is None else tail.shape[0]
+        if self.windows:
+            extended = returns
+            if n_tail:
+                extended = np.empty(
+                    (n_tail + returns.shape[0], returns.shape[1]), order="F"
+                )
+                extended[:n_tail], extended[n_tail:] = tail, returns
+            market = self._market(extended, list(prices.columns))
+            for window, statistics in rolling_statistics(
+                extended, market, self.windows
+            ).items():
+                arrays[feature_name("volatility", window)] = statistics["volatility"][
+                    n_tail:
+                ]
+                arrays[feature_name("correlation", window)] = statistics["correlation"][
+                    n_tail:
+                ]
+
+        ewma = {}
+        for span in self.spans:
+            mean = np.array(state["ewma"][str(span)]["mean"], dtype=float)
+            variance = np.array(state["ewma"][str(span)]["variance"], dtype=float)
+            m, v = ewma_moments(returns, span, mean, variance)
+            arrays[feature_name("ewma_mean", span)] = m
+            arrays[feature_name("ewma_volatility", span)] = np.sqrt(v)
+            ewma[str(span)] = {"mean": mean.tolist(), "variance": variance.tolist()}
+        return arrays, {"last_price": carry.tolist(), "ewma": ewma}
+
+    def _market(self, returns: np.ndarray, tickers: List[str]) -> np.ndarray:
+        """Rendimento di riferimento: ``benchmark`` o la media dei rendimenti."""
+        if self.benchmark is not None:
+            if self.benchmark not in tickers:
+                raise KeyError(f"Benchmark non presente tra i ticker: {self.benchmark}")
+            return returns[:, tickers.index(self.benchmark)]
+        valid = np.isfinite(returns)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(valid, returns, 0.0).sum(axis=1) / valid.sum(axis=1)
@@ -0,0 +1,392 @@
+"""Archivio colonnare dei prezzi con lettura memory-mapped.
+
+Ogni campo (Open, High, Low, Close, Volume) è una matrice float64 (date x ticker)
+salvata come ``{campo}.npy``; ``dates.npy`` contiene l'indice temporale e
+``manifest.json`` ticker, campi e numero di date. I valori mancanti sono NaN.
+La lettura usa ``np.load(mmap_mode='r')``: un intervallo di date è una vista
+contigua del file, senza parsing di testo né concatenazioni di DataFrame.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+DATES = "dates.npy"
+
+
+def default_store_path(path_raw: str | Path) -> Path:
+    """Percorso dell'archivio accanto ai dati grezzi (data/raw -> data/store)."""
+    return Path(path_raw).parent / "store"
+
+
+def _append_rows(path: Path, values: np.ndarray) -> None:
+    """Scrive ``values`` in coda a un ``.npy`` e aggiorna l'intestazione."""
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (
+            np.lib.format.read_array_header_1_0
+            if version == (1, 0)
+            else np.lib.format.read_array_header_2_0
+        )
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+        if fortran_order or dtype != values.dtype or shape[1:] != values.shape[1:]:
+            raise ValueError(f"File non compatibile con le righe da aggiungere: {path}")
+        # Byte oltre la forma dichiarata (scrittura interrotta): scartati
+        f.truncate(offset + int(np.prod(shape)) * dtype.itemsize)
+        f.seek(0, os.SEEK_END)
+        f.write(values.tobytes())
+        f.seek(0)
+        header = {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": False,
+            "shape": (shape[0] + values.shape[0],) + shape[1:],
+        }
+        write_header = (
+            np.lib.format.write_array_header_1_0
+            if version == (1, 0)
+            else np.lib.format.write_array_header_2_0
+        )
+        write_header(f, header)
+        if f.tell() != offset:
+            raise ValueError(f"Intestazione non aggiornabile in place: {path}")
+
+
+class PriceStore:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._manifest: Optional[Dict] = None
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def exists(self) -> bool:
+        return (self.root / MANIFEST).exists()
+
+    @property
+    def manifest(self) -> Dict:
+        if self._manifest is None:
+            if not self.exists():
+                raise FileNotFoundError(f"Archivio dei prezzi non trovato: {self.root}")
+            with open(self.root / MANIFEST, "r") as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    @property
+    def tickers(self) -> List[str]:
+        return self.manifest["tickers"]
+
+    @property
+    def fields(self) -> List[str]:
+        return self.manifest["fields"]
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._array(DATES), name="Date")
+
+    def _array(self, filename: str) -> np.ndarray:
+        if filename not in self._arrays:
+            self._arrays[filename] = np.load(self.root / filename, mmap_mode="r")
+        return self._arrays[filename]
+
+    def array(self, field: str = "Close") -> np.ndarray:
+        """Matrice (date x ticker) del campo, memory-mapped in sola lettura."""
+        if field not in self.fields:
+            raise KeyError(f"Campo non presente nell'archivio: {field}")
+        return self._array(f"{field}.npy")
+
+    def read(
+        self,
+        field: str = "Close",
+        tickers: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Prezzi (date x ticker) di un campo per ticker e date (estremi inclusi)."""
+        dates = self.dates
+        first = (
+            0 if start is None else dates.searchsorted(pd.Timestamp(start), side="left")
+        )
+        last = (
+            len(dates)
+            if end is None
+            else dates.searchsorted(pd.Timestamp(end), side="right")
+        )
+        values = self.array(field)[first:last]
+        if tickers is None:
+            columns = self.tickers
+        else:
+            position = {ticker: i for i, ticker in enumerate(self.tickers)}
+            missing = [t for t in tickers if t not in position]
+            if missing:
+                raise KeyError(f"Ticker non presenti nell'archivio: {missing}")
+            columns = list(tickers)
+            values = values[:, [position[t] for t in columns]]
+        return pd.DataFrame(
+            values, index=dates[first:last], columns=columns, copy=False
+        )
+
+    def iter_chunks(
+        self,
+        field: str = "Close",
+        tickers: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        chunk_rows: int = 100_000,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Blocchi consecutivi (date, valori) di al più ``chunk_rows`` righe, in ordine.
+
+        Ogni blocco è una copia in memoria (in ordine Fortran, colonne contigue)
+        delle sole righe e colonne richieste: l'occupazione dipende da
+        ``chunk_rows``, non dalla lunghezza dell'archivio.
+        """
+        if chunk_rows < 1:
+            raise ValueError("La dimensione dei blocchi deve essere positiva")
+        dates = self._array(DATES)
+        first = (
+            0
+            if start is None
+            else int(
+                np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+            )
+        )
+        last = (
+            len(dates)
+            if end is None
+            else int(
+                np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right")
+            )
+        )
+        columns = None
+        if tickers is not None:
+            position = {ticker: i for i, ticker in enumerate(self.tickers)}
+            missing = [t for t in tickers if t not in position]
+            if missing:
+                raise KeyError(f"Ticker non presenti nell'archivio: {missing}")
+            columns = [position[t] for t in tickers]
+        values = self.array(field)
+        for begin in range(first, last, chunk_rows):
+            stop = min(begin + chunk_rows, last)
+            block = (
+                values[begin:stop] if columns is None else values[begin:stop, columns]
+            )
+            yield np.array(dates[begin:stop]), np.array(
+                block, dtype=np.float64, order="F"
+            )
+
+    def write(
+        self,
+        frames: Mapping[str, pd.DataFrame],
+        fields: Sequence[str] = ("Open", "High", "Low", "Close", "Volume"),
+    ) -> None:
+        """Sostituisce l'archivio con i dati per ticker (formato lungo)."""
+        self._materialize(frames, [f for f in fields if f != "Date"], merge=False)
+
+    def update(self, frames: Mapping[str, pd.DataFrame]) -> None:
+        """Unisce all'archivio nuove righe o ticker; i valori ricevuti prevalgono."""
+        if not self.exists():
+            fields = (
+                [
+                    c
+                    for c in next(iter(frames.values())).columns
+                    if c not in ("Date", "Ticker")
+                ]
+                if frames
+                else []
+            )
+            self._materialize(frames, fields, merge=False)
+            return
+        self._materialize(frames, self.fields, merge=True)
+
+    def _materialize(
+        self, frames: Mapping[str, pd.DataFrame], fields: List[str], merge: bool
+    ) -> None:
+        """Scrive le matrici su file temporanei memory-mapped e li sostituisce.
+
+        Il manifest viene rimosso prima della sostituzione e riscritto per ultimo,
+        quindi un archivio aggiornato a metà non è mai leggibile.
+        """
+        old_tickers = self.tickers if merge else []
+        old_dates = (
+            self.dates if merge else pd.DatetimeIndex([], dtype="datetime64[ns]")
+        )
+        tickers = sorted(set(old_tickers) | set(frames))
+        new_dates = [
+            pd.to_datetime(frames[t]["Date"]).to_numpy(dtype="datetime64[ns]")
+            for t in frames
+        ]
+        dates = pd.DatetimeIndex(
+            np.unique(
+                np.concatenate([old_dates.to_numpy(dtype="datetime64[ns]")] + new_dates)
+            )
+        )
+        columns = {t: j for j, t in enumerate(tickers)}
+        rows = {t: dates.get_indexer(pd.to_datetime(frames[t]["Date"])) for t in frames}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staged = {DATES: self.root / f".{DATES}.tmp"}
+        with open(staged[DATES], "wb") as f:
+            np.save(f, dates.to_numpy(dtype="datetime64[ns]"))
+        for field in fields:
+            filename = f"{field}.npy"
+            staged[filename] = self.root / f".{filename}.tmp"
+            out = np.lib.format.open_memmap(
+                staged[filename],
+                mode="w+",
+                dtype=np.float64,
+                shape=(len(dates), len(tickers)),
+            )
+            out[...] = np.nan
+            if merge and old_tickers:
+                out[
+                    np.ix_(
+                        dates.get_indexer(old_dates), [columns[t] for t in old_tickers]
+                    )
+                ] = self.array(field)
+            for ticker, frame in frames.items():
+                out[rows[ticker], columns[ticker]] = frame[field].to_numpy(
+                    dtype=np.float64
+                )
+            out.flush()
+            del out
+
+        self._commit(staged, tickers, fields, len(dates))
+
+    def _commit(
+        self,
+        staged: Mapping[str, Path],
+        tickers: List[str],
+        fields: List[str],
+        n_dates: int,
+        metadata: Optional[Dict] = None,
+    ) -> None:
+        """Sostituisce i file con quelli preparati e scrive per ultimo il manifest."""
+        manifest_path = self.root / MANIFEST
+        manifest_path.unlink(missing_ok=True)
+        self._manifest = None
+        self._arrays = {}
+        for filename, tmp in staged.items():
+            os.replace(tmp, self.root / filename)
+        self._write_manifest(tickers, fields, n_dates, metadata)
+
+    def _write_manifest(
+        self,
+        tickers: List[str],
+        fields: List[str],
+        n_dates: int,
+        metadata: Optional[Dict] = None,
+    ) -> None:
+        manifest = {"tickers": tickers, "fields": fields, "n_dates": n_dates}
+        if metadata is not None:
+            manifest["metadata"] = metadata
+        tmp = self.root / f".{MANIFEST}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.root / MANIFEST)
+
+    def write_arrays(
+        self,
+        dates: np.ndarray,
+        tickers: Sequence[str],
+        arrays: Mapping[str, np.ndarray],
+        metadata: Optional[Dict] = None,
+    ) -> None:
+        """Sostituisce l'archivio con matrici (date x ticker) allineate, una per campo.
+
+        ``metadata`` (serializzabile in JSON) viene salvato nel manifest.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        staged = {DATES: self.root / f".{DATES}.tmp"}
+        with open(staged[DATES], "wb") as f:
+            np.save(f, np.asarray(dates, dtype="datetime64[ns]"))
+        for field, values in arrays.items():
+            filename = f"{field}.npy"
+            staged[filename] = self.root / f".{filename}.tmp"
+            with open(staged[filename], "wb") as f:
+                np.save(f, np.ascontiguousarray(values, dtype=np.float64))
+        self._commit(staged, list(tickers), list(arrays), len(dates), metadata)
+
+    @property
+    def metadata(self) -> Dict:
+        return self.manifest.get("metadata", {})
+
+    def append(
+        self,
+        dates: np.ndarray,
+        arrays: Mapping[str, np.ndarray],
+        metadata: Optional[Dict] = None,
+    ) -> None:
+        """Aggiunge righe successive all'ultima data, senza riscrivere quelle salvate.
+
+        Le nuove righe vengono scritte alla fine di ogni ``.npy`` e la forma
+        nell'intestazione aggiornata in place (NumPy riserva lo spazio per far
+        crescere il primo asse). Come in ``_materialize`` il manifest viene
+        rimosso prima delle scritture e riscritto per ultimo.
+        """
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        if set(arrays) != set(self.fields):
+            raise ValueError(
+                "I campi da aggiungere devono essere quelli dell'archivio: "
+                f"{self.fields}"
+            )
+        stored = self._array(DATES)
+        if len(dates) == 0:
+            return
+        if np.any(np.diff(dates) <= np.timedelta64(0)) or (
+            len(stored) and dates[0] <= stored[-1]
+        ):
+            raise ValueError(
+                "Le date da aggiungere devono essere crescenti e successive "
+                "all'ultima salvata"
+            )
+        tickers, fields, n_dates = self.tickers, self.fields, self.manifest["n_dates"]
+        if metadata is None:
+            metadata = self.manifest.get("metadata")
+        rows = {DATES: dates}
+        for field in fields:
+            values = np.ascontiguousarray(arrays[field], dtype=np.float64)
+            if values.shape != (len(dates), len(tickers)):
+                raise ValueError(
+                    f"Forma non valida per il campo {field}: {values.shape}"
+                )
+            rows[f"{field}.npy"] = values
+
+        (self.root / MANIFEST).unlink()
+        self._manifest = None
+        self._arrays = {}
+        for filename, values in rows.items():
+            _append_rows(self.root / filename, values)
+        self._write_manifest(tickers, fields, n_dates + len(dates), metadata)
+
+    @classmethod
+    def from_files(
+        cls,
+        root: str | Path,
+        path_raw: str | Path,
+        tickers: Sequence[str],
+        format: str = "csv",
+    ) -> "PriceStore":
+        """Crea l'archivio dai file per ticker già scaricati (CSV o Parquet)."""
+        path_raw = Path(path_raw)
+        frames = {}
+        for ticker in tickers:
+            path = path_raw / f"{ticker}.{format}"
+            if not path.exists():
+                continue
+            frames[ticker] = (
+                pd.read_parquet(path)
+                if format == "parquet"
+                else pd.read_csv(path, parse_dates=["Date"])
+            )
+        if not frames:
+            raise ValueError(f"Nessun file di prezzi trovato in {path_raw}")
+        store = cls(root)
+        fields = [
+            c
+            for c in next(iter(frames.values())).columns
+            if c not in ("Date", "Ticker")
+        ]
+        store.write(frames, fields)
+        return store
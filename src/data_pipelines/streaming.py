@@ -0,0 +1,309 @@
+"""Pulizia a blocchi dell'archivio dei prezzi per storie intraday lunghe.
+
+``stream_clean`` legge l'archivio colonnare in blocchi temporali di
+``chunk_rows`` righe (``PriceStore.iter_chunks``) e scrive prezzi puliti e
+rendimenti in Parquet un row group alla volta, quindi l'occupazione di memoria
+dipende dalla dimensione del blocco e non dalla lunghezza della storia. La
+semantica è quella di ``DataCleaner``/``CleaningPlan`` (ffill, dropna, z-score
+sui prezzi, rendimenti tra righe mantenute consecutive), con lo stato
+trasportato tra i blocchi:
+
+- forward-fill: l'ultima osservazione valida di ogni ticker;
+- z-score: media e deviazione standard di tutta la storia, da un primo
+  passaggio con momenti correnti (``RunningMoments``), perché la soglia dipende
+  anche dalle righe successive al blocco;
+- rendimenti: l'ultima riga mantenuta del blocco precedente.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from data_validation import evaluate_checks
+from price_store import PriceStore
+
+
+class RunningMoments:
+    """Media e varianza per colonna aggiornate a blocchi (formula di Chan et al.)."""
+
+    def __init__(self, n_columns: int):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self._m2 = np.zeros(n_columns)
+
+    def update(self, rows: np.ndarray) -> "RunningMoments":
+        k = rows.shape[0]
+        if k == 0:
+            return self
+        mean = rows.mean(axis=0)
+        m2 = np.empty_like(mean)
+        for j in range(rows.shape[1]):
+            centered = rows[:, j] - mean[j]
+            m2[j] = centered @ centered
+        total = self.count + k
+        delta = mean - self.mean
+        self.mean += delta * (k / total)
+        self._m2 += m2 + delta**2 * (self.count * k / total)
+        self.count = total
+        return self
+
+    @property
+    def std(self) -> np.ndarray:
+        """Deviazione standard campionaria (ddof=1), NaN sotto le due osservazioni."""
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return np.sqrt(self._m2 / (self.count - 1))
+
+
+def forward_fill(values: np.ndarray, carry: np.ndarray) -> np.ndarray:
+    """Forward-fill in place di un blocco, colonna per colonna, a partire da ``carry``.
+
+    ``carry`` contiene gli ultimi valori (NaN se assenti) del blocco precedente e
+    viene aggiornato in place. Restituisce i valori mancanti per colonna prima
+    del riempimento.
+    """
+    missing = np.zeros(values.shape[1], dtype=np.int64)
+    positions = np.arange(values.shape[0])
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        gaps = np.isnan(column)
+        missing[j] = np.count_nonzero(gaps)
+        if missing[j]:
+            source = np.maximum.accumulate(np.where(gaps, -1, positions))
+            filled = column[np.maximum(source, 0)]
+            filled[source < 0] = carry[j]
+            column[:] = filled
+        if column.size:
+            carry[j] = column[-1]
+    return missing
+
+
+def _compact(values: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """Righe ``keep`` spostate in testa al blocco, colonna per colonna."""
+    n_kept = int(np.count_nonzero(keep))
+    if n_kept == keep.size:
+        return values
+    rows = np.flatnonzero(keep)
+    for j in range(values.shape[1]):
+        values[:n_kept, j] = values[rows, j]
+    return values[:n_kept]
+
+
+def _to_returns(
+    values: np.ndarray, previous: Optional[np.ndarray], log_returns: bool
+) -> np.ndarray:
+    """Rendimenti in place rispetto alla riga precedente (o a ``previous``)."""
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        column[1:] /= column[:-1].copy()
+        if previous is not None:
+            column[0] /= previous[j]
+    if log_returns:
+        np.log(values, out=values)
+    else:
+        values -= 1.0
+    return values if previous is not None else values[1:]
+
+
+class _ParquetSink:
+    """Scrittura incrementale di blocchi (date x ticker) su un file Parquet.
+
+    Il file viene sostituito in modo atomico alla chiusura.
+
+    Lo schema (con i metadati pandas, indice ``Date``) è quello di
+    ``DataFrame.to_parquet``.
+    """
+
+    def __init__(self, path: Optional[str | Path], columns: Sequence[str]):
+        self.path = Path(path) if path is not None else None
+        self.columns = list(columns)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._tmp = (
+            None if self.path is None else self.path.with_name(f".{self.path.name}.tmp")
+        )
+
+    def write(self, dates: np.ndarray, values: np.ndarray) -> None:
+        if self.path is None or dates.shape[0] == 0:
+            return
+        self._write_table(dates, values)
+        self.rows += dates.shape[0]
+
+    def _write_table(self, dates: np.ndarray, values: np.ndarray) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            empty = pd.DataFrame(
+                np.empty((0, len(self.columns))),
+                index=pd.DatetimeIndex([], dtype="datetime64[ns]", name="Date"),
+                columns=self.columns,
+            )
+            self._schema = pa.Schema.from_pandas(empty)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp, self._schema)
+        # Colonne contigue del blocco: nessuna conversione tramite DataFrame
+        arrays = [pa.array(values[:, j]) for j in range(values.shape[1])] + [
+            pa.array(dates)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        if self.path is None:
+            return
+        if self._writer is None:
+            # Nessuna riga: file vuoto con lo stesso schema
+            self._write_table(
+                np.array([], dtype="datetime64[ns]"), np.empty((0, len(self.columns)))
+            )
+        self._writer.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._tmp is not None:
+            self._tmp.unlink(missing_ok=True)
+
+
+def _complete_rows(
+    store: PriceStore,
+    field: str,
+    tickers: Optional[Sequence[str]],
+    start: Optional[str],
+    end: Optional[str],
+    chunk_rows: int,
+):
+    """Blocchi con forward-fill e senza righe incomplete, con i conteggi."""
+    carry = None
+    for dates, values in store.iter_chunks(field, tickers, start, end, chunk_rows):
+        if carry is None:
+            carry = np.full(values.shape[1], np.nan)
+        missing = forward_fill(values, carry)
+        # Dopo il riempimento restano NaN solo prima della prima
+        # osservazione di un ticker
+        keep = np.ones(values.shape[0], dtype=bool)
+        for j in np.flatnonzero(np.isnan(values[0])):
+            keep &= ~np.isnan(values[:, j])
+        yield dates[keep], _compact(values, keep), missing, int(
+            keep.size - np.count_nonzero(keep)
+        )
+
+
+def stream_clean(
+    store: PriceStore,
+    output_path: Optional[str | Path] = None,
+    returns_path: Optional[str | Path] = None,
+    field: str = "Close",
+    tickers: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_rows: int = 100_000,
+    outlier_threshold: Optional[float] = 3.0,
+    log_returns: bool = False,
+    checks: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Prezzi puliti (``output_path``) e rendimenti (``returns_path``) a blocchi.
+
+    Restituisce un report con la stessa struttura di ``CleaningPlan.run``; i
+    controlli di validazione si applicano ai prezzi puliti.
+    """
+    if outlier_threshold is not None and outlier_threshold <= 0:
+        raise ValueError("La soglia degli outlier deve essere positiva")
+    columns = list(tickers) if tickers is not None else store.tickers
+    n_columns = len(columns)
+
+    passes = 0
+    mean = limit = None
+    if outlier_threshold is not None:
+        passes += 1
+        moments = RunningMoments(n_columns)
+        for _, values, _, _ in _complete_rows(
+            store, field, tickers, start, end, chunk_rows
+        ):
+            moments.update(values)
+        mean = moments.mean
+        # Colonne costanti (std nulla): nessun outlier
+        limit = np.where(moments.std > 0, outlier_threshold * moments.std, np.inf)
+
+    passes += 1
+    prices = _ParquetSink(output_path, columns)
+    returns = _ParquetSink(returns_path, columns)
+    statistics: Dict[str, Any] = {
+        "missing": 0,
+        "negatives": 0,
+        "duplicates": False,
+        "first": None,
+        "last": None,
+    }
+    missing = np.zeros(n_columns, dtype=np.int64)
+    rows_in = incomplete = outliers = n_chunks = 0
+    previous_date = previous_row = None
+    try:
+        for dates, values, gaps, dropped in _complete_rows(
+            store, field, tickers, start, end, chunk_rows
+        ):
+            n_chunks += 1
+            missing += gaps
+            rows_in += dates.shape[0] + dropped
+            incomplete += dropped
+            if limit is not None:
+                keep = np.ones(values.shape[0], dtype=bool)
+                for j in range(n_columns):
+                    keep &= np.abs(values[:, j] - mean[j]) < limit[j]
+                outliers += int(keep.size - np.count_nonzero(keep))
+                dates, values = dates[keep], _compact(values, keep)
+            if dates.shape[0] == 0:
+                continue
+
+            statistics["negatives"] += int(np.count_nonzero(values < 0))
+            if (previous_date is not None and dates[0] <= previous_date) or np.any(
+                np.diff(dates) <= np.timedelta64(0)
+            ):
+                statistics["duplicates"] = True
+            if statistics["first"] is None:
+                statistics["first"] = pd.Timestamp(dates[0])
+            statistics["last"] = pd.Timestamp(dates[-1])
+            prices.write(dates, values)
+
+            last_row = values[-1].copy()
+            if returns_path is not None:
+                # Rendimenti tra righe mantenute consecutive, anche tra blocchi
+                returns.write(
+                    dates if previous_row is not None else dates[1:],
+                    _to_returns(values, previous_row, log_returns),
+                )
+            previous_date, previous_row = dates[-1], last_row
+    except BaseException:
+        prices.abort()
+        returns.abort()
+        raise
+    prices.close()
+    returns.close()
+
+    rows_out = rows_in - incomplete - outliers
+    outcome = evaluate_checks(None, statistics, checks, start_date, end_date)
+    steps = ["fill(ffill)"]
+    if outlier_threshold is not None:
+        steps.append(f"remove_outliers({outlier_threshold})")
+    if returns_path is not None:
+        steps.append(f"returns({log_returns})")
+    return {
+        "steps": steps + ["validate"],
+        "passes": passes,
+        "chunks": n_chunks,
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "returns_rows": returns.rows,
+        "columns": n_columns,
+        "missing_values": dict(zip(columns, missing.tolist())),
+        "incomplete_rows": incomplete,
+        "outlier_rows": outliers,
+        "checks": outcome["results"],
+        "errors": outcome["errors"],
+        "valid": not outcome["errors"],
+    }
@@ -0,0 +1,201 @@
+"""Registro degli stimatori della matrice di covarianza.
+
+Ogni stimatore riceve i rendimenti come ndarray (T x n) e la ``CovarianceConfig``
+e restituisce la matrice (n x n). Tutti sono implementati in NumPy vettorizzato:
+
+- ``empirical``: covarianza campionaria (ddof=1);
+- ``ledoit-wolf``: shrinkage verso ``shrinkage_target`` (constant_variance,
+  single_factor, constant_correlation), con intensità stimata o fissata da
+  ``shrinkage``;
+- ``oas``: Oracle Approximating Shrinkage verso mu * I;
+- ``ewma``: covarianza con pesi esponenziali di emivita ``halflife``;
+- ``factor``: modello statistico a ``n_factors`` fattori (low-rank + diagonale).
+"""
+
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from scipy.linalg import eigh
+from scipy.sparse.linalg import eigsh
+
+Estimator = Callable[[np.ndarray, Any], np.ndarray]
+COVARIANCE_ESTIMATORS: Dict[str, Estimator] = {}
+
+
+def register_estimator(name: str) -> Callable[[Estimator], Estimator]:
+    def decorator(func: Estimator) -> Estimator:
+        COVARIANCE_ESTIMATORS[name] = func
+        return func
+
+    return decorator
+
+
+def estimate_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    """Covarianza (n x n) dei rendimenti (T x n) con il metodo configurato."""
+    if config.method not in COVARIANCE_ESTIMATORS:
+        raise ValueError(
+            "Metodo di stima della matrice di covarianza non registrato: "
+            f"{config.method}"
+        )
+    return COVARIANCE_ESTIMATORS[config.method](
+        np.asarray(returns, dtype=float), config
+    )
+
+
+def _centered(returns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rendimenti centrati e covarianza empirica con normalizzazione 1/T."""
+    x = returns - returns.mean(axis=0)
+    return x, x.T @ x / x.shape[0]
+
+
+def _shrink(sample: np.ndarray, prior: np.ndarray, intensity: float) -> np.ndarray:
+    return intensity * prior + (1.0 - intensity) * sample
+
+
+@register_estimator("empirical")
+def empirical_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    return np.cov(returns, rowvar=False, ddof=1)
+
+
+def _constant_variance(
+    x: np.ndarray, sample: np.ndarray, shrinkage: Optional[float]
+) -> np.ndarray:
+    """Target mu * I (Ledoit-Wolf 2004, stessa stima di sklearn)."""
+    t, n = x.shape
+    mu = np.trace(sample) / n
+    prior = mu * np.eye(n)
+    if shrinkage is None:
+        y = x**2
+        beta_ = np.sum(y.T @ y)
+        delta_ = np.sum(sample**2)
+        beta = (beta_ / t - delta_) / (n * t)
+        delta = (delta_ - 2.0 * mu * np.trace(sample) + n * mu**2) / n
+        beta = min(beta, delta)
+        shrinkage = 0.0 if beta <= 0 else beta / delta
+    return _shrink(sample, prior, shrinkage)
+
+
+def _single_factor(
+    x: np.ndarray, sample: np.ndarray, shrinkage: Optional[float]
+) -> np.ndarray:
+    """Target a un fattore di mercato equipesato (Ledoit-Wolf 2003)."""
+    t, n = x.shape
+    market = x.mean(axis=1)
+    cov_market = x.T @ market / t
+    var_market = market @ market / t
+    prior = np.outer(cov_market, cov_market) / var_market
+    np.fill_diagonal(prior, np.diag(sample))
+    if shrinkage is None:
+        c = np.sum((sample - prior) ** 2)
+        y = x**2
+        p = np.sum(y.T @ y) / t - np.sum(sample**2)
+        r_diag = np.sum(y**2) / t - np.sum(np.diag(sample) ** 2)
+        z = x * market[:, None]
+        v1 = y.T @ z / t - cov_market[:, None] * sample
+        r_off1 = (
+            np.sum(v1 * cov_market[None, :]) - np.sum(np.diag(v1) * cov_market)
+        ) / var_market
+        v3 = z.T @ z / t - var_market * sample
+        r_off3 = (
+            np.sum(v3 * np.outer(cov_market, cov_market))
+            - np.sum(np.diag(v3) * cov_market**2)
+        ) / var_market**2
+        r = r_diag + 2 * r_off1 - r_off3
+        shrinkage = max(0.0, min(1.0, (p - r) / c / t)) if c > 0 else 0.0
+    return _shrink(sample, prior, shrinkage)
+
+
+def _constant_correlation(
+    x: np.ndarray, sample: np.ndarray, shrinkage: Optional[float]
+) -> np.ndarray:
+    """Target a correlazione costante di Ledoit-Wolf."""
+    t, n = x.shape
+    var = np.diag(sample)
+    std = np.sqrt(var)
+    r_bar = (np.sum(sample / np.outer(std, std)) - n) / (n * (n - 1))
+    prior = r_bar * np.outer(std, std)
+    np.fill_diagonal(prior, var)
+    if shrinkage is None:
+        y = x**2
+        xx = x.T @ x / t
+        phi_mat = y.T @ y / t - 2 * xx * sample + sample**2
+        phi = np.sum(phi_mat)
+        theta = (
+            (x**3).T @ x / t
+            - np.diag(xx)[:, None] * sample
+            - xx * var[:, None]
+            + var[:, None] * sample
+        )
+        np.fill_diagonal(theta, 0.0)
+        rho = np.sum(np.diag(phi_mat)) + r_bar * np.sum(np.outer(1 / std, std) * theta)
+        gamma = np.sum((sample - prior) ** 2)
+        shrinkage = max(0.0, min(1.0, (phi - rho) / gamma / t)) if gamma > 0 else 0.0
+    return _shrink(sample, prior, shrinkage)
+
+
+_SHRINKAGE_TARGETS = {
+    "constant_variance": _constant_variance,
+    "single_factor": _single_factor,
+    "constant_correlation": _constant_correlation,
+}
+
+
+@register_estimator("ledoit-wolf")
+def ledoit_wolf_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    x, sample = _centered(returns)
+    return _SHRINKAGE_TARGETS[config.shrinkage_target](x, sample, config.shrinkage)
+
+
+@register_estimator("oas")
+def oas_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    t, n = returns.shape
+    _, sample = _centered(returns)
+    mu = np.trace(sample) / n
+    shrinkage = config.shrinkage
+    if shrinkage is None:
+        alpha = np.mean(sample**2)
+        num = alpha + mu**2
+        den = (t + 1.0) * (alpha - mu**2 / n)
+        shrinkage = 1.0 if den == 0 else min(num / den, 1.0)
+    return _shrink(sample, mu * np.eye(n), shrinkage)
+
+
+@register_estimator("ewma")
+def ewma_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    t = returns.shape[0]
+    weights = 0.5 ** (np.arange(t - 1, -1, -1) / config.halflife)
+    weights /= weights.sum()
+    mean = weights @ returns
+    x = returns - mean
+    # Correzione per i pesi analoga a ddof=1
+    return (x * weights[:, None]).T @ x / (1.0 - weights @ weights)
+
+
+def factor_loadings(
+    returns: np.ndarray, n_factors: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Esposizioni B (n x k) e varianze specifiche D (n): S = B B' + D."""
+    sample = np.cov(returns, rowvar=False, ddof=1)
+    n = sample.shape[0]
+    k = min(n_factors, n)
+    # Solo i k autovalori maggiori: Lanczos (v0 fisso, risultato
+    # deterministico) se k << n
+    if k < n - 1:
+        eigval, eigvec = eigsh(sample, k=k, which="LA", v0=np.ones(n))
+    else:
+        eigval, eigvec = eigh(sample)
+    order = np.argsort(eigval)[::-1][:k]
+    eigval, eigvec = eigval[order], eigvec[:, order]
+    loadings = eigvec * np.sqrt(np.maximum(eigval, 0.0))
+    specific = np.maximum(
+        np.diag(sample) - np.sum(loadings**2, axis=1),
+        np.finfo(float).eps * np.diag(sample).max(),
+    )
+    return loadings, specific
+
+
+@register_estimator("factor")
+def factor_covariance(returns: np.ndarray, config: Any) -> np.ndarray:
+    loadings, specific = factor_loadings(returns, config.n_factors)
+    covariance = loadings @ loadings.T
+    covariance.flat[:: covariance.shape[0] + 1] += specific
+    return covariance
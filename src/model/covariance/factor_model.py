@@ -0,0 +1,73 @@
+"""Modello di rischio a fattori S = B F B' + D per universi di grandi dimensioni.
+
+``FactorRiskModel`` si comporta come un operatore lineare simmetrico: ``S @ x``,
+``x @ S`` e ``W @ S`` (W k x n) costano O(nk) senza mai materializzare la matrice
+densa n x n, quindi può sostituire la covarianza densa nel solver active-set e
+nelle statistiche vettorizzate dei portafogli.
+"""
+
+from typing import Optional
+import numpy as np
+from model.covariance.estimators import factor_loadings
+
+
+class FactorRiskModel:
+    # NumPy delega a __rmatmul__ invece di convertire l'oggetto in array
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        loadings: np.ndarray,
+        specific: np.ndarray,
+        factor_cov: Optional[np.ndarray] = None,
+    ):
+        self.loadings = np.asarray(loadings, dtype=float)
+        self.specific = np.asarray(specific, dtype=float)
+        n, k = self.loadings.shape
+        self.factor_cov = (
+            np.eye(k) if factor_cov is None else np.asarray(factor_cov, dtype=float)
+        )
+        if self.specific.shape != (n,) or self.factor_cov.shape != (k, k):
+            raise ValueError("Dimensioni del modello a fattori non coerenti")
+        if np.any(self.specific <= 0):
+            raise ValueError("Le varianze specifiche devono essere positive")
+
+    @classmethod
+    def from_returns(cls, returns: np.ndarray, n_factors: int = 3) -> "FactorRiskModel":
+        """Modello statistico (componenti principali) stimato dai rendimenti (T x n)."""
+        loadings, specific = factor_loadings(
+            np.asarray(returns, dtype=float), n_factors
+        )
+        return cls(loadings, specific)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        n = self.loadings.shape[0]
+        return (n, n)
+
+    @property
+    def n_factors(self) -> int:
+        return self.loadings.shape[1]
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        other = np.asarray(other, dtype=float)
+        systematic = self.loadings @ (self.factor_cov @ (self.loadings.T @ other))
+        if other.ndim == 1:
+            return systematic + self.specific * other
+        return systematic + self.specific[:, None] * other
+
+    def __rmatmul__(self, other: np.ndarray) -> np.ndarray:
+        # S è simmetrica: x' S = (S x)'
+        other = np.asarray(other, dtype=float)
+        return (self @ other.T).T
+
+    def diagonal(self) -> np.ndarray:
+        return (
+            np.einsum("ij,jk,ik->i", self.loadings, self.factor_cov, self.loadings)
+            + self.specific
+        )
+
+    def to_dense(self) -> np.ndarray:
+        dense = self.loadings @ self.factor_cov @ self.loadings.T
+        dense.flat[:: dense.shape[0] + 1] += self.specific
+        return dense
@@ -0,0 +1,160 @@
+"""Stimatore incrementale di media e covarianza per rendimenti in streaming.
+
+Lo stato è formato da somme pesate di ordine O(n^2): s1 = sum w x, C = sum w x x',
+più i momenti del quarto ordine necessari all'intensità di shrinkage di
+Ledoit-Wolf (sum w ||x||^4 e sum w ||x||^2 x). Le nuove righe aggiornano le somme
+senza riscandire la storia:
+
+- ``expanding``: tutte le osservazioni con peso unitario;
+- ``rolling``: finestra di ``window`` righe, le uscenti vengono sottratte
+  (richiede il buffer della finestra, O(window * n));
+- ``ewm``: pesi esponenziali con emivita ``halflife``, le somme decadono a ogni riga.
+
+I dati vengono traslati della media del primo blocco per limitare la
+cancellazione numerica: media e covarianza sono invarianti per traslazione.
+"""
+
+from collections import deque
+from typing import Deque, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+MODES = ["expanding", "rolling", "ewm"]
+
+
+class OnlineCovarianceEstimator:
+    def __init__(
+        self,
+        n_assets: int,
+        mode: str = "expanding",
+        window: Optional[int] = None,
+        halflife: Optional[float] = None,
+        shrinkage: Optional[str] = "ledoit-wolf",
+        columns: Optional[Sequence[str]] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Modalità non valida: {mode}")
+        if mode == "rolling" and not window:
+            raise ValueError(
+                "La modalità rolling richiede la dimensione della finestra"
+            )
+        if mode == "ewm" and not halflife:
+            raise ValueError("La modalità ewm richiede l'emivita")
+        if shrinkage not in (None, "ledoit-wolf"):
+            raise ValueError(f"Shrinkage non valido: {shrinkage}")
+        self.n_assets = n_assets
+        self.mode = mode
+        self.window = window
+        self.decay = 0.5 ** (1.0 / halflife) if mode == "ewm" else 1.0
+        self.shrinkage = shrinkage
+        self.columns = list(columns) if columns is not None else None
+        self._shift: Optional[np.ndarray] = None
+        self._buffer: Deque[np.ndarray] = deque()
+        self.n_observations = 0
+        self._w = 0.0
+        self._w2 = 0.0
+        self._s1 = np.zeros(n_assets)
+        self._c = np.zeros((n_assets, n_assets))
+        self._q2 = 0.0
+        self._qx = np.zeros(n_assets)
+
+    def _accumulate(self, rows: np.ndarray, weights: np.ndarray) -> None:
+        q = np.einsum("ij,ij->i", rows, rows)
+        self._w += weights.sum()
+        # Le righe uscenti della finestra rolling hanno peso -1 e
+        # sottraggono il loro quadrato
+        self._w2 += weights @ np.abs(weights)
+        self._s1 += weights @ rows
+        self._c += (rows * weights[:, None]).T @ rows
+        self._q2 += weights @ (q * q)
+        self._qx += (weights * q) @ rows
+
+    def update(self, rows: np.ndarray | pd.DataFrame) -> "OnlineCovarianceEstimator":
+        """Aggiunge una o più righe di rendimenti (k x n) in ordine temporale."""
+        if isinstance(rows, pd.DataFrame):
+            if self.columns is None:
+                self.columns = list(rows.columns)
+            rows = rows[self.columns].to_numpy(dtype=float)
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        if rows.shape[1] != self.n_assets:
+            raise ValueError(
+                f"Numero di asset non valido: attesi {self.n_assets}, ricevuti "
+                f"{rows.shape[1]}"
+            )
+        if rows.shape[0] == 0:
+            return self
+        if self._shift is None:
+            self._shift = rows.mean(axis=0)
+        rows = rows - self._shift
+        k = rows.shape[0]
+
+        if self.mode == "ewm":
+            # Decadimento dello stato e pesi lambda^(k-1-j) per le nuove righe
+            factor = self.decay**k
+            self._w *= factor
+            self._w2 *= factor * factor
+            self._s1 *= factor
+            self._c *= factor
+            self._q2 *= factor
+            self._qx *= factor
+            self._accumulate(rows, self.decay ** np.arange(k - 1, -1, -1, dtype=float))
+        else:
+            self._accumulate(rows, np.ones(k))
+
+        if self.mode == "rolling":
+            self._buffer.extend(rows)
+            expired = len(self._buffer) - self.window
+            if expired > 0:
+                old = np.array([self._buffer.popleft() for _ in range(expired)])
+                self._accumulate(old, -np.ones(expired))
+        self.n_observations += k
+        return self
+
+    @property
+    def _centered(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._w <= 0:
+            raise ValueError("Nessuna osservazione disponibile")
+        m = self._s1 / self._w
+        return m, self._c / self._w - np.outer(m, m)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self._centered[0] + self._shift
+
+    @property
+    def shrinkage_intensity(self) -> float:
+        """Intensità di shrinkage di Ledoit-Wolf verso mu * I (come sklearn)."""
+        m, emp_cov = self._centered
+        p = self.n_assets
+        n = self._w
+        trace = np.trace(emp_cov)
+        mu = trace / p
+        # sum_t ||x_t - m||^4 espanso sui momenti accumulati
+        c = m @ m
+        fourth = (
+            self._q2
+            + 4 * m @ self._c @ m
+            + self._w * c * c
+            - 4 * m @ self._qx
+            + 2 * c * np.trace(self._c)
+            - 4 * c * (m @ self._s1)
+        )
+        delta_ = np.sum(emp_cov**2)
+        beta = (fourth / n - delta_) / (p * n)
+        delta = (delta_ - 2.0 * mu * trace + p * mu**2) / p
+        beta = min(beta, delta)
+        return 0.0 if beta <= 0 else float(beta / delta)
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Covarianza corrente: Ledoit-Wolf o campionaria corretta per i pesi."""
+        _, emp_cov = self._centered
+        if self.shrinkage == "ledoit-wolf":
+            s = self.shrinkage_intensity
+            mu = np.trace(emp_cov) / self.n_assets
+            shrunk = (1.0 - s) * emp_cov
+            shrunk.flat[:: self.n_assets + 1] += s * mu
+            return shrunk
+        # Correzione di Bessel generalizzata ai pesi
+        # (uguale a n / (n - 1) con pesi unitari)
+        return emp_cov * self._w**2 / (self._w**2 - self._w2)
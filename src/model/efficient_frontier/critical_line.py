@@ -0,0 +1,202 @@
+"""Critical Line Algorithm (Markowitz) con vincoli di box sui pesi.
+
+La frontiera viene percorsa facendo scendere il parametro di avversione al rischio
+lambda da +inf (portafoglio a massimo rendimento) a 0 (minima varianza) nel problema
+
+    min  1/2 w'S w - lambda mu'w
+    s.t. 1'w = 1,  lower <= w <= upper
+
+Tra due cambi dell'insieme delle variabili libere i pesi sono lineari in lambda,
+quindi i corner portfolio descrivono esattamente la frontiera e ogni punto
+intermedio si ottiene per interpolazione lineare nel rendimento atteso.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+
+class CriticalLineAlgorithm:
+    def __init__(
+        self,
+        mean: np.ndarray,
+        cov: np.ndarray,
+        lower: float | np.ndarray,
+        upper: float | np.ndarray,
+        tol: float = 1e-12,
+    ):
+        self.mean = np.asarray(mean, dtype=float)
+        self.cov = np.asarray(cov, dtype=float)
+        n = self.mean.shape[0]
+        self.lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+        self.upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+        self.tol = tol
+        if self.lower.sum() > 1 + tol or self.upper.sum() < 1 - tol:
+            raise ValueError("Vincoli sui pesi incompatibili con il vincolo di budget")
+        self.corners: List[Dict[str, Any]] = []
+
+    def _initial_portfolio(self) -> tuple[np.ndarray, List[int]]:
+        """Portafoglio a massimo rendimento: asset riempiti in ordine di rendimento."""
+        w = self.lower.copy()
+        budget = 1.0 - w.sum()
+        for i in np.argsort(-self.mean, kind="stable"):
+            step = min(self.upper[i] - self.lower[i], budget)
+            w[i] += step
+            budget -= step
+            if budget <= self.tol:
+                return w, [int(i)]
+        raise ValueError("Impossibile costruire il portafoglio iniziale")
+
+    def _segment(self, w: np.ndarray, free: List[int]) -> Dict[str, np.ndarray]:
+        """Coefficienti in lambda dei pesi liberi e dei gradienti vincolati."""
+        n = self.mean.shape[0]
+        bounded = np.setdiff1d(np.arange(n), free)
+        w_b = w[bounded]
+        cov_ff = self.cov[np.ix_(free, free)]
+        cov_fb = self.cov[np.ix_(free, bounded)]
+        rhs = np.column_stack([np.ones(len(free)), self.mean[free], cov_fb @ w_b])
+        x_one, x_mean, x_bounded = np.linalg.solve(cov_ff, rhs).T
+
+        # gamma(lambda) = g0 + lambda * g1 dal vincolo di budget
+        den = x_one.sum()
+        g0 = (1.0 - w_b.sum() + x_bounded.sum()) / den
+        g1 = -x_mean.sum() / den
+        alpha = g0 * x_one - x_bounded
+        beta = x_mean + g1 * x_one
+
+        # Gradiente ridotto dei pesi vincolati: z_B = a + lambda * b
+        cov_bf = cov_fb.T
+        a = cov_bf @ alpha + self.cov[np.ix_(bounded, bounded)] @ w_b - g0
+        b = cov_bf @ beta - self.mean[bounded] - g1
+        return {"bounded": bounded, "alpha": alpha, "beta": beta, "a": a, "b": b}
+
+    def _record(self, w: np.ndarray, lam: float, free: List[int]) -> None:
+        violation = max((self.lower - w).max(), (w - self.upper).max())
+        if violation > 1e-8:
+            raise ValueError(
+                f"Corner portfolio fuori dai vincoli sui pesi (lambda={lam:.6g})"
+            )
+        np.clip(w, self.lower, self.upper, out=w)
+        ret = float(w @ self.mean)
+        if (
+            self.corners
+            and abs(self.corners[-1]["return"] - ret) <= self.tol
+            and np.allclose(self.corners[-1]["weights"], w, atol=1e-10)
+        ):
+            return
+        self.corners.append(
+            {
+                "weights": w.copy(),
+                "return": ret,
+                "volatility": float(np.sqrt(max(w @ self.cov @ w, 0.0))),
+                "lambda": lam,
+                "free": list(free),
+            }
+        )
+
+    def solve(self) -> List[Dict[str, Any]]:
+        """Tutti i corner portfolio, dal massimo rendimento alla minima varianza."""
+        self.corners = []
+        w, free = self._initial_portfolio()
+        at_upper = w >= self.upper - self.tol
+        lam = np.inf
+        last_changed = -1
+        self._record(w, lam, free)
+
+        for _ in range(4 * self.mean.shape[0] + 10):
+            seg = self._segment(w, free)
+            limit = lam + self.tol * max(1.0, abs(lam)) if np.isfinite(lam) else np.inf
+            # L'asset appena cambiato ignora solo l'evento inverso al lambda corrente:
+            # più avanti sulla linea può raggiungere un bound come gli altri
+            reverse = lam - 1e-9 * max(1.0, abs(lam)) if np.isfinite(lam) else np.inf
+            best_lam, event = -np.inf, None
+
+            # a) una variabile libera raggiunge un bound
+            for j, i in enumerate(free):
+                beta = seg["beta"][j]
+                if abs(beta) <= self.tol:
+                    continue
+                bound = self.lower[i] if beta > 0 else self.upper[i]
+                candidate = (bound - seg["alpha"][j]) / beta
+                if i == last_changed and candidate >= reverse:
+                    continue
+                if candidate < limit and candidate > best_lam:
+                    best_lam, event = candidate, ("bound", i, bound)
+
+            # b) una variabile vincolata diventa libera
+            for j, i in enumerate(seg["bounded"]):
+                b = seg["b"][j]
+                if abs(b) <= self.tol:
+                    continue
+                # z decresce verso 0 al lower (b > 0) o cresce verso 0 all'upper (b < 0)
+                if (b > 0) == bool(at_upper[i]):
+                    continue
+                candidate = -seg["a"][j] / b
+                if i == last_changed and candidate >= reverse:
+                    continue
+                if candidate < limit and candidate > best_lam:
+                    best_lam, event = candidate, ("free", int(i), None)
+
+            if event is None or best_lam <= 0:
+                w[free] = seg["alpha"]
+                self._record(w, 0.0, free)
+                break
+
+            lam = best_lam
+            w[free] = seg["alpha"] + lam * seg["beta"]
+            kind, index, bound = event
+            if kind == "bound":
+                w[index] = bound
+                at_upper[index] = bound == self.upper[index]
+                free.remove(index)
+            else:
+                free.append(index)
+            last_changed = index
+            self._record(w, lam, free)
+
+        return self.corners
+
+    def interpolate(self, targets: Sequence[float]) -> List[Optional[Dict[str, Any]]]:
+        """Portafogli di frontiera per i target, interpolando tra corner adiacenti.
+
+        Restituisce None per i target al di fuori del tratto efficiente.
+        """
+        if not self.corners:
+            self.solve()
+        returns = np.array([c["return"] for c in self.corners])
+        weights = np.array([c["weights"] for c in self.corners])
+        targets = np.asarray(targets, dtype=float)
+
+        # I corner sono ordinati per rendimento decrescente:
+        # si lavora sull'ordine crescente
+        asc_returns = returns[::-1]
+        asc_weights = weights[::-1]
+        valid = (targets >= asc_returns[0] - self.tol) & (
+            targets <= asc_returns[-1] + self.tol
+        )
+        idx = np.clip(
+            np.searchsorted(asc_returns, targets, side="left"),
+            1,
+            max(len(asc_returns) - 1, 1),
+        )
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for target, k, ok in zip(targets, idx, valid):
+            if not ok:
+                results.append(None)
+                continue
+            if len(asc_returns) == 1:
+                w = asc_weights[0].copy()
+            else:
+                r0, r1 = asc_returns[k - 1], asc_returns[k]
+                t = 0.0 if r1 - r0 <= self.tol else (target - r0) / (r1 - r0)
+                w = asc_weights[k - 1] + min(max(t, 0.0), 1.0) * (
+                    asc_weights[k] - asc_weights[k - 1]
+                )
+            results.append(
+                {
+                    "weights": w,
+                    "return": float(target),
+                    "volatility": float(np.sqrt(max(w @ self.cov @ w, 0.0))),
+                }
+            )
+        return results
@@ -0,0 +1,199 @@
+"""Frontiera media-CVaR con la formulazione lineare di Rockafellar-Uryasev.
+
+Sugli scenari storici r_t (T x n) il CVaR al livello ``confidence`` è
+
+    min  zeta + 1 / ((1 - confidence) T) sum_t u_t
+    s.t. u_t >= -r_t'w - zeta,  u_t >= 0
+         1'w = 1,  mu'w = target,  lower <= w <= upper
+
+con zeta (il VaR all'ottimo) libero. Le variabili sono [w, zeta, u]: la matrice
+dei vincoli è sparsa (il blocco degli scenari è [-R, -1, -I]) e cresce
+linearmente con T.
+
+Il problema viene costruito una volta sola in HiGHS (``highspy``): il primo
+target è risolto con il punto interno e crossover, per i successivi cambia
+solo il termine noto del vincolo di rendimento e il simplesso riparte dalla
+base ottima del target precedente invece di risolvere da zero. Se ``highspy``
+non è disponibile ogni target viene risolto con ``scipy.optimize.linprog``
+(HiGHS senza riavvio a caldo).
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+# Violazioni dei vincoli tollerate nella soluzione (tolleranza primale di HiGHS)
+_FEASIBILITY = 1e-7
+
+
+def cvar_lp(
+    returns: np.ndarray,
+    mu: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    confidence: float,
+) -> Dict[str, Any]:
+    """Costo, vincoli (CSC; righe: budget, rendimento, scenari) e bound del LP."""
+    n_scenarios, n_assets = returns.shape
+    cost = np.concatenate(
+        (
+            [0.0] * n_assets,
+            [1.0],
+            np.full(n_scenarios, 1.0 / ((1.0 - confidence) * n_scenarios)),
+        )
+    )
+    scenarios = sp.hstack(
+        [
+            sp.csr_matrix(-returns),
+            sp.csr_matrix(-np.ones((n_scenarios, 1))),
+            -sp.identity(n_scenarios, format="csr"),
+        ]
+    )
+    budget = sp.csr_matrix(
+        np.concatenate((np.ones(n_assets), np.zeros(n_scenarios + 1)))[None, :]
+    )
+    target = sp.csr_matrix(np.concatenate((mu, np.zeros(n_scenarios + 1)))[None, :])
+    return {
+        "cost": cost,
+        "A": sp.vstack([budget, target, scenarios], format="csc"),
+        "row_lower": np.concatenate(([1.0, 0.0], np.full(n_scenarios, -np.inf))),
+        "row_upper": np.concatenate(([1.0, 0.0], np.zeros(n_scenarios))),
+        "col_lower": np.concatenate((lower, [-np.inf], np.zeros(n_scenarios))),
+        "col_upper": np.concatenate((upper, [np.inf], np.full(n_scenarios, np.inf))),
+    }
+
+
+def _highs_solver(lp: Dict[str, Any]) -> Callable[[float], tuple]:
+    """Modello HiGHS costruito una volta: ogni chiamata cambia solo il target."""
+    import highspy
+
+    model = highspy.HighsLp()
+    A = lp["A"]
+    model.num_col_, model.num_row_ = A.shape[1], A.shape[0]
+    model.col_cost_ = lp["cost"]
+    model.col_lower_, model.col_upper_ = lp["col_lower"], lp["col_upper"]
+    model.row_lower_, model.row_upper_ = lp["row_lower"], lp["row_upper"]
+    model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    model.a_matrix_.start_ = A.indptr
+    model.a_matrix_.index_ = A.indices
+    model.a_matrix_.value_ = A.data
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    # Senza base il punto interno (con crossover) è più rapido del simplesso
+    highs.setOptionValue("solver", "ipm")
+    highs.passModel(model)
+
+    def solve(target: float) -> tuple:
+        highs.changeRowBounds(1, float(target), float(target))
+        highs.run()
+        if highs.getBasis().valid:
+            highs.setOptionValue("solver", "simplex")
+        status = highs.getModelStatus()
+        info = highs.getInfo()
+        x = (
+            np.asarray(highs.getSolution().col_value)
+            if status == highspy.HighsModelStatus.kOptimal
+            else None
+        )
+        iterations = (
+            info.simplex_iteration_count
+            + max(info.ipm_iteration_count, 0)
+            + max(info.crossover_iteration_count, 0)
+        )
+        return x, highs.modelStatusToString(status).lower(), iterations
+
+    return solve
+
+
+def _linprog_solver(lp: Dict[str, Any]) -> Callable[[float], tuple]:
+    """Un LP indipendente per target con ``scipy.optimize.linprog``."""
+    A = lp["A"].tocsr()
+    bounds = np.column_stack([lp["col_lower"], lp["col_upper"]])
+
+    def solve(target: float) -> tuple:
+        result = linprog(
+            lp["cost"],
+            A_ub=A[2:],
+            b_ub=lp["row_upper"][2:],
+            A_eq=A[:2],
+            b_eq=np.array([1.0, target]),
+            bounds=bounds,
+            method="highs",
+        )
+        if result.status != 0:
+            return None, result.message.lower(), int(result.nit)
+        return result.x, "optimal", int(result.nit)
+
+    return solve
+
+
+def solve_cvar_frontier(
+    returns: np.ndarray,
+    targets: Sequence[float],
+    lower: float | np.ndarray,
+    upper: float | np.ndarray,
+    confidence: float = 0.95,
+    mu: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """Portafogli di minimo CVaR storico per ogni target di rendimento.
+
+    ``mu`` (per default la media degli scenari) definisce il vincolo di
+    rendimento. Ogni risultato contiene pesi, CVaR e VaR per periodo (perdite
+    positive), stato, iterazioni del simplesso e tempo di risoluzione.
+    """
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("Livello di confidenza non valido: deve essere in (0, 1)")
+    returns = np.asarray(returns, dtype=float)
+    if not np.isfinite(returns).all():
+        raise ValueError(
+            "Rendimenti non finiti: pulire i dati prima del calcolo del CVaR"
+        )
+    n_assets = returns.shape[1]
+    mu = returns.mean(axis=0) if mu is None else np.asarray(mu, dtype=float)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n_assets,)).copy()
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n_assets,)).copy()
+    if lower.sum() > 1 or upper.sum() < 1:
+        raise ValueError("Vincoli sui pesi incompatibili con il vincolo di budget")
+
+    lp = cvar_lp(returns, mu, lower, upper, confidence)
+    try:
+        solve, solver = _highs_solver(lp), "highspy"
+    except ImportError:
+        solve, solver = _linprog_solver(lp), "linprog"
+
+    results = []
+    warm = False
+    for target in targets:
+        start = time.perf_counter()
+        x, status, iterations = solve(target)
+        result = {
+            "success": x is not None,
+            "target": float(target),
+            "status": status,
+            "iterations": iterations,
+            # La base riusata è quella del target precedente solo se era ottimo
+            "warm_start": warm,
+            "solver": solver,
+            "elapsed": time.perf_counter() - start,
+        }
+        if x is not None:
+            w = x[:n_assets]
+            outside = (w < lower - _FEASIBILITY) | (w > upper + _FEASIBILITY)
+            # Si tagliano solo gli sforamenti numerici: il vincolo di budget e
+            # quello di rendimento devono valere sui pesi restituiti
+            w = np.clip(w, lower, upper)
+            if (
+                outside.any()
+                or abs(w.sum() - 1.0) > _FEASIBILITY
+                or abs(mu @ w - target) > _FEASIBILITY
+            ):
+                result.update(success=False, status="pesi fuori dai vincoli")
+            else:
+                result["w"] = w
+                result["var"] = float(x[n_assets])
+                result["cvar"] = float(lp["cost"][n_assets:] @ x[n_assets:])
+        warm = solver == "highspy" and result["success"]
+        results.append(result)
+    return results
@@ -1,214 +1,891 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
-import pandas as pd 
-from pydantic import BaseModel, ConfigDict, Extra, HttpUrl, field_validator
-from sklearn.covariance import LedoitWolf
+import pandas as pd
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 from scipy.optimize import minimize, Bounds
 from utils.helpers import load_config
 from utils.logger import setup_logger
-from pathlib import Path #aggiunta per pipeline
-from pipeline import run_pipeline #aggiunta per pipeline
+from utils.metrics import Metrics, metrics as default_metrics
+from utils.cache import ResultCache, fingerprint
+from model.efficient_frontier.qp_solver import solve_frontier, solve_min_variance
+from model.efficient_frontier.critical_line import CriticalLineAlgorithm
+from model.efficient_frontier.max_sharpe import SHARPE_SOLVERS, solve_max_sharpe
+from model.efficient_frontier.parallel import EXECUTORS, map_frontier
+from model.efficient_frontier.monte_carlo import MonteCarloFrontier
+from model.efficient_frontier.resampling import resampled_frontier
+from model.efficient_frontier.cvar_frontier import solve_cvar_frontier
+from model.covariance.estimators import COVARIANCE_ESTIMATORS, estimate_covariance
+from model.covariance.online import OnlineCovarianceEstimator
+from model.covariance.factor_model import FactorRiskModel
+from model.performance.portfolio_analytics import batch_portfolio_statistics
+from model.performance.risk_metrics import batch_risk_metrics
+from model.performance.backtest import walk_forward_backtest
+from data_pipelines.price_store import PriceStore
 
 logger = setup_logger(name=__name__)
 
+
 class CovarianceConfig(BaseModel):
-    method: str = 'ledoit-wolf'
+    method: str = "ledoit-wolf"
     shrinkage: float | None = None
-    shrinkage_target: str = 'constant_variance'
+    shrinkage_target: str = "constant_variance"
+    halflife: float = 60.0
+    n_factors: int = 3
+    representation: str = "dense"
 
-    @field_validator('method')
+    @field_validator("method")
     @classmethod
     def validate_method(cls, value: str) -> str:
-        if value not in ['ledoit-wolf', 'empirical']:
+        if value not in COVARIANCE_ESTIMATORS:
             raise ValueError("Metodo di stima della matrice di covarianza non valido")
         return value
 
-    @field_validator('shrinkage_target')
+    @field_validator("shrinkage")
+    @classmethod
+    def validate_shrinkage(cls, value: float | None) -> float | None:
+        if value is not None and not 0 <= value <= 1:
+            raise ValueError("Intensità di shrinkage non valida")
+        return value
+
+    @field_validator("halflife", "n_factors")
+    @classmethod
+    def validate_positive(cls, value: float) -> float:
+        if value <= 0:
+            raise ValueError("Parametro dello stimatore di covarianza non valido")
+        return value
+
+    @field_validator("shrinkage_target")
     @classmethod
     def validate_target(cls, value: str) -> str:
-        if value not in ['constant_variance', 'single_factor', 'constant_correlation']:
+        if value not in ["constant_variance", "single_factor", "constant_correlation"]:
             raise ValueError("Target di shrinkage non valido")
         return value
-    
+
+    @field_validator("representation")
+    @classmethod
+    def validate_representation(cls, value: str) -> str:
+        if value not in ["dense", "factor"]:
+            raise ValueError("Rappresentazione della matrice di covarianza non valida")
+        return value
+
+    @model_validator(mode="after")
+    def validate_factor_representation(self) -> "CovarianceConfig":
+        if self.representation == "factor" and self.method != "factor":
+            raise ValueError(
+                "La rappresentazione a fattori richiede il metodo 'factor'"
+            )
+        return self
+
+
 class OptimizationConfig(BaseModel):
     min_weight: float = 0.05
     max_weight: float = 0.3
-    target_return: Dict[str, float] = {'min': 0.005, 'max': 0.015, 'step': 20}
+    target_return: Dict[str, float] = {"min": 0.005, "max": 0.015, "step": 20}
     risk_free_rate: float = 0.02
+    solver: str = "active-set"
+    sharpe_solver: str = "active-set"
+    frontier_method: str = "grid"
+    executor: str = "serial"
+    workers: Optional[int] = None
 
-    @field_validator('min_weight', 'max_weight')
+    @field_validator("min_weight", "max_weight")
     @classmethod
     def validate_weights(cls, value: float) -> float:
         if value < 0 or value > 1:
             raise ValueError("Pesi non validi")
         return value
-    
-    @field_validator('target_return')
+
+    @field_validator("target_return")
     @classmethod
     def validate_return(cls, value: Dict[str, float]) -> Dict[str, float]:
-        if value['min'] > value['max']:
+        if value["min"] > value["max"]:
             raise ValueError("Target di ritorno non validi")
         return value
-    
-    @field_validator('risk_free_rate')
+
+    @field_validator("risk_free_rate")
     @classmethod
     def validate_rate(cls, value: float) -> float:
         if value < 0:
             raise ValueError("Tasso di rendimento privo di rischio non valido")
         return value
-    
+
+    @field_validator("solver")
+    @classmethod
+    def validate_solver(cls, value: str) -> str:
+        if value not in ["slsqp", "active-set"]:
+            raise ValueError("Solver di ottimizzazione non valido")
+        return value
+
+    @field_validator("sharpe_solver")
+    @classmethod
+    def validate_sharpe_solver(cls, value: str) -> str:
+        if value not in SHARPE_SOLVERS:
+            raise ValueError("Solver per il massimo Sharpe ratio non valido")
+        return value
+
+    @field_validator("frontier_method")
+    @classmethod
+    def validate_frontier_method(cls, value: str) -> str:
+        if value not in ["grid", "cla", "warm-start"]:
+            raise ValueError("Metodo di calcolo della frontiera non valido")
+        return value
+
+    @field_validator("executor")
+    @classmethod
+    def validate_executor(cls, value: str) -> str:
+        if value not in EXECUTORS:
+            raise ValueError("Executor non valido")
+        return value
+
+    @model_validator(mode="after")
+    def validate_process_solver(self) -> "OptimizationConfig":
+        if self.executor == "process" and self.solver != "active-set":
+            raise ValueError("L'executor a processi richiede il solver active-set")
+        return self
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    path: Optional[Path] = None
+    max_entries: int = 32
+    max_bytes: int = 256 * 2**20
+
+    @field_validator("max_entries", "max_bytes")
+    @classmethod
+    def validate_size(cls, value: int) -> int:
+        if value <= 0:
+            raise ValueError("Dimensione della cache non valida")
+        return value
+
+
 class ModelConfig(BaseModel):
     covariance: CovarianceConfig
     optimization: OptimizationConfig
-    model_config = ConfigDict(extra=Extra.forbid)
-    
+    cache: CacheConfig = CacheConfig()
+    model_config = ConfigDict(extra="forbid")
+
+
 class MarkowitzOptimizer:
-    def __init__(self, returns: pd.DataFrame, config_path: Path = Path('parameters/model_parameters.yaml')):
-        self.returns = returns 
-        self.config = self._load_config(config_path)
-        self.expected_returns = self.returns.mean()
-        self.cov_matrix = self._calculate_covariance()
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        config_path: Path = Path("parameters/model_parameters.yaml"),
+        config: Optional[ModelConfig] = None,
+        estimator: Optional[OnlineCovarianceEstimator] = None,
+        risk_model: Optional[FactorRiskModel] = None,
+        metrics: Optional[Metrics] = None,
+        cache: Optional[ResultCache] = None,
+    ):
+        self.returns = returns
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.config = config if config is not None else self._load_config(config_path)
+        self.cache = cache if cache is not None else self._build_cache()
+        if estimator is not None and risk_model is not None:
+            raise ValueError(
+                "Stimatore online e modello a fattori non possono essere usati insieme"
+            )
+        self.estimator = estimator
+        self.risk_model = risk_model
+        self._refresh_moments()
+
+    @classmethod
+    def from_price_store(
+        cls,
+        store_path: Path,
+        tickers: Optional[List[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        field: str = "Close",
+        **kwargs: Any,
+    ) -> "MarkowitzOptimizer":
+        """Ottimizzatore sui rendimenti logaritmici dell'archivio dei prezzi."""
+        prices = (
+            PriceStore(store_path).read(field, tickers, start, end).ffill().dropna()
+        )
+        logger.info(
+            f"Prezzi caricati dall'archivio {store_path}: {prices.shape[0]} date, "
+            f"{prices.shape[1]} ticker"
+        )
+        values = prices.to_numpy()
+        returns = pd.DataFrame(
+            np.log(values[1:] / values[:-1]),
+            index=prices.index[1:],
+            columns=prices.columns,
+        )
+        return cls(returns, **kwargs)
+
+    def _refresh_moments(self) -> None:
+        self._data_fingerprint = None
+        if (
+            self.risk_model is not None
+            or self.config.covariance.representation == "factor"
+        ):
+            self._refresh_factor_moments()
+            return
+        if self.estimator is not None:
+            logger.info(
+                "Stime di media e covarianza dallo stimatore online "
+                f"({self.estimator.n_observations} osservazioni)"
+            )
+            self.expected_returns = pd.Series(
+                self.estimator.mean, index=self.returns.columns
+            )
+            self.cov_matrix = pd.DataFrame(
+                self.estimator.covariance,
+                index=self.returns.columns,
+                columns=self.returns.columns,
+            )
+        else:
+            self.expected_returns = self.returns.mean()
+            self.cov_matrix = self._calculate_covariance()
         self._validate_inputs()
+        self._mu = self.expected_returns.to_numpy()
+        self._cov = self.cov_matrix.to_numpy()
+
+    def _refresh_factor_moments(self) -> None:
+        """mu e S = B F B' + D senza matrice densa (cov_matrix resta None)."""
+        if self.risk_model is not None:
+            model = self.risk_model
+        else:
+            with self.metrics.timer("covariance_fit_seconds", method="factor"):
+                model = FactorRiskModel.from_returns(
+                    self.returns.to_numpy(), self.config.covariance.n_factors
+                )
+        if model.shape != (len(self.returns.columns), len(self.returns.columns)):
+            raise ValueError("Modello a fattori non valido")
+        logger.info(
+            f"Modello di rischio a {model.n_factors} fattori su {model.shape[0]} asset"
+        )
+        self.expected_returns = self.returns.mean()
+        self.cov_matrix = None
+        self._mu = self.expected_returns.to_numpy()
+        self._cov = model
+
+    def _dense_cov(self) -> np.ndarray:
+        """Matrice di covarianza densa, materializzata solo se richiesta."""
+        if isinstance(self._cov, FactorRiskModel):
+            logger.warning(
+                "Materializzazione della matrice di covarianza densa dal modello a "
+                "fattori"
+            )
+            return self._cov.to_dense()
+        return self._cov
+
+    def update(self, new_returns: pd.DataFrame) -> None:
+        """Aggiunge nuovi rendimenti (aggiornamento incrementale se online)."""
+        logger.info(f"Aggiornamento con {len(new_returns)} nuove osservazioni")
+        new_returns = new_returns[self.returns.columns]
+        self.returns = pd.concat([self.returns, new_returns])
+        if self.estimator is not None:
+            self.estimator.update(new_returns)
+        self._refresh_moments()
 
     def _load_config(self, config_path: Path) -> Dict[str, Any]:
         raw_config = load_config(config_path)
         logger.info(f"Configurazione caricata da: {config_path}")
         return ModelConfig(**raw_config)
 
+    def _build_cache(self) -> Optional[ResultCache]:
+        settings = self.config.cache
+        if not settings.enabled:
+            return None
+        if settings.path is not None:
+            logger.info(f"Cache dei risultati su disco in {settings.path}")
+        return ResultCache(settings.max_entries, settings.path, settings.max_bytes)
+
+    def _cache_key(self, kind: str, *parts: Any) -> str:
+        """Impronta di rendimenti, sorgenti delle stime e parametri."""
+        if self._data_fingerprint is None:
+            sources = []
+            if self.estimator is not None:
+                sources = [self.estimator.mean, self.estimator.covariance]
+            elif self.risk_model is not None:
+                sources = [
+                    self.risk_model.loadings,
+                    self.risk_model.specific,
+                    self.risk_model.factor_cov,
+                ]
+            self._data_fingerprint = fingerprint(self.returns, *sources)
+        return fingerprint(kind, self._data_fingerprint, *parts)
+
+    def _cached(self, kind: str, compute: Callable[[], Any], *parts: Any) -> Any:
+        """Risultato dalla cache se presente, altrimenti calcolato e memorizzato."""
+        if self.cache is None:
+            return compute()
+        key = self._cache_key(kind, *parts)
+        value = self.cache.get(key)
+        if value is not None:
+            self.metrics.increment("cache_hits", kind=kind)
+            logger.info(f"Risultato {kind} letto dalla cache")
+            return value
+        self.metrics.increment("cache_misses", kind=kind)
+        value = compute()
+        self.cache.put(key, value)
+        return value
+
+    def _optimization_parameters(self) -> str:
+        # executor e workers non cambiano i risultati
+        return self.config.optimization.model_dump_json(exclude={"executor", "workers"})
+
     def _calculate_covariance(self) -> pd.DataFrame:
+        return self._cached(
+            "covariance", self._estimate_covariance, self.config.covariance
+        )
+
+    def _estimate_covariance(self) -> pd.DataFrame:
         logger.info("Stima della matrice di covarianza")
-        if self.config.covariance.method == 'ledoit-wolf':
-            lw = LedoitWolf(
-                assume_centered=False,
-                block_size=1000,
-                #shrinkage_=self.config.covariance.shrinkage
-                #shrinkage=self.config.covariance.shrinkage_target
-            )
-
-            lw.fit(self.returns)
-            logger.info("Matrice di covarianza stimata con Ledoit-Wolf")
-            return pd.DataFrame(lw.covariance_, index=self.returns.columns, columns=self.returns.columns)
-        return self.returns.cov()
-    
+        with self.metrics.timer(
+            "covariance_fit_seconds", method=self.config.covariance.method
+        ):
+            covariance = estimate_covariance(
+                self.returns.to_numpy(), self.config.covariance
+            )
+        logger.info(
+            f"Matrice di covarianza stimata con metodo {self.config.covariance.method}"
+        )
+        return pd.DataFrame(
+            covariance, index=self.returns.columns, columns=self.returns.columns
+        )
+
     def _validate_inputs(self):
         logger.info("Validazione dei dati di input")
-        if self.cov_matrix.shape != (len(self.returns.columns), len(self.returns.columns)):
+        if self.cov_matrix.shape != (
+            len(self.returns.columns),
+            len(self.returns.columns),
+        ):
             raise ValueError("Matrice di covarianza non valida")
         if not np.allclose(self.cov_matrix, self.cov_matrix.T):
             raise ValueError("Matrice di covarianza non simmetrica")
-        
+
     def _portfolio_return(self, weights: np.array) -> float:
-        logger.info("Calcolo del rendimento atteso del portafoglio")
-        return np.dot(weights, self.expected_returns)
-    
+        return np.dot(weights, self._mu)
+
     def _portfolio_volatility(self, weights: np.array) -> float:
-        logger.info("Portafoglio di volatilità calcolata")
-        return np.sqrt(weights.T @ self.cov_matrix @ weights)
-    
+        return np.sqrt(weights @ self._cov @ weights)
+
+    def _record_solver(self, result, solver: str, problem: str) -> None:
+        """Valutazioni e iterazioni di un risultato di scipy.optimize."""
+        self.metrics.increment(
+            "objective_evaluations", result.nfev, solver=solver, problem=problem
+        )
+        self.metrics.increment(
+            "gradient_evaluations", result.njev, solver=solver, problem=problem
+        )
+        self.metrics.increment(
+            "solver_iterations", result.nit, solver=solver, problem=problem
+        )
+
+    def metrics_report(self) -> str:
+        """Metriche di prestazione raccolte finora, in formato testuale Prometheus."""
+        return self.metrics.to_prometheus()
+
+    def portfolio_statistics(self, weights: np.ndarray) -> Dict[str, np.ndarray]:
+        """Statistiche per una matrice di pesi (k x n), vettorizzate."""
+        return batch_portfolio_statistics(
+            weights,
+            self._mu,
+            self._cov,
+            self.config.optimization.risk_free_rate,
+        )
+
+    def risk_metrics(
+        self,
+        weights: Optional[np.ndarray] = None,
+        confidence: float = 0.95,
+        periods_per_year: int = 252,
+        log_returns: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """VaR/CVaR storici e parametrici, drawdown, Sortino, Calmar e contributi.
+
+        ``weights`` è una matrice (k x n); per default vengono valutati tutti i
+        portafogli della frontiera efficiente in un unico passaggio vettorizzato.
+        """
+        if weights is None:
+            frontier = self.efficient_frontier()
+            if not frontier:
+                raise ValueError(
+                    "Frontiera efficiente vuota: nessun portafoglio da valutare"
+                )
+            weights = np.array([portfolio["weights"] for portfolio in frontier])
+        with self.metrics.timer("risk_metrics_seconds"):
+            result = batch_risk_metrics(
+                weights,
+                self.returns.to_numpy(),
+                cov=self._cov,
+                confidence=confidence,
+                risk_free_rate=self.config.optimization.risk_free_rate,
+                periods_per_year=periods_per_year,
+                log_returns=log_returns,
+            )
+        logger.info(
+            f"Metriche di rischio calcolate per {len(result['returns'])} portafogli "
+            f"(confidenza {confidence:.0%})"
+        )
+        return result
+
     def efficient_frontier(self) -> List[Dict[str, Any]]:
+        return self._cached(
+            "efficient_frontier",
+            self._compute_efficient_frontier,
+            self.config.covariance,
+            self._optimization_parameters(),
+        )
+
+    def _compute_efficient_frontier(self) -> List[Dict[str, Any]]:
         logger.info("Calcolo della frontiera efficiente")
         targets = np.linspace(
-            self.config.optimization.target_return['min'],
-            self.config.optimization.target_return['max'],
-            self.config.optimization.target_return['step']
+            self.config.optimization.target_return["min"],
+            self.config.optimization.target_return["max"],
+            int(self.config.optimization.target_return["step"]),
         )
         logger.info(f"Target di ritorno: {targets}")
 
+        if self.config.optimization.frontier_method == "cla":
+            return self._efficient_frontier_cla(targets)
+        if self.config.optimization.frontier_method == "warm-start":
+            return self._efficient_frontier_warm_start(targets)
+
         frontier = []
-        for target in targets:
-            results = self._optimize(target)
+        for target, results in zip(targets, self._solve_targets(targets)):
             logger.info(f"Risultato dell'ottimizzazione {results}")
-            if results:
+            if results["success"]:
                 logger.info(f"Ottimizzazione riuscita per target di ritorno: {target}")
-                frontier.append({
-                    'weights': results['w'],
-                    'return': target,
-                    'volatility': results['fun']
-                })
+                frontier.append(
+                    {
+                        "weights": results["w"],
+                        "return": target,
+                        "volatility": results["fun"],
+                    }
+                )
                 logger.info(f"Ottimizzazione riuscita per target di ritorno: {target}")
             else:
-                logger.warning(f"Ottimizzazione fallita per target di ritorno: {target}")
+                logger.warning(
+                    f"Ottimizzazione fallita per target di ritorno: {target}"
+                )
         return frontier
-    
+
+    def _solve_targets(self, targets: np.ndarray) -> List[Dict[str, Any]]:
+        executor = self.config.optimization.executor
+        if executor == "process":
+            logger.info(
+                "Frontiera su pool di processi "
+                f"({self.config.optimization.workers or 'auto'} worker)"
+            )
+            return map_frontier(
+                self._cov,
+                self._mu,
+                targets,
+                self.config.optimization.min_weight,
+                self.config.optimization.max_weight,
+                executor=executor,
+                workers=self.config.optimization.workers,
+            )
+        if executor == "thread":
+            with ThreadPoolExecutor(
+                max_workers=self.config.optimization.workers
+            ) as pool:
+                return list(pool.map(self._optimize, targets))
+        return [self._optimize(target) for target in targets]
+
+    def monte_carlo_frontier(
+        self,
+        n_samples: int,
+        output_path: Optional[Path] = None,
+        callback: Optional[Callable[[Dict[str, np.ndarray]], None]] = None,
+        chunk_size: int = 10_000,
+        buckets: int = 200,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        logger.info(f"Campionamento Monte Carlo di {n_samples} portafogli")
+        generator = MonteCarloFrontier(
+            self._mu,
+            self._cov,
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+            risk_free_rate=self.config.optimization.risk_free_rate,
+            chunk_size=chunk_size,
+            buckets=buckets,
+            seed=seed,
+        )
+        result = generator.run(n_samples, output_path=output_path, callback=callback)
+        logger.info(
+            "Monte Carlo completato: tasso di accettazione "
+            f"{result['acceptance_rate']:.2%}, {len(result['envelope'])} bucket"
+        )
+        return result
+
+    def resampled_frontier(
+        self,
+        n_resamples: int = 500,
+        n_points: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        n_points = n_points or int(self.config.optimization.target_return["step"])
+        logger.info(
+            f"Frontiera ricampionata: {n_resamples} repliche bootstrap, {n_points} "
+            "punti"
+        )
+        result = resampled_frontier(
+            self.returns.to_numpy(),
+            self.config.covariance,
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+            n_points=n_points,
+            n_resamples=n_resamples,
+            seed=seed,
+            risk_free_rate=self.config.optimization.risk_free_rate,
+            executor=self.config.optimization.executor,
+            workers=self.config.optimization.workers,
+        )
+        logger.info("Frontiera ricampionata calcolata")
+        return result
+
+    def cvar_frontier(self, confidence: float = 0.95) -> List[Dict[str, Any]]:
+        """Frontiera media-CVaR sugli stessi rendimenti, vincoli e target."""
+        return self._cached(
+            "cvar_frontier",
+            lambda: self._compute_cvar_frontier(confidence),
+            self._optimization_parameters(),
+            confidence,
+        )
+
+    def _compute_cvar_frontier(self, confidence: float) -> List[Dict[str, Any]]:
+        targets = np.linspace(
+            self.config.optimization.target_return["min"],
+            self.config.optimization.target_return["max"],
+            int(self.config.optimization.target_return["step"]),
+        )
+        logger.info(
+            f"Calcolo della frontiera media-CVaR ({confidence:.0%}) su "
+            f"{len(self.returns)} scenari"
+        )
+        with self.metrics.timer("cvar_frontier_seconds"):
+            results = solve_cvar_frontier(
+                self.returns.to_numpy(),
+                targets,
+                self.config.optimization.min_weight,
+                self.config.optimization.max_weight,
+                confidence=confidence,
+                mu=self._mu,
+            )
+        frontier = []
+        for result in results:
+            self.metrics.observe(
+                "frontier_point_seconds", result["elapsed"], solver=result["solver"]
+            )
+            self.metrics.increment(
+                "solver_iterations",
+                result["iterations"],
+                solver=result["solver"],
+                problem="cvar_frontier",
+            )
+            if not result["success"]:
+                logger.warning(
+                    "Ottimizzazione CVaR fallita per target di ritorno: "
+                    f"{result['target']} ({result['status']})"
+                )
+                continue
+            frontier.append(
+                {
+                    "weights": result["w"],
+                    "return": result["target"],
+                    "cvar": result["cvar"],
+                    "var": result["var"],
+                    "report": {
+                        "solver": result["solver"],
+                        "status": result["status"],
+                        "iterations": result["iterations"],
+                        "warm_start": result["warm_start"],
+                        "elapsed": result["elapsed"],
+                    },
+                }
+            )
+        if frontier:
+            volatility = self.portfolio_statistics(
+                np.array([point["weights"] for point in frontier])
+            )["volatility"]
+            for point, sigma in zip(frontier, volatility):
+                point["volatility"] = float(sigma)
+        logger.info(
+            f"Frontiera media-CVaR: {len(frontier)} punti, "
+            f"{sum(r['iterations'] for r in results)} iterazioni totali"
+        )
+        return frontier
+
+    def backtest(
+        self,
+        lookback: int = 252,
+        rebalance: int = 21,
+        window: str = "rolling",
+        objective: str = "min-variance",
+        transaction_cost: float = 0.0,
+        log_returns: bool = False,
+        chunks: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Backtest walk-forward con i vincoli e la covarianza configurati."""
+        logger.info(
+            f"Backtest walk-forward ({objective}): finestra {window} di {lookback} "
+            f"osservazioni, ribilanciamento ogni {rebalance}"
+        )
+        with self.metrics.timer("backtest_seconds", objective=objective):
+            result = walk_forward_backtest(
+                self.returns,
+                self.config.covariance,
+                self.config.optimization.min_weight,
+                self.config.optimization.max_weight,
+                lookback=lookback,
+                rebalance=rebalance,
+                window=window,
+                objective=objective,
+                risk_free_rate=self.config.optimization.risk_free_rate,
+                sharpe_solver=self.config.optimization.sharpe_solver,
+                transaction_cost=transaction_cost,
+                log_returns=log_returns,
+                executor=self.config.optimization.executor,
+                workers=self.config.optimization.workers,
+                chunks=chunks,
+            )
+        if result["failures"]:
+            logger.warning(
+                f"Ottimizzazione non riuscita in {result['failures']} finestre: "
+                "mantenuta l'allocazione precedente"
+            )
+        if result["fallbacks"]:
+            logger.warning(
+                f"Massimo Sharpe Ratio con SLSQP in {result['fallbacks']} finestre"
+            )
+        logger.info(
+            f"Backtest completato: {result['windows']} ribilanciamenti in "
+            f"{result['elapsed']:.2f}s, "
+            f"volatilità annualizzata {result['annualized_volatility']:.2%}, massimo "
+            f"drawdown {result['max_drawdown']:.2%}"
+        )
+        return result
+
+    def corner_portfolios(self) -> List[Dict[str, Any]]:
+        logger.info("Calcolo dei corner portfolio con la Critical Line Algorithm")
+        cla = CriticalLineAlgorithm(
+            self._mu,
+            self._dense_cov(),
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+        )
+        corners = cla.solve()
+        logger.info(f"Corner portfolio calcolati: {len(corners)}")
+        return corners
+
+    def _efficient_frontier_cla(self, targets: np.ndarray) -> List[Dict[str, Any]]:
+        cla = CriticalLineAlgorithm(
+            self._mu,
+            self._dense_cov(),
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+        )
+        cla.solve()
+        frontier = []
+        for target, point in zip(targets, cla.interpolate(targets)):
+            if point is None:
+                logger.warning(
+                    f"Target di ritorno fuori dal tratto efficiente: {target}"
+                )
+                continue
+            frontier.append(point)
+        logger.info(
+            f"Frontiera CLA: {len(frontier)} punti da {len(cla.corners)} corner "
+            "portfolio"
+        )
+        return frontier
+
+    def _efficient_frontier_warm_start(
+        self, targets: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        results = solve_frontier(
+            self._cov,
+            self._mu,
+            targets,
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+        )
+        frontier = []
+        for result in results:
+            self.metrics.observe(
+                "frontier_point_seconds", result["elapsed"], solver="warm-start"
+            )
+            self.metrics.increment(
+                "solver_iterations",
+                result["iterations"],
+                solver="warm-start",
+                problem="frontier",
+            )
+            if not result["success"]:
+                logger.warning(
+                    "Ottimizzazione fallita per target di ritorno: "
+                    f"{result['target']} ({result['status']})"
+                )
+                continue
+            frontier.append(
+                {
+                    "weights": result["w"],
+                    "return": result["target"],
+                    "volatility": result["fun"],
+                    "report": {
+                        "status": result["status"],
+                        "iterations": result["iterations"],
+                        "warm_start": result["warm_start"],
+                        "elapsed": result["elapsed"],
+                    },
+                }
+            )
+        logger.info(
+            f"Frontiera warm-start: {len(frontier)} punti, "
+            f"{sum(r['iterations'] for r in results)} iterazioni totali"
+        )
+        return frontier
+
     def _optimize(self, target_return: float) -> Dict[str, Any]:
         logger.info(f"Ottimizzazione per target di ritorno: {target_return}")
+        with self.metrics.timer(
+            "frontier_point_seconds", solver=self.config.optimization.solver
+        ):
+            if self.config.optimization.solver == "active-set":
+                return self._optimize_active_set(target_return)
+            return self._optimize_slsqp(target_return)
+
+    def _optimize_slsqp(self, target_return: float) -> Dict[str, Any]:
+
         constraints = [
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1},
-            {'type': 'eq', 'fun': lambda w: self._portfolio_return(w) - target_return},
+            {"type": "eq", "fun": lambda w: np.sum(w) - 1},
+            {"type": "eq", "fun": lambda w: self._portfolio_return(w) - target_return},
         ]
 
-        initial_guess = self._min_varance_portfolio()
+        min_weight = self.config.optimization.min_weight
+        max_weight = self.config.optimization.max_weight
+        # Punto iniziale deterministico: minima varianza riportata nei limiti sui pesi
+        initial_guess = np.clip(self._min_varance_portfolio(), min_weight, max_weight)
+        initial_guess /= initial_guess.sum()
 
-        bounds = Bounds(
-            self.config.optimization.min_weight,
-            self.config.optimization.max_weight,
-            keep_feasible=True,
-        )
+        bounds = Bounds(min_weight, max_weight, keep_feasible=True)
 
         result = minimize(
             self._portfolio_volatility,
-            x0 = np.random.dirichlet(np.ones(len(self.returns.columns)), size=1).flatten(),
-            method='SLSQP',
+            x0=initial_guess,
+            method="SLSQP",
             bounds=bounds,
             constraints=constraints,
-            options={'maxiter': 1000, 'verbose': 0}
+            options={"maxiter": 1000},
         )
+        self._record_solver(result, "slsqp", "frontier")
         logger.info(f"Ottimizzazione completata: {result.success}")
 
+        return {"success": result.success, "w": result.x, "fun": result.fun}
+
+    def _optimize_active_set(self, target_return: float) -> Dict[str, Any]:
+        result = solve_min_variance(
+            self._cov,
+            self._mu,
+            target_return,
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+        )
+        self.metrics.increment(
+            "solver_iterations",
+            result["iterations"],
+            solver="active-set",
+            problem="frontier",
+        )
+        logger.info(
+            f"Ottimizzazione active-set completata: {result['success']} "
+            f"({result['iterations']} iterazioni)"
+        )
+        return {"success": result["success"], "w": result["w"], "fun": result["fun"]}
 
-        return {
-            'success': result.success,
-            'w': result.x,
-            'fun': result.fun
-        }
     def _min_varance_portfolio(self) -> np.array:
         logger.info("Calcolo del portafoglio a minima varianza")
         n = len(self.returns.columns)
-        constraints = [{'type': 'eq', 'fun': lambda w: np.sum(w) - 1}]
+        constraints = [{"type": "eq", "fun": lambda w: np.sum(w) - 1}]
         result = minimize(
             self._portfolio_volatility,
-            x0 = np.ones(n) / n,
-            method='SLSQP',
+            x0=np.ones(n) / n,
+            method="SLSQP",
             bounds=[(0, 1)] * n,
-            constraints=constraints
+            constraints=constraints,
         )
+        self._record_solver(result, "slsqp", "min_variance")
         return result.x
 
     def max_sharpe_ratio(self) -> Dict[str, Any]:
-        logger.info("Calcolo del massimo Sharpe Ratio")
-        def negative_sharpe(w):
-            ret = self._portfolio_return(w)
-            vol = self._portfolio_volatility(w)
-            logger.info(f"Rendimento: {ret}, Volatilità: {vol}")
-            return - (ret - self.config.optimization.risk_free_rate) / vol
-            
-        constraints = {'type': 'eq', 'fun': lambda w: np.sum(w) - 1}
-        bounds = [(self.config.optimization.min_weight, self.config.optimization.max_weight)] * len(self.returns.columns)
+        return self._cached(
+            "max_sharpe_ratio",
+            self._compute_max_sharpe_ratio,
+            self.config.covariance,
+            self._optimization_parameters(),
+        )
 
-        result = minimize(
-            negative_sharpe,
-            x0 = np.array([1/len(self.returns.columns)] * len(self.returns.columns)),
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints
+    def _compute_max_sharpe_ratio(self) -> Dict[str, Any]:
+        logger.info("Calcolo del massimo Sharpe Ratio")
+        result = solve_max_sharpe(
+            self._cov,
+            self._mu,
+            self.config.optimization.risk_free_rate,
+            self.config.optimization.min_weight,
+            self.config.optimization.max_weight,
+            method=self.config.optimization.sharpe_solver,
+        )
+        if "fallback" in result:
+            logger.warning(f"Massimo Sharpe Ratio con SLSQP: {result['fallback']}")
+        self.metrics.increment(
+            "solver_iterations",
+            result["iterations"],
+            solver=result["solver"],
+            problem="max_sharpe",
+        )
+        if "evaluations" in result:
+            self.metrics.increment(
+                "objective_evaluations",
+                result["evaluations"],
+                solver="slsqp",
+                problem="max_sharpe",
+            )
+            self.metrics.increment(
+                "gradient_evaluations",
+                result["gradient_evaluations"],
+                solver="slsqp",
+                problem="max_sharpe",
+            )
+        if not result["success"]:
+            logger.warning(
+                "Ottimizzazione del massimo Sharpe Ratio non convergente: "
+                f"{result['status']}"
+            )
+        logger.info(
+            f"Massimo Sharpe Ratio calcolato: {result['sharpe']} ({result['solver']})"
         )
-        logger.info(f"Massimo Sharpe Ratio calcolato: {-result.fun}")
         return {
-            'weights': result.x,
-            'return': self._portfolio_return(result.x),
-            'volatility': self._portfolio_volatility(result.x),
-            'sharpe_ratio': -result.fun
+            "weights": result["w"],
+            "return": result["return"],
+            "volatility": result["volatility"],
+            "sharpe_ratio": result["sharpe"],
+            "report": {
+                "solver": result["solver"],
+                "status": result["status"],
+                "iterations": result["iterations"],
+            },
         }
-    
-    if __name__ == "__main__":
+
+
+if __name__ == "__main__":
+    from pipeline import run_pipeline  # aggiunta per pipeline
+    from data_pipelines.feature_engineering import compute_returns
+
     # Parametri configurabili per la pipeline e il modello
     PIPELINE_PARAMS = {
-        'tickers': ['AAPL', 'GOOGL', 'MSFT'],
-        'input_dir': "../data/raw",
-        'output_dir': "../data/processed"
+        "tickers": ["AAPL", "GOOGL", "MSFT"],
+        "input_dir": "../data/raw",
+        "output_dir": "../data/processed",
     }
-    
+
     # 1. Esegui la pipeline di dati
     logger.info("Avvio della pipeline di dati...")
     try:
@@ -219,7 +896,7 @@ class MarkowitzOptimizer:
         raise
 
     # 2. Carica i dati puliti
-    output_path = Path(PIPELINE_PARAMS['output_dir']) / "cleaned_stocks.parquet"
+    output_path = Path(PIPELINE_PARAMS["output_dir"]) / "cleaned_stocks.parquet"
     try:
         cleaned_data = pd.read_parquet(output_path)
         logger.info(f"Dati puliti caricati da {output_path}")
@@ -228,7 +905,7 @@ class MarkowitzOptimizer:
         raise
 
     # 3. Calcola i rendimenti
-    returns = cleaned_data.pct_change().dropna()
+    returns = compute_returns(cleaned_data)
     if returns.empty:
         logger.error("Nessun dato disponibile dopo il calcolo dei rendimenti")
         raise ValueError("Dataset dei rendimenti vuoto")
@@ -237,19 +914,18 @@ class MarkowitzOptimizer:
     try:
         optimizer = MarkowitzOptimizer(returns)
         logger.info("Modello Markowitz inizializzato correttamente")
-        
+
         # Esempio: Calcola frontiera efficiente e Sharpe Ratio
         frontier = optimizer.efficient_frontier()
         max_sharpe = optimizer.max_sharpe_ratio()
-        
+
         # Esempio: Salva risultati
         results_dir = Path("../results")
         results_dir.mkdir(exist_ok=True)
-        
+
         pd.DataFrame([max_sharpe]).to_csv(results_dir / "optimal_portfolio.csv")
         logger.info(f"Risultati salvati in {results_dir}")
-        
+
     except Exception as e:
         logger.error(f"Errore durante l'ottimizzazione: {str(e)}")
         raise
-    
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""Portafoglio tangente (massimo Sharpe ratio) con vincoli di box sui pesi.
+
+Con y = kappa * w e kappa > 0 il massimo di (mu'w - rf) / sqrt(w'S w) diventa il
+problema convesso
+
+    min  y' S y
+    s.t. (mu - rf)'y = 1,  1'y = kappa,  lower kappa <= y <= upper kappa,  kappa >= 0
+
+e il portafoglio tangente è w = y / kappa. Fissato kappa il problema è quello di
+minima varianza con target r = rf + 1/kappa, quindi due metodi esatti:
+
+- ``active-set``: ricerca sul target della frontiera con il solver active-set
+  (warm start e fattore condiviso). A insieme attivo fisso i pesi sono affini
+  in r e la varianza è quadratica, quindi il massimo dello Sharpe sul tratto ha
+  forma chiusa; lo Sharpe è quasi-concavo in r > rf e un intervallo di
+  bisezione garantisce la convergenza anche ai cambi di insieme attivo;
+- ``convex``: la riformulazione risolta con cvxpy (Clarabel). Se S è un
+  ``FactorRiskModel`` la forma quadratica è ||F^(1/2)' B' y||^2 + sum(D y^2).
+
+Entrambi richiedono un portafoglio ammissibile con rendimento atteso maggiore di
+rf; altrimenti, se cvxpy non è disponibile, se la covarianza non è definita
+positiva o se il solver fallisce, si massimizza direttamente lo Sharpe ratio
+con SLSQP e gradienti analitici.
+"""
+
+from typing import Any, Dict, Optional
+import numpy as np
+from scipy.optimize import Bounds, minimize
+from model.covariance.factor_model import FactorRiskModel
+from model.efficient_frontier.qp_solver import solve_min_variance
+
+SHARPE_SOLVERS = ["active-set", "convex", "slsqp"]
+
+
+def max_feasible_return(mu: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> float:
+    """Massimo rendimento con 1'w = 1 e lower <= w <= upper."""
+    w = lower.copy()
+    budget = 1.0 - w.sum()
+    for i in np.argsort(-mu, kind="stable"):
+        step = min(upper[i] - lower[i], budget)
+        w[i] += step
+        budget -= step
+        if budget <= 0:
+            break
+    return float(mu @ w)
+
+
+def _segment(
+    cov: np.ndarray | FactorRiskModel, mu: np.ndarray, result: Dict[str, Any]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pesi w(r) = p + r d sul tratto con l'insieme attivo di ``result``."""
+    free = np.array(result["factor"].free, dtype=int)
+    p = result["w"].copy()
+    p[free] = 0.0
+    d = np.zeros_like(p)
+    if free.size < 2:
+        return result["w"].copy(), d
+    A = np.vstack([np.ones(free.size), mu[free]])
+    b0 = np.array([1.0 - p.sum(), -(mu @ p)])
+    if free.size == 2:
+        # Nessun grado di libertà oltre ai vincoli: w_F(r) = A_F^-1 (b0 + r e2)
+        p[free], d[free] = np.linalg.lstsq(
+            A, np.column_stack([b0, [0.0, 1.0]]), rcond=None
+        )[0].T
+        return p, d
+    h = result["factor"].solve((cov @ p)[free])
+    SA = result["factor"].solve(A.T)
+    M_inv = np.linalg.pinv(A @ SA)
+    # A w_F = b0 + r e2 con w_F = S_FF^-1 (A' nu - S_FB w_B)
+    p[free] = SA @ (M_inv @ (b0 + A @ h)) - h
+    d[free] = SA @ M_inv[:, 1]
+    return p, d
+
+
+def tangency_active_set(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    risk_free_rate: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    max_iter: int = 100,
+    tol: float = 1e-10,
+    warm_start: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Portafoglio tangente con ricerca sul target della frontiera (solver active-set).
+
+    ``warm_start`` (pesi e insieme attivo di una soluzione precedente, ad esempio
+    su una finestra di stima adiacente) inizializza il portafoglio a minima varianza.
+    """
+    previous = solve_min_variance(
+        cov, mu, None, lower, upper, tol=tol, warm_start=warm_start
+    )
+    if not previous["success"] and warm_start is not None:
+        previous = solve_min_variance(cov, mu, None, lower, upper, tol=tol)
+    if not previous["success"]:
+        return {
+            "success": False,
+            "w": None,
+            "status": previous["status"],
+            "iterations": previous["iterations"],
+        }
+    iterations = previous["iterations"]
+    r_high = max_feasible_return(mu, lower, upper)
+    r_low = max(float(mu @ previous["w"]), risk_free_rate)
+    r_tol = tol * max(r_high - r_low, np.finfo(float).tiny)
+    # s'(r) ha il segno di N(r) = c0 + r c1:
+    # N > 0 a sinistra del massimo, N < 0 a destra
+    target = r_low if r_low > risk_free_rate else 0.5 * (r_low + r_high)
+    status = "max_iter"
+    w = previous["w"]
+    for _ in range(max_iter):
+        result = solve_min_variance(
+            cov,
+            mu,
+            target,
+            lower,
+            upper,
+            tol=tol,
+            warm_start=previous,
+            factor=previous["factor"],
+        )
+        iterations += result["iterations"]
+        if not result["success"]:
+            # Insieme attivo ereditato degenere: nuova risoluzione a freddo
+            result = solve_min_variance(cov, mu, target, lower, upper, tol=tol)
+            iterations += result["iterations"]
+        if not result["success"]:
+            return {
+                "success": False,
+                "w": previous["w"],
+                "status": result["status"],
+                "iterations": iterations,
+            }
+        previous = result
+        w = result["w"]
+        p, d = _segment(cov, mu, result)
+        Sp, Sd = cov @ p, cov @ d
+        c0 = p @ Sp + risk_free_rate * (d @ Sp)
+        c1 = d @ Sp + risk_free_rate * (d @ Sd)
+        if c0 + target * c1 > 0:
+            r_low = target
+        else:
+            r_high = target
+        candidate = -c0 / c1 if c1 < 0 else None
+        if candidate is not None and abs(candidate - target) <= r_tol:
+            # Pesi nel punto stazionario del tratto, esatti sui vincoli di uguaglianza
+            exact = p + candidate * d
+            if np.all(exact >= lower - tol) and np.all(exact <= upper + tol):
+                w = np.clip(exact, lower, upper)
+            status = "optimal"
+            break
+        if r_high - r_low <= r_tol:
+            # Massimo su un cambio di insieme attivo
+            status = "optimal"
+            break
+        target = (
+            candidate
+            if candidate is not None and r_low < candidate < r_high
+            else 0.5 * (r_low + r_high)
+        )
+    return {
+        "success": status == "optimal",
+        "w": w,
+        "status": status,
+        "iterations": iterations,
+        "at_lower": previous["at_lower"],
+        "at_upper": previous["at_upper"],
+    }
+
+
+def _quadratic_form(cov: np.ndarray | FactorRiskModel, y: Any) -> Any:
+    import cvxpy as cp
+
+    if isinstance(cov, FactorRiskModel):
+        root = np.linalg.cholesky(cov.factor_cov)
+        return cp.sum_squares(root.T @ (cov.loadings.T @ y)) + cp.sum(
+            cp.multiply(cov.specific, cp.square(y))
+        )
+    return cp.quad_form(y, cp.psd_wrap(cov))
+
+
+def tangency_convex(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    risk_free_rate: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+) -> Dict[str, Any]:
+    """Portafoglio tangente dalla riformulazione convessa (cvxpy)."""
+    import cvxpy as cp
+
+    n = mu.shape[0]
+    y = cp.Variable(n)
+    kappa = cp.Variable(nonneg=True)
+    problem = cp.Problem(
+        cp.Minimize(_quadratic_form(cov, y)),
+        [
+            (mu - risk_free_rate) @ y == 1,
+            cp.sum(y) == kappa,
+            y >= lower * kappa,
+            y <= upper * kappa,
+        ],
+    )
+    try:
+        problem.solve()
+    except cp.error.SolverError as e:
+        return {
+            "success": False,
+            "w": None,
+            "status": f"solver error: {e}",
+            "iterations": 0,
+        }
+    iterations = problem.solver_stats.num_iters or 0
+    if (
+        problem.status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE)
+        or kappa.value is None
+        or kappa.value <= 0
+    ):
+        return {
+            "success": False,
+            "w": None,
+            "status": problem.status,
+            "iterations": iterations,
+        }
+    # Il solver conico rispetta i vincoli solo a meno della sua tolleranza:
+    # i pesi vengono riportati sulla frontiera con l'active-set al rendimento trovato
+    w = np.clip(y.value / kappa.value, lower, upper)
+    polished = solve_min_variance(cov, mu, float(mu @ w), lower, upper)
+    if polished["success"]:
+        w = polished["w"]
+        iterations += polished["iterations"]
+    return {"success": True, "w": w, "status": problem.status, "iterations": iterations}
+
+
+def tangency_slsqp(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    risk_free_rate: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    maxiter: int = 1000,
+) -> Dict[str, Any]:
+    """Massimo Sharpe ratio con SLSQP e gradienti analitici."""
+
+    def objective(w: np.ndarray) -> tuple[float, np.ndarray]:
+        Sw = cov @ w
+        vol = np.sqrt(w @ Sw)
+        excess = mu @ w - risk_free_rate
+        return -excess / vol, -(mu / vol - excess * Sw / vol**3)
+
+    # Punto iniziale deterministico e ammissibile: lower più il budget residuo in
+    # proporzione a upper - lower
+    span = upper - lower
+    x0 = lower + (1.0 - lower.sum()) * span / span.sum()
+    result = minimize(
+        objective,
+        x0=x0,
+        jac=True,
+        method="SLSQP",
+        bounds=Bounds(lower, upper),
+        constraints={
+            "type": "eq",
+            "fun": lambda w: w.sum() - 1,
+            "jac": lambda w: np.ones_like(w),
+        },
+        options={"maxiter": maxiter},
+    )
+    return {
+        "success": bool(result.success),
+        "w": np.clip(result.x, lower, upper),
+        "status": result.message,
+        "iterations": int(result.nit),
+        "evaluations": int(result.nfev),
+        "gradient_evaluations": int(result.njev),
+    }
+
+
+def solve_max_sharpe(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    risk_free_rate: float,
+    lower: float | np.ndarray,
+    upper: float | np.ndarray,
+    method: str = "active-set",
+    warm_start: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Portafoglio tangente con il metodo richiesto e fallback su SLSQP analitico.
+
+    Restituisce pesi ``w``, ``sharpe``, il ``solver`` effettivamente usato, lo
+    ``status`` e le iterazioni. ``warm_start`` è usato solo dal metodo active-set.
+    """
+    if method not in SHARPE_SOLVERS:
+        raise ValueError(f"Solver per il massimo Sharpe ratio non valido: {method}")
+    mu = np.asarray(mu, dtype=float)
+    n = mu.shape[0]
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+    if lower.sum() > 1 or upper.sum() < 1:
+        raise ValueError("Vincoli sui pesi incompatibili con il vincolo di budget")
+
+    result, fallback = None, None
+    if method != "slsqp":
+        if max_feasible_return(mu, lower, upper) <= risk_free_rate:
+            fallback = (
+                "nessun portafoglio ammissibile ha rendimento atteso "
+                "superiore al tasso privo di rischio"
+            )
+        else:
+            try:
+                if method == "active-set":
+                    result = tangency_active_set(
+                        cov, mu, risk_free_rate, lower, upper, warm_start=warm_start
+                    )
+                else:
+                    result = tangency_convex(cov, mu, risk_free_rate, lower, upper)
+                result["solver"] = method
+                if not result["success"]:
+                    fallback = f"metodo {method} non convergente ({result['status']})"
+            except ImportError:
+                fallback = "cvxpy non disponibile"
+            except np.linalg.LinAlgError:
+                fallback = "matrice di covarianza non definita positiva"
+    if result is None or fallback is not None:
+        result = dict(
+            tangency_slsqp(cov, mu, risk_free_rate, lower, upper), solver="slsqp"
+        )
+        if fallback is not None:
+            result["fallback"] = fallback
+
+    w = result["w"]
+    result["return"] = float(mu @ w)
+    result["volatility"] = float(np.sqrt(w @ (cov @ w)))
+    result["sharpe"] = (result["return"] - risk_free_rate) / result["volatility"]
+    return result
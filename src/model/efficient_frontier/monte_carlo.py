@@ -0,0 +1,189 @@
+"""Generatore Monte Carlo di portafogli casuali ammissibili con output in streaming.
+
+I portafogli vengono campionati a blocchi di dimensione fissa all'interno del box
+``lower <= w <= upper`` con somma unitaria (Dirichlet uniforme sul simplesso
+traslato, con rifiuto dei campioni fuori box). Ogni blocco viene valutato in modo
+vettorizzato e poi scritto su disco (``.npy`` memory-mapped) e/o passato a una
+callback; in memoria restano solo il blocco corrente e l'inviluppo di Pareto per
+bucket di rendimento, quindi l'occupazione non dipende dal numero di campioni.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from model.covariance.factor_model import FactorRiskModel
+from model.performance.portfolio_analytics import batch_portfolio_statistics
+
+# Colonne del file di output
+SAMPLE_COLUMNS = ["returns", "volatility", "sharpe_ratio"]
+
+
+def _extreme_return(
+    mu: np.ndarray, lower: np.ndarray, upper: np.ndarray, maximize: bool
+) -> float:
+    """Rendimento massimo (o minimo) raggiungibile nel box con budget unitario."""
+    w = lower.copy()
+    budget = 1.0 - w.sum()
+    for i in np.argsort(-mu if maximize else mu, kind="stable"):
+        step = min(upper[i] - lower[i], budget)
+        w[i] += step
+        budget -= step
+        if budget <= 0:
+            break
+    return float(w @ mu)
+
+
+class MonteCarloFrontier:
+    def __init__(
+        self,
+        mu: np.ndarray,
+        cov: np.ndarray | FactorRiskModel,
+        lower: float | np.ndarray,
+        upper: float | np.ndarray,
+        risk_free_rate: float = 0.0,
+        chunk_size: int = 10_000,
+        buckets: int = 200,
+        seed: Optional[int] = None,
+        min_acceptance: float = 1e-4,
+    ):
+        self.mu = np.asarray(mu, dtype=float)
+        self.cov = (
+            cov if isinstance(cov, FactorRiskModel) else np.asarray(cov, dtype=float)
+        )
+        n = self.mu.shape[0]
+        self.lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+        self.upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+        self.slack = 1.0 - self.lower.sum()
+        if self.slack < 0 or self.upper.sum() < 1:
+            raise ValueError("Vincoli sui pesi incompatibili con il vincolo di budget")
+        self.risk_free_rate = risk_free_rate
+        self.chunk_size = chunk_size
+        self.buckets = buckets
+        self.seed = seed
+        self.min_acceptance = min_acceptance
+        self.return_range = (
+            _extreme_return(self.mu, self.lower, self.upper, maximize=False),
+            _extreme_return(self.mu, self.lower, self.upper, maximize=True),
+        )
+
+    def _sample(self, rng: np.random.Generator, size: int) -> tuple[np.ndarray, int]:
+        """Blocco di ``size`` portafogli ammissibili e numero di estrazioni."""
+        n = self.mu.shape[0]
+        accepted: List[np.ndarray] = []
+        count, drawn = 0, 0
+        while count < size:
+            batch = max(size - count, 1024)
+            w = self.lower + self.slack * rng.dirichlet(np.ones(n), size=batch)
+            drawn += batch
+            w = w[(w <= self.upper + 1e-12).all(axis=1)]
+            if drawn >= 10 * size and (count + len(w)) / drawn < self.min_acceptance:
+                raise ValueError(
+                    "Tasso di accettazione troppo basso: box dei pesi troppo stretto "
+                    "per il campionamento"
+                )
+            accepted.append(w[: size - count])
+            count += len(accepted[-1])
+        return np.concatenate(accepted), drawn
+
+    def run(
+        self,
+        n_samples: int,
+        output_path: Optional[Path] = None,
+        callback: Optional[Callable[[Dict[str, np.ndarray]], None]] = None,
+        keep_weights: bool = False,
+    ) -> Dict[str, Any]:
+        """Campiona ``n_samples`` portafogli e restituisce l'inviluppo di Pareto.
+
+        L'inviluppo contiene, in ordine di rendimento crescente, il portafoglio a
+        volatilità minima di ogni bucket di rendimento non dominato: i bucket sotto
+        il rendimento della minima varianza campionata vengono scartati.
+
+        Se ``output_path`` è indicato, rendimento, volatilità e Sharpe di ogni
+        campione vengono scritti in un ``.npy`` (n_samples x 3) blocco per blocco.
+        La callback riceve il dizionario di statistiche di ogni blocco (più i pesi
+        se ``keep_weights``).
+        """
+        rng = np.random.default_rng(self.seed)
+        n = self.mu.shape[0]
+        r_min, r_max = self.return_range
+        width = max(r_max - r_min, np.finfo(float).eps)
+        best_vol = np.full(self.buckets, np.inf)
+        best_ret = np.full(self.buckets, np.nan)
+        best_w = np.zeros((self.buckets, n))
+
+        out = None
+        if output_path is not None:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            out = np.lib.format.open_memmap(
+                output_path,
+                mode="w+",
+                dtype=np.float64,
+                shape=(n_samples, len(SAMPLE_COLUMNS)),
+            )
+
+        drawn_total, written = 0, 0
+        while written < n_samples:
+            size = min(self.chunk_size, n_samples - written)
+            weights, drawn = self._sample(rng, size)
+            drawn_total += drawn
+            stats = batch_portfolio_statistics(
+                weights, self.mu, self.cov, self.risk_free_rate
+            )
+
+            # Inviluppo: volatilità minima per bucket di rendimento
+            bucket = np.clip(
+                ((stats["returns"] - r_min) / width * self.buckets).astype(int),
+                0,
+                self.buckets - 1,
+            )
+            order = np.lexsort((stats["volatility"], bucket))
+            first = order[np.unique(bucket[order], return_index=True)[1]]
+            improved = stats["volatility"][first] < best_vol[bucket[first]]
+            winners = first[improved]
+            best_vol[bucket[winners]] = stats["volatility"][winners]
+            best_ret[bucket[winners]] = stats["returns"][winners]
+            best_w[bucket[winners]] = weights[winners]
+
+            if out is not None:
+                out[written : written + size] = np.column_stack(
+                    [stats[c] for c in SAMPLE_COLUMNS]
+                )
+                out.flush()
+            if callback is not None:
+                chunk = {c: stats[c] for c in SAMPLE_COLUMNS}
+                if keep_weights:
+                    chunk["weights"] = weights
+                callback(chunk)
+            written += size
+
+        if out is not None:
+            del out
+
+        # Solo i bucket non dominati: volatilità minore di quella di ogni bucket a
+        # rendimento più alto
+        filled = np.flatnonzero(np.isfinite(best_vol))
+        vols = best_vol[filled]
+        higher = np.append(np.minimum.accumulate(vols[::-1])[::-1][1:], np.inf)
+        filled = filled[vols < higher]
+        envelope = [
+            {
+                "weights": best_w[b],
+                "return": float(best_ret[b]),
+                "volatility": float(best_vol[b]),
+            }
+            for b in filled
+        ]
+        return {
+            "n_samples": n_samples,
+            "acceptance_rate": n_samples / drawn_total if drawn_total else np.nan,
+            "envelope": envelope,
+            "output_path": output_path,
+        }
+
+
+def iter_samples(path: Path, chunk_size: int = 1_000_000):
+    """Legge un file di campioni memory-mapped a blocchi, senza caricarlo per intero."""
+    samples = np.load(path, mmap_mode="r")
+    for start in range(0, samples.shape[0], chunk_size):
+        yield np.asarray(samples[start : start + chunk_size])
@@ -0,0 +1,203 @@
+"""Esecuzione parallela dei punti di frontiera e degli scenari di ottimizzazione.
+
+Con l'executor a processi S, mu e la matrice dei rendimenti vengono copiati una
+sola volta in shared memory: i worker li agganciano all'avvio e i task
+trasportano solo il target o la configurazione. L'output mantiene l'ordine
+dell'input ed è identico all'esecuzione seriale.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from model.covariance.factor_model import FactorRiskModel
+from model.efficient_frontier.qp_solver import solve_min_variance
+
+EXECUTORS = ["serial", "thread", "process"]
+
+# Array in shared memory agganciati dal processo worker
+_WORKER_ARRAYS: Dict[str, np.ndarray] = {}
+_WORKER_BLOCKS: List[shared_memory.SharedMemory] = []
+
+
+class SharedArrays:
+    """Copia un insieme di array in blocchi di shared memory (context manager)."""
+
+    def __init__(self, **arrays: np.ndarray):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.specs: Dict[str, tuple] = {}
+        for name, array in arrays.items():
+            # Layout in memoria conservato: stesso ordine BLAS del caso seriale
+            order = (
+                "F"
+                if array.flags.f_contiguous and not array.flags.c_contiguous
+                else "C"
+            )
+            array = np.asarray(array, order=order)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf, order=order)[
+                ...
+            ] = array
+            self._blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str, order)
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def shared_array(name: str) -> np.ndarray:
+    """Array condiviso agganciato dal worker corrente."""
+    return _WORKER_ARRAYS[name]
+
+
+def _attach_shared(specs: Dict[str, tuple]) -> None:
+    """Initializer dei worker: aggancia gli array senza copiarli."""
+    for name, (block_name, shape, dtype, order) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _WORKER_BLOCKS.append(block)
+        _WORKER_ARRAYS[name] = np.ndarray(
+            shape, dtype=np.dtype(dtype), buffer=block.buf, order=order
+        )
+
+
+def map_tasks(
+    kind: str,
+    func: Callable,
+    items: Sequence[Any],
+    workers: Optional[int],
+    specs: Optional[Dict[str, tuple]] = None,
+) -> List[Any]:
+    """Applica ``func`` agli elementi con l'executor richiesto, preservando l'ordine.
+
+    Con l'executor a processi ``specs`` descrive gli array condivisi da agganciare
+    nei worker (vedi ``SharedArrays``); ``func`` deve essere definita a livello
+    di modulo.
+    """
+    if kind not in EXECUTORS:
+        raise ValueError(f"Executor non valido: {kind}")
+    if kind == "serial" or len(items) <= 1:
+        return [func(item) for item in items]
+    executor: Executor
+    if kind == "thread":
+        executor = ThreadPoolExecutor(max_workers=workers)
+        chunksize = 1
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach_shared, initargs=(specs or {},)
+        )
+        chunksize = max(1, len(items) // (4 * (workers or os.cpu_count() or 1)))
+    with executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def _frontier_task(task: tuple) -> Dict[str, Any]:
+    target, lower, upper = task
+    if "cov" in _WORKER_ARRAYS:
+        cov = _WORKER_ARRAYS["cov"]
+    else:
+        cov = FactorRiskModel(
+            _WORKER_ARRAYS["loadings"],
+            _WORKER_ARRAYS["specific"],
+            _WORKER_ARRAYS["factor_cov"],
+        )
+    result = solve_min_variance(cov, _WORKER_ARRAYS["mu"], target, lower, upper)
+    return {"success": result["success"], "w": result["w"], "fun": result["fun"]}
+
+
+def map_frontier(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    targets: Iterable[float],
+    lower: float,
+    upper: float,
+    executor: str = "serial",
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Risolve i punti di frontiera (solver active-set) con l'executor richiesto.
+
+    Con un ``FactorRiskModel`` vengono condivisi solo B, D e F, non la matrice densa.
+    """
+    tasks = [(float(target), lower, upper) for target in targets]
+    if executor != "process":
+
+        def task(item: tuple) -> Dict[str, Any]:
+            result = solve_min_variance(cov, mu, *item)
+            return {
+                "success": result["success"],
+                "w": result["w"],
+                "fun": result["fun"],
+            }
+
+        return map_tasks(executor, task, tasks, workers)
+    if isinstance(cov, FactorRiskModel):
+        arrays = {
+            "loadings": cov.loadings,
+            "specific": cov.specific,
+            "factor_cov": cov.factor_cov,
+        }
+    else:
+        arrays = {"cov": cov}
+    with SharedArrays(mu=mu, **arrays) as shared:
+        return map_tasks(executor, _frontier_task, tasks, workers, shared.specs)
+
+
+def _scenario_task(task: tuple) -> Dict[str, Any]:
+    index, columns, raw_config = task
+    return _run_scenario(_WORKER_ARRAYS["returns"], index, columns, raw_config)
+
+
+def _run_scenario(
+    values: np.ndarray, index: pd.Index, columns: pd.Index, raw_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    # Import locale: markowitz_optimizer importa questo modulo
+    from model.efficient_frontier.markowitz_optimizer import (
+        MarkowitzOptimizer,
+        ModelConfig,
+    )
+
+    returns = pd.DataFrame(values, index=index, columns=columns, copy=False)
+    optimizer = MarkowitzOptimizer(returns, config=ModelConfig(**raw_config))
+    return {
+        "config": raw_config,
+        "frontier": optimizer.efficient_frontier(),
+        "max_sharpe": optimizer.max_sharpe_ratio(),
+    }
+
+
+def run_scenarios(
+    returns: pd.DataFrame,
+    configs: Sequence[Any],
+    executor: str = "serial",
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Frontiera e massimo Sharpe per più configurazioni del modello.
+
+    ``configs`` contiene ``ModelConfig`` o dizionari equivalenti (ad esempio con
+    bound sui pesi o metodi di stima della covarianza diversi). I rendimenti sono
+    condivisi una sola volta; ogni task riceve solo la propria configurazione.
+    """
+    raw_configs = [
+        c.model_dump() if hasattr(c, "model_dump") else dict(c) for c in configs
+    ]
+    values = returns.to_numpy(dtype=float)
+    if executor != "process":
+        return map_tasks(
+            executor,
+            lambda raw: _run_scenario(values, returns.index, returns.columns, raw),
+            raw_configs,
+            workers,
+        )
+    with SharedArrays(returns=values) as shared:
+        tasks = [(returns.index, returns.columns, raw) for raw in raw_configs]
+        return map_tasks(executor, _scenario_task, tasks, workers, shared.specs)
@@ -0,0 +1,405 @@
+"""Solver quadratico active-set per il problema di minima varianza di Markowitz.
+
+Risolve
+
+    min  w' S w
+    s.t. 1'w = 1,  mu'w = target,  lower <= w <= upper
+
+con gradiente (2 S w) e hessiana (2 S) analitici. I vincoli di box sono gestiti
+fissando le variabili attive al bound; il sottoproblema sulle variabili libere
+viene risolto con il metodo range-space sul fattore di Cholesky del blocco libero
+di S, aggiornato (e non ricalcolato) quando l'insieme attivo cambia.
+
+Se S è un ``FactorRiskModel`` (B F B' + D) il blocco libero viene risolto con
+l'identità di Woodbury e il gradiente costa O(nk): la matrice densa n x n non
+viene mai costruita.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.linalg import solve_triangular
+from scipy.optimize import linprog
+from model.covariance.factor_model import FactorRiskModel
+
+BLAND_AFTER = 10
+
+
+def _cholesky_update(L: np.ndarray, x: np.ndarray) -> None:
+    """Aggiornamento di rango uno in place: L L' + x x'."""
+    x = x.copy()
+    for k in range(L.shape[0]):
+        r = np.hypot(L[k, k], x[k])
+        c = r / L[k, k]
+        s = x[k] / L[k, k]
+        L[k, k] = r
+        L[k + 1 :, k] = (L[k + 1 :, k] + s * x[k + 1 :]) / c
+        x[k + 1 :] = c * x[k + 1 :] - s * L[k + 1 :, k]
+
+
+class CholeskyFactor:
+    """Fattore di Cholesky L L' = S[F, F] del blocco delle variabili libere F.
+
+    Aggiunte e rimozioni di indici costano O(|F|^2) invece di una nuova
+    fattorizzazione O(|F|^3); l'ordine di ``free`` è quello delle righe di L.
+    """
+
+    def __init__(self, cov: np.ndarray, free: Iterable[int] = ()):
+        self.cov = cov
+        self.free: List[int] = [int(i) for i in free]
+        self.L = (
+            np.linalg.cholesky(cov[np.ix_(self.free, self.free)])
+            if self.free
+            else np.zeros((0, 0))
+        )
+
+    def add(self, index: int) -> None:
+        m = len(self.free)
+        column = self.cov[self.free, index]
+        row = (
+            solve_triangular(self.L, column, lower=True, check_finite=False)
+            if m
+            else np.zeros(0)
+        )
+        d2 = self.cov[index, index] - row @ row
+        if d2 <= np.finfo(float).eps * self.cov[index, index]:
+            # Perdita di definitezza numerica: si rifattorizza da zero
+            self.free.append(int(index))
+            self.L = np.linalg.cholesky(self.cov[np.ix_(self.free, self.free)])
+            return
+        L = np.zeros((m + 1, m + 1))
+        L[:m, :m] = self.L
+        L[m, :m] = row
+        L[m, m] = np.sqrt(d2)
+        self.L = L
+        self.free.append(int(index))
+
+    def remove(self, index: int) -> None:
+        k = self.free.index(index)
+        m = len(self.free)
+        trailing = self.L[k + 1 :, k + 1 :].copy()
+        _cholesky_update(trailing, self.L[k + 1 :, k])
+        L = np.zeros((m - 1, m - 1))
+        L[:k, :k] = self.L[:k, :k]
+        L[k:, :k] = self.L[k + 1 :, :k]
+        L[k:, k:] = trailing
+        self.L = L
+        self.free.pop(k)
+
+    def sync(self, free: Iterable[int]) -> None:
+        """Allinea il fattore a un nuovo insieme di variabili libere."""
+        target = [int(i) for i in free]
+        removed = [i for i in self.free if i not in set(target)]
+        added = [i for i in target if i not in set(self.free)]
+        if len(removed) + len(added) > max(len(target), 1) // 2 + 1:
+            self.free = target
+            self.L = (
+                np.linalg.cholesky(self.cov[np.ix_(target, target)])
+                if target
+                else np.zeros((0, 0))
+            )
+            return
+        for i in removed:
+            self.remove(i)
+        for i in added:
+            self.add(i)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        y = solve_triangular(self.L, rhs, lower=True, check_finite=False)
+        return solve_triangular(self.L, y, lower=True, trans="T", check_finite=False)
+
+
+class WoodburyFactor:
+    """Risolutore del blocco libero S[F, F] = B_F F B_F' + D_F di un modello a fattori.
+
+    S[F, F]^-1 r = D^-1 r - D^-1 B_F C^-1 B_F' D^-1 r, con C = F^-1 + B_F' D_F^-1 B_F
+    di dimensione k x k: ogni risoluzione costa O(|F| k^2) e aggiunte e
+    rimozioni di indici non richiedono alcuna fattorizzazione.
+    """
+
+    def __init__(self, model: FactorRiskModel, free: Iterable[int] = ()):
+        self.model = model
+        self.free: List[int] = [int(i) for i in free]
+        self._factor_precision = np.linalg.inv(model.factor_cov)
+
+    def add(self, index: int) -> None:
+        self.free.append(int(index))
+
+    def remove(self, index: int) -> None:
+        self.free.remove(index)
+
+    def sync(self, free: Iterable[int]) -> None:
+        self.free = [int(i) for i in free]
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        loadings = self.model.loadings[self.free]
+        inv_specific = 1.0 / self.model.specific[self.free]
+        if rhs.ndim == 2:
+            inv_specific = inv_specific[:, None]
+        y = inv_specific * rhs
+        capacitance = self._factor_precision + loadings.T @ (
+            loadings / self.model.specific[self.free, None]
+        )
+        return y - inv_specific * (
+            loadings @ np.linalg.solve(capacitance, loadings.T @ y)
+        )
+
+
+def make_factor(
+    cov: np.ndarray | FactorRiskModel, free: Iterable[int] = ()
+) -> CholeskyFactor | WoodburyFactor:
+    """Risolutore del blocco libero adatto alla rappresentazione di S."""
+    if isinstance(cov, FactorRiskModel):
+        return WoodburyFactor(cov, free)
+    return CholeskyFactor(cov, free)
+
+
+def _equality_constraints(
+    mu: np.ndarray, target_return: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vincoli di uguaglianza: budget e, se presente, target."""
+    n = mu.shape[0]
+    if target_return is None:
+        return np.ones((1, n)), np.array([1.0])
+    return np.vstack([np.ones(n), mu]), np.array([1.0, target_return])
+
+
+def _feasible_start(
+    A: np.ndarray, b: np.ndarray, lower: np.ndarray, upper: np.ndarray
+) -> Optional[np.ndarray]:
+    """Punto iniziale ammissibile (vertice) tramite LP di fase 1."""
+    result = linprog(
+        np.zeros(A.shape[1]),
+        A_eq=A,
+        b_eq=b,
+        bounds=np.column_stack([lower, upper]),
+        method="highs",
+    )
+    if result.status != 0:
+        return None
+    return np.clip(result.x, lower, upper)
+
+
+def _solve_kkt(
+    factor: CholeskyFactor | WoodburyFactor,
+    A_free: np.ndarray,
+    g_free: np.ndarray,
+    residual: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Passo e moltiplicatori del sottoproblema con vincoli di uguaglianza.
+
+    Risolve  S p + A' nu = -g,  A p = r  tramite complemento di Schur.
+    """
+    Sg = factor.solve(g_free)
+    SA = factor.solve(A_free.T)
+    M = A_free @ SA
+    nu = -np.linalg.pinv(M) @ (residual + A_free @ Sg)
+    p = -(Sg + SA @ nu)
+    return p, nu
+
+
+def solve_min_variance(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    target_return: Optional[float],
+    lower: float | np.ndarray,
+    upper: float | np.ndarray,
+    max_iter: Optional[int] = None,
+    tol: float = 1e-10,
+    warm_start: Optional[Dict[str, Any]] = None,
+    factor: Optional[CholeskyFactor | WoodburyFactor] = None,
+) -> Dict[str, Any]:
+    """Portafoglio a minima varianza con metodo active-set primale.
+
+    Se ``target_return`` è None viene imposto solo il vincolo di budget.
+    ``warm_start`` è il risultato di una risoluzione precedente (pesi e insieme
+    attivo); ``factor`` è il fattore (Cholesky o Woodbury) da riutilizzare, che
+    viene aggiornato in place. Restituisce un dizionario con pesi, volatilità,
+    numero di iterazioni, stato, insieme attivo finale e fattore.
+    """
+    n = mu.shape[0]
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+    max_iter = max_iter if max_iter is not None else 10 * n + 100
+    A, b = _equality_constraints(mu, target_return)
+    fixed = lower >= upper
+
+    def cold_start() -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        x = _feasible_start(A, b, lower, upper)
+        if x is None:
+            return None
+        at_lower = (x <= lower + tol) | fixed
+        at_upper = (x >= upper - tol) & ~at_lower
+        return x, at_lower, at_upper
+
+    warm = warm_start is not None and warm_start.get("w") is not None
+    if warm:
+        x = np.clip(np.array(warm_start["w"], dtype=float), lower, upper)
+        at_lower = np.array(warm_start["at_lower"]) | fixed
+        at_upper = np.array(warm_start["at_upper"]) & ~at_lower
+    else:
+        start = cold_start()
+        if start is None:
+            # Stessa struttura del risultato ordinario: solve_frontier riusa il fattore
+            return {
+                "success": False,
+                "w": None,
+                "fun": np.nan,
+                "iterations": 0,
+                "status": "infeasible",
+                "warm_start": False,
+                "at_lower": fixed.copy(),
+                "at_upper": np.zeros(n, dtype=bool),
+                "factor": factor,
+            }
+        x, at_lower, at_upper = start
+    x[at_lower] = lower[at_lower]
+    x[at_upper] = upper[at_upper]
+
+    free_mask = ~(at_lower | at_upper)
+    if factor is None:
+        factor = make_factor(cov, np.flatnonzero(free_mask))
+    else:
+        factor.sync(np.flatnonzero(free_mask))
+
+    status = "max_iter"
+    iterations = 0
+    # Passi consecutivi di lunghezza nulla: oltre BLAND_AFTER si applica la regola di
+    # Bland contro i cicli
+    degenerate = 0
+    for iterations in range(1, max_iter + 1):
+        free = np.array(factor.free, dtype=int)
+        g = cov @ x  # gradiente di 1/2 w'Sw
+        residual = b - A @ x
+        infeasible = np.max(np.abs(residual)) > tol
+        if free.size == 0:
+            p = np.zeros(0)
+            nu = -np.linalg.lstsq(A.T, g, rcond=None)[0]
+        elif free.size <= A.shape[0]:
+            # Nessun grado di libertà: il passo dipende solo dai vincoli (il KKT
+            # accumulerebbe errori di cancellazione che spostano x fuori dai
+            # vincoli di uguaglianza)
+            p = np.linalg.lstsq(
+                A[:, free],
+                residual if infeasible else np.zeros_like(residual),
+                rcond=None,
+            )[0]
+            nu = -np.linalg.lstsq(A[:, free].T, g[free], rcond=None)[0]
+        else:
+            p, nu = _solve_kkt(
+                factor,
+                A[:, free],
+                g[free],
+                residual if infeasible else np.zeros_like(residual),
+            )
+
+        if infeasible and (
+            free.size == 0 or np.max(np.abs(A[:, free] @ p - residual)) > tol
+        ):
+            # L'insieme attivo ereditato non permette di raggiungere il nuovo target:
+            # ripartenza a freddo
+            start = cold_start()
+            if start is None:
+                status = "infeasible"
+                break
+            x, at_lower, at_upper = start
+            x[at_lower] = lower[at_lower]
+            x[at_upper] = upper[at_upper]
+            factor.sync(np.flatnonzero(~(at_lower | at_upper)))
+            warm = False
+            continue
+
+        if not infeasible and (p.size == 0 or np.max(np.abs(p)) <= tol):
+            # Moltiplicatori dei bound: g = A'y + z,
+            # con z >= 0 al lower e z <= 0 all'upper
+            z = g + A.T @ nu
+            violation = np.where(at_lower & ~fixed, -z, 0.0) + np.where(
+                at_upper, z, 0.0
+            )
+            threshold = tol * max(np.max(np.abs(g)), np.finfo(float).tiny)
+            worst = int(np.argmax(violation))
+            if violation[worst] <= threshold:
+                status = "optimal"
+                break
+            if degenerate > BLAND_AFTER:
+                worst = int(np.flatnonzero(violation > threshold)[0])
+            at_lower[worst] = False
+            at_upper[worst] = False
+            factor.add(worst)
+            continue
+
+        # Ratio test sulle variabili libere
+        x_free = x[free]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(
+                p < 0,
+                (lower[free] - x_free) / p,
+                np.where(p > 0, (upper[free] - x_free) / p, np.inf),
+            )
+        blocking = int(np.argmin(ratios)) if ratios.size else 0
+        if degenerate > BLAND_AFTER and ratios.size:
+            ties = np.flatnonzero(ratios <= ratios[blocking] + tol)
+            blocking = int(ties[np.argmin(free[ties])])
+        alpha = min(1.0, max(ratios[blocking], 0.0)) if ratios.size else 1.0
+        degenerate = degenerate + 1 if alpha <= tol else 0
+        x[free] = x_free + alpha * p
+        if alpha < 1.0:
+            index = int(free[blocking])
+            if p[blocking] < 0:
+                x[index] = lower[index]
+                at_lower[index] = True
+            else:
+                x[index] = upper[index]
+                at_upper[index] = True
+            factor.remove(index)
+
+    return {
+        "success": status == "optimal",
+        "w": x,
+        "fun": float(np.sqrt(max(x @ cov @ x, 0.0))),
+        "iterations": iterations,
+        "status": status,
+        "warm_start": warm,
+        "at_lower": at_lower,
+        "at_upper": at_upper,
+        "factor": factor,
+    }
+
+
+def solve_frontier(
+    cov: np.ndarray | FactorRiskModel,
+    mu: np.ndarray,
+    targets: Sequence[float],
+    lower: float | np.ndarray,
+    upper: float | np.ndarray,
+    max_iter: Optional[int] = None,
+    tol: float = 1e-10,
+) -> List[Dict[str, Any]]:
+    """Risolve la frontiera per tutti i target in sequenza.
+
+    Ogni target parte dalla soluzione e dall'insieme attivo del precedente e
+    riusa lo stesso fattore del blocco libero; il risultato è deterministico.
+    """
+    results = []
+    factor = None
+    previous = None
+    for target in targets:
+        start = time.perf_counter()
+        result = solve_min_variance(
+            cov,
+            mu,
+            target,
+            lower,
+            upper,
+            max_iter,
+            tol,
+            warm_start=previous,
+            factor=factor,
+        )
+        result["elapsed"] = time.perf_counter() - start
+        result["target"] = float(target)
+        factor = result.get("factor", factor)
+        if result["success"]:
+            previous = result
+        results.append(result)
+    return results
@@ -0,0 +1,270 @@
+"""Backtest walk-forward delle allocazioni di Markowitz.
+
+A ogni data di ribilanciamento (ogni ``rebalance`` osservazioni dopo le prime
+``lookback``) mu e S vengono stimati sulla finestra precedente, ``rolling`` di
+``lookback`` righe o ``expanding`` dall'inizio della storia, e il portafoglio
+(minima varianza o massimo Sharpe) viene applicato ai rendimenti fuori campione
+fino al ribilanciamento successivo, lasciando derivare i pesi con i prezzi.
+
+Le finestre consecutive differiscono di poche righe, quindi:
+
+- con covarianza ``empirical`` o ``ledoit-wolf`` (target constant_variance e
+  intensità stimata) S viene aggiornata con ``OnlineCovarianceEstimator``
+  aggiungendo le righe nuove e sottraendo le uscenti, senza ristimarla;
+- il solver active-set parte dai pesi e dall'insieme attivo della finestra
+  precedente.
+
+Le date di ribilanciamento sono divise in blocchi contigui indipendenti, eseguiti
+con l'executor richiesto: ogni blocco ricostruisce la propria stima iniziale e poi
+procede in modo incrementale. Con l'executor a processi i rendimenti sono
+condivisi una sola volta in shared memory.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from model.covariance.estimators import estimate_covariance
+from model.covariance.factor_model import FactorRiskModel
+from model.covariance.online import OnlineCovarianceEstimator
+from model.efficient_frontier.max_sharpe import SHARPE_SOLVERS, solve_max_sharpe
+from model.efficient_frontier.parallel import SharedArrays, map_tasks, shared_array
+from model.efficient_frontier.qp_solver import solve_min_variance
+
+WINDOWS = ["rolling", "expanding"]
+OBJECTIVES = ["min-variance", "max-sharpe"]
+
+
+def _online_shrinkage(covariance_config: Any) -> tuple[bool, Optional[str]]:
+    """Se la stima è aggiornabile in modo incrementale e con quale shrinkage."""
+    if covariance_config.representation != "dense":
+        return False, None
+    if covariance_config.method == "empirical":
+        return True, None
+    if (
+        covariance_config.method == "ledoit-wolf"
+        and covariance_config.shrinkage_target == "constant_variance"
+        and covariance_config.shrinkage is None
+    ):
+        return True, "ledoit-wolf"
+    return False, None
+
+
+def _chunk_weights(
+    returns: np.ndarray,
+    positions: List[int],
+    covariance_config: Any,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    lookback: int,
+    window: str,
+    objective: str,
+    risk_free_rate: float,
+    sharpe_solver: str,
+) -> Dict[str, Any]:
+    """Pesi (k x n) alle date di ribilanciamento di un blocco contiguo."""
+    n = returns.shape[1]
+    online, shrinkage = _online_shrinkage(covariance_config)
+    estimator = None
+    if online:
+        estimator = OnlineCovarianceEstimator(
+            n,
+            mode=window,
+            window=lookback if window == "rolling" else None,
+            shrinkage=shrinkage,
+        )
+    consumed = None
+    previous = None
+    weights = np.empty((len(positions), n))
+    failures = fallbacks = iterations = 0
+    for k, position in enumerate(positions):
+        start = 0 if window == "expanding" else position - lookback
+        if estimator is not None:
+            estimator.update(
+                returns[start if consumed is None else consumed : position]
+            )
+            consumed = position
+            mu, cov = estimator.mean, estimator.covariance
+        else:
+            sample = returns[start:position]
+            mu = sample.mean(axis=0)
+            if covariance_config.representation == "factor":
+                cov = FactorRiskModel.from_returns(sample, covariance_config.n_factors)
+            else:
+                cov = estimate_covariance(sample, covariance_config)
+
+        if objective == "min-variance":
+            result = solve_min_variance(
+                cov, mu, None, lower, upper, warm_start=previous
+            )
+            if not result["success"] and previous is not None:
+                result = solve_min_variance(cov, mu, None, lower, upper)
+        else:
+            result = solve_max_sharpe(
+                cov,
+                mu,
+                risk_free_rate,
+                lower,
+                upper,
+                method=sharpe_solver,
+                warm_start=previous,
+            )
+            fallbacks += "fallback" in result
+        iterations += result["iterations"]
+
+        if result["success"]:
+            weights[k] = result["w"]
+            previous = result if "at_lower" in result else None
+        else:
+            # Si mantiene l'allocazione precedente (alla prima finestra lower più il
+            # budget residuo in proporzione)
+            failures += 1
+            span = upper - lower
+            weights[k] = (
+                weights[k - 1]
+                if k > 0
+                else lower + (1.0 - lower.sum()) * span / span.sum()
+            )
+    return {
+        "weights": weights,
+        "failures": failures,
+        "fallbacks": fallbacks,
+        "iterations": iterations,
+    }
+
+
+def _chunk_task(task: tuple) -> Dict[str, Any]:
+    return _chunk_weights(shared_array("returns"), *task)
+
+
+def _drawdown(returns: np.ndarray) -> np.ndarray:
+    wealth = np.cumprod(1.0 + returns)
+    return wealth / np.maximum.accumulate(np.maximum(wealth, 1.0)) - 1.0
+
+
+def walk_forward_backtest(
+    returns: pd.DataFrame,
+    covariance_config: Any,
+    lower: float | np.ndarray,
+    upper: float | np.ndarray,
+    lookback: int = 252,
+    rebalance: int = 21,
+    window: str = "rolling",
+    objective: str = "min-variance",
+    risk_free_rate: float = 0.0,
+    sharpe_solver: str = "active-set",
+    transaction_cost: float = 0.0,
+    log_returns: bool = False,
+    periods_per_year: int = 252,
+    executor: str = "serial",
+    workers: Optional[int] = None,
+    chunks: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Backtest walk-forward: pesi a ogni ribilanciamento e rendimenti fuori campione.
+
+    ``transaction_cost`` è il costo proporzionale al turnover, addebitato il
+    giorno del ribilanciamento; con ``log_returns`` i rendimenti sono convertiti
+    in semplici per la composizione del portafoglio. ``chunks`` è il numero di
+    blocchi di date eseguiti in parallelo (default: 1 in seriale, altrimenti il
+    numero di worker). Restituisce pesi, rendimenti giornalieri, turnover,
+    volatilità realizzata e drawdown.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"Tipo di finestra non valido: {window}")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Obiettivo del backtest non valido: {objective}")
+    if sharpe_solver not in SHARPE_SOLVERS:
+        raise ValueError(
+            f"Solver per il massimo Sharpe ratio non valido: {sharpe_solver}"
+        )
+    if lookback < 2 or rebalance < 1:
+        raise ValueError(
+            "La finestra di stima deve avere almeno 2 osservazioni e il "
+            "ribilanciamento almeno 1"
+        )
+    if transaction_cost < 0:
+        raise ValueError("Il costo di transazione deve essere non negativo")
+    values = returns.to_numpy(dtype=float)
+    n_periods, n = values.shape
+    if n_periods <= lookback:
+        raise ValueError(
+            f"Storia insufficiente: {n_periods} osservazioni per una finestra di "
+            f"{lookback}"
+        )
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,)).copy()
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,)).copy()
+    if lower.sum() > 1 or upper.sum() < 1:
+        raise ValueError("Vincoli sui pesi incompatibili con il vincolo di budget")
+
+    start_time = time.perf_counter()
+    positions = list(range(lookback, n_periods, rebalance))
+    if chunks is None:
+        chunks = 1 if executor == "serial" else workers or os.cpu_count() or 1
+    blocks = [
+        list(block)
+        for block in np.array_split(positions, min(chunks, len(positions)))
+        if len(block)
+    ]
+    settings = (
+        covariance_config,
+        lower,
+        upper,
+        lookback,
+        window,
+        objective,
+        risk_free_rate,
+        sharpe_solver,
+    )
+    if executor == "process":
+        with SharedArrays(returns=values) as shared:
+            results = map_tasks(
+                executor,
+                _chunk_task,
+                [(block, *settings) for block in blocks],
+                workers,
+                shared.specs,
+            )
+    else:
+        results = map_tasks(
+            executor,
+            lambda block: _chunk_weights(values, block, *settings),
+            blocks,
+            workers,
+        )
+    weights = np.vstack([result["weights"] for result in results])
+
+    # Fuori campione: buy-and-hold tra due ribilanciamenti, i pesi derivano con i prezzi
+    simple = np.expm1(values) if log_returns else values
+    portfolio = np.empty(n_periods - lookback)
+    turnover = np.empty(len(positions))
+    holdings = np.zeros(n)
+    for k, (position, w) in enumerate(zip(positions, weights)):
+        end = positions[k + 1] if k + 1 < len(positions) else n_periods
+        growth = np.cumprod(1.0 + simple[position:end], axis=0)
+        wealth = growth @ w
+        turnover[k] = np.abs(w - holdings).sum()
+        period = np.diff(wealth, prepend=1.0) / np.concatenate([[1.0], wealth[:-1]])
+        period[0] = (1.0 + period[0]) * (1.0 - transaction_cost * turnover[k]) - 1.0
+        portfolio[position - lookback : end - lookback] = period
+        holdings = w * growth[-1] / wealth[-1]
+
+    index = returns.index[lookback:]
+    dates = returns.index[positions]
+    drawdown = _drawdown(portfolio)
+    volatility = float(np.std(portfolio, ddof=1)) if portfolio.size > 1 else 0.0
+    return {
+        "weights": pd.DataFrame(weights, index=dates, columns=returns.columns),
+        "returns": pd.Series(portfolio, index=index, name="portfolio"),
+        "turnover": pd.Series(turnover, index=dates, name="turnover"),
+        "total_return": float(np.prod(1.0 + portfolio) - 1.0),
+        "volatility": volatility,
+        "annualized_volatility": volatility * np.sqrt(periods_per_year),
+        "drawdown": pd.Series(drawdown, index=index, name="drawdown"),
+        "max_drawdown": float(drawdown.min()),
+        "windows": len(positions),
+        "failures": sum(result["failures"] for result in results),
+        "fallbacks": sum(result["fallbacks"] for result in results),
+        "iterations": sum(result["iterations"] for result in results),
+        "elapsed": time.perf_counter() - start_time,
+    }
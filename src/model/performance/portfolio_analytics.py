@@ -0,0 +1,62 @@
+"""Statistiche vettorizzate per blocchi di portafogli.
+
+Tutte le funzioni lavorano su una matrice di pesi (k x n), una riga per
+portafoglio, e su mu/S come ndarray: un solo passaggio BLAS per l'intero blocco.
+S può essere anche un ``FactorRiskModel``: W S viene calcolato in O(knf) come
+(W B) F B' + W D.
+"""
+
+from typing import Dict
+import numpy as np
+
+
+def _as_weight_matrix(weights: np.ndarray, n_assets: int) -> np.ndarray:
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    if weights.ndim != 2 or weights.shape[1] != n_assets:
+        raise ValueError(
+            f"Matrice dei pesi non valida: attesa (k x {n_assets}), ricevuta "
+            f"{weights.shape}"
+        )
+    return weights
+
+
+def batch_returns(weights: np.ndarray, mu: np.ndarray) -> np.ndarray:
+    """Rendimento atteso di ogni portafoglio."""
+    return _as_weight_matrix(weights, mu.shape[0]) @ mu
+
+
+def batch_volatility(weights: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """Volatilità di ogni portafoglio: sqrt(diag(W S W'))."""
+    weights = _as_weight_matrix(weights, cov.shape[0])
+    variance = np.einsum("ij,ij->i", weights @ cov, weights)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def batch_portfolio_statistics(
+    weights: np.ndarray,
+    mu: np.ndarray,
+    cov: np.ndarray,
+    risk_free_rate: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """Rendimento, volatilità, Sharpe ratio e contributi al rischio di k portafogli.
+
+    I contributi al rischio sono quelli per componente, w_i (S w)_i / sigma,
+    e per ogni portafoglio sommano alla sua volatilità.
+    """
+    weights = _as_weight_matrix(weights, mu.shape[0])
+    marginal = weights @ cov  # (S w)' per riga, S simmetrica
+    returns = weights @ mu
+    volatility = np.sqrt(np.maximum(np.einsum("ij,ij->i", marginal, weights), 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(
+            volatility > 0, (returns - risk_free_rate) / volatility, np.nan
+        )
+        contributions = np.where(
+            volatility[:, None] > 0, weights * marginal / volatility[:, None], 0.0
+        )
+    return {
+        "returns": returns,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe,
+        "risk_contributions": contributions,
+    }
@@ -0,0 +1,131 @@
+"""Metriche di rischio vettorizzate per blocchi di portafogli (ad es. la frontiera).
+
+I rendimenti storici dei k portafogli sono un solo prodotto matriciale
+P = W R' (k x T, una riga per portafoglio); VaR e CVaR storici, drawdown,
+Sortino e Calmar sono riduzioni lungo le righe di P, senza cicli Python sui
+portafogli. VaR e CVaR sono perdite (positive) per periodo al livello
+``confidence``:
+
+- storici: con m = ceil((1 - confidence) T), il VaR è l'm-esimo rendimento
+  peggiore e il CVaR la media degli m peggiori (definizione di
+  Rockafellar-Uryasev sugli scenari);
+- parametrici: distribuzione normale con media storica e volatilità da S.
+
+I contributi al rischio sono quelli di Eulero e per ogni portafoglio sommano
+alla misura: w_i (S w)_i / sigma per la volatilità e -w_i E[r_i | coda] per
+il CVaR storico. S è la covarianza campionaria dei rendimenti o quella
+passata (anche un ``FactorRiskModel``).
+"""
+
+import math
+from typing import Any, Dict, Optional
+import numpy as np
+from scipy.stats import norm
+from model.performance.portfolio_analytics import _as_weight_matrix
+
+
+def _drawdown(portfolio: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Drawdown (<= 0) e ricchezza finale per riga di rendimenti semplici."""
+    wealth = np.cumprod(1.0 + portfolio, axis=1)
+    peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=1)
+    return wealth / peak - 1.0, wealth[:, -1]
+
+
+def historical_var_cvar(
+    portfolio: np.ndarray, confidence: float = 0.95
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """VaR e CVaR storici per riga (k x T) e indici degli scenari di coda (k x m)."""
+    n_scenarios = portfolio.shape[1]
+    m = max(1, math.ceil((1.0 - confidence) * n_scenarios - 1e-9))
+    tail = np.argpartition(portfolio, m - 1, axis=1)[:, :m]
+    losses = -np.take_along_axis(portfolio, tail, axis=1)
+    return losses.min(axis=1), losses.mean(axis=1), tail
+
+
+def parametric_var_cvar(
+    mean: np.ndarray, volatility: np.ndarray, confidence: float = 0.95
+) -> tuple[np.ndarray, np.ndarray]:
+    """VaR e CVaR di una distribuzione normale per ogni coppia (media, volatilità)."""
+    z = norm.ppf(1.0 - confidence)
+    return (
+        -(mean + z * volatility),
+        volatility * norm.pdf(z) / (1.0 - confidence) - mean,
+    )
+
+
+def batch_risk_metrics(
+    weights: np.ndarray,
+    returns: np.ndarray,
+    cov: Optional[Any] = None,
+    confidence: float = 0.95,
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = 252,
+    log_returns: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Metriche di rischio di k portafogli (pesi k x n) sui rendimenti storici (T x n).
+
+    ``risk_free_rate`` è annuo: Sortino (rispetto al tasso per periodo) e
+    Calmar (rendimento composto annualizzato / |massimo drawdown|) sono
+    annualizzati con ``periods_per_year``. Con ``log_returns`` i rendimenti
+    vengono convertiti in semplici prima di comporre i portafogli.
+    """
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("Livello di confidenza non valido: deve essere in (0, 1)")
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim != 2 or returns.shape[0] < 2:
+        raise ValueError("Servono almeno due osservazioni di rendimento (T x n)")
+    if not np.isfinite(returns).all():
+        raise ValueError(
+            "Rendimenti non finiti: pulire i dati prima del calcolo del rischio"
+        )
+    if log_returns:
+        returns = np.expm1(returns)
+    weights = _as_weight_matrix(weights, returns.shape[1])
+    n_scenarios = returns.shape[0]
+
+    portfolio = weights @ returns.T  # (k x T), righe contigue
+    mean = portfolio.mean(axis=1)
+    if cov is None:
+        cov = np.cov(returns, rowvar=False)
+    marginal = weights @ cov  # (S w)' per riga, S simmetrica
+    volatility = np.sqrt(np.maximum(np.einsum("ij,ij->i", marginal, weights), 0.0))
+
+    var_historical, cvar_historical, tail = historical_var_cvar(portfolio, confidence)
+    var_parametric, cvar_parametric = parametric_var_cvar(mean, volatility, confidence)
+
+    # Media degli scenari di coda per asset: un prodotto con la maschera (k x T)
+    in_tail = np.zeros_like(portfolio)
+    np.put_along_axis(in_tail, tail, 1.0 / tail.shape[1], axis=1)
+    cvar_contributions = -weights * (in_tail @ returns)
+
+    drawdown, final_wealth = _drawdown(portfolio)
+    max_drawdown = drawdown.min(axis=1)
+    target = risk_free_rate / periods_per_year
+    downside = np.sqrt(np.mean(np.minimum(portfolio - target, 0.0) ** 2, axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_return = (
+            np.where(final_wealth > 0, final_wealth, np.nan)
+            ** (periods_per_year / n_scenarios)
+            - 1.0
+        )
+        sortino = np.where(
+            downside > 0, (mean - target) / downside * np.sqrt(periods_per_year), np.nan
+        )
+        calmar = np.where(max_drawdown < 0, annual_return / -max_drawdown, np.nan)
+        marginal = np.where(
+            volatility[:, None] > 0, marginal / volatility[:, None], 0.0
+        )
+    return {
+        "returns": mean,
+        "volatility": volatility,
+        "var_historical": var_historical,
+        "cvar_historical": cvar_historical,
+        "var_parametric": var_parametric,
+        "cvar_parametric": cvar_parametric,
+        "max_drawdown": max_drawdown,
+        "sortino_ratio": sortino,
+        "calmar_ratio": calmar,
+        "marginal_risk": marginal,
+        "risk_contributions": weights * marginal,
+        "cvar_contributions": cvar_contributions,
+    }
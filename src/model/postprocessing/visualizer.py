@@ -1,21 +1,30 @@
-##visualizzazione grafica di risultati di ottimizzazione di portafoglio finanziario
-import matplotlib.pyplot as plt
+# visualizzazione grafica di risultati di ottimizzazione di portafoglio finanziario
 import numpy as np
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 from utils.logger import setup_logger
+from model.efficient_frontier.monte_carlo import SAMPLE_COLUMNS, iter_samples
 
 logger = setup_logger(name=__name__)
+
+
+def _pyplot():
+    """matplotlib viene importato solo al primo grafico"""
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
 class Visualizer:
-    
+
     def __init__(self, optimizer):
         self.optimizer = optimizer
 
     def plot_efficient_frontier(
-        self, 
+        self,
         output_path: Optional[Path] = None,
         figsize: tuple = (10, 6),
-        dpi: int = 100
+        dpi: int = 100,
     ) -> None:
         frontier_data = self.optimizer.efficient_frontier()
         if not frontier_data:
@@ -25,77 +34,151 @@ class Visualizer:
         sharpe_data = self.optimizer.max_sharpe_ratio()
         logger.info(f"sharpe_data: {sharpe_data}")
 
-        returns = [p['return'] for p in frontier_data]
+        returns = [p["return"] for p in frontier_data]
         logger.info(f"Ritorni: {returns}")
 
-        volatilities = [p['volatility'] for p in frontier_data]
+        volatilities = [p["volatility"] for p in frontier_data]
         logger.info(f"Ritorni: {returns}")
-        
+
+        plt = _pyplot()
         plt.figure(figsize=figsize, dpi=dpi)
-        
+
         plt.scatter(
-            volatilities, 
-            returns, 
-            c='blue', 
-            alpha=0.7,
-            label='Frontiera Efficiente'
+            volatilities, returns, c="blue", alpha=0.7, label="Frontiera Efficiente"
         )
-        logger.info(f:"scaratter: {volatilities}, {returns}")
+        logger.info(f"scaratter: {volatilities}, {returns}")
 
         plt.scatter(
-            sharpe_data['volatility'],
-            sharpe_data['return'],
-            c='red',
-            marker='*',
+            sharpe_data["volatility"],
+            sharpe_data["return"],
+            c="red",
+            marker="*",
             s=400,
-            label='Max Sharpe Ratio'
+            label="Max Sharpe Ratio",
         )
 
         rf = self.optimizer.config.optimization.risk_free_rate
         plt.plot(
-            [0, sharpe_data['volatility']],
-            [rf, sharpe_data['return']],
-            'k--',
-            label='Capital Market Line'
+            [0, sharpe_data["volatility"]],
+            [rf, sharpe_data["return"]],
+            "k--",
+            label="Capital Market Line",
         )
 
-        plt.title('Frontiera Efficiente e Capital Market Line')
-        plt.xlabel('Volatilità (Deviazione Standard)')
-        plt.ylabel('Ritorno Atteso')
+        plt.title("Frontiera Efficiente e Capital Market Line")
+        plt.xlabel("Volatilità (Deviazione Standard)")
+        plt.ylabel("Ritorno Atteso")
         plt.legend()
         plt.grid(True)
 
         if output_path:
             logger.info("Salvataggio grafico efficient frontier in %s", output_path)
-            plt.savefig(output_path, bbox_inches='tight')
+            plt.savefig(output_path, bbox_inches="tight")
             plt.close()
             logger.info(f"Grafico salvato in: {output_path}")
         else:
             plt.show()
 
     def plot_weights_distribution(
-        self, 
-        weights: Dict[str, float],
-        output_path: Optional[Path] = None
+        self, weights: Dict[str, float], output_path: Optional[Path] = None
     ) -> None:
-        
+
+        plt = _pyplot()
         plt.figure(figsize=(10, 4))
-        
+
         assets = list(weights.keys())
         values = list(weights.values())
         logger.info("Assets da plottare: %s", ", ".join(assets))
 
         plt.bar(assets, values)
-        plt.title('Distribuzione Pesi Portafoglio')
-        plt.xlabel('Asset')
-        plt.ylabel('Peso')
+        plt.title("Distribuzione Pesi Portafoglio")
+        plt.xlabel("Asset")
+        plt.ylabel("Peso")
         plt.xticks(rotation=45)
-        plt.grid(True, axis='y')
+        plt.grid(True, axis="y")
 
         if output_path:
             logger.info("Salvataggio grafico pesi portafoglio in %s", output_path)
-            plt.savefig(output_path, bbox_inches='tight')
+            plt.savefig(output_path, bbox_inches="tight")
             plt.close()
         else:
             logger.info("Visualizzazione a schermo del grafico pesi portafoglio")
-            plt.show()
\ No newline at end of file
+            plt.show()
+
+    def plot_monte_carlo(
+        self,
+        samples_path: Path,
+        envelope: Optional[List[Dict[str, Any]]] = None,
+        output_path: Optional[Path] = None,
+        bins: int = 300,
+        chunk_size: int = 1_000_000,
+        figsize: tuple = (10, 6),
+        dpi: int = 100,
+    ) -> None:
+        """Nuvola dei portafogli Monte Carlo letta a blocchi dal file di campioni.
+
+        La nuvola viene resa come istogramma 2D accumulato blocco per blocco, così
+        la memoria resta costante anche con milioni di campioni.
+        """
+        ret_col = SAMPLE_COLUMNS.index("returns")
+        vol_col = SAMPLE_COLUMNS.index("volatility")
+
+        # Primo passaggio: estremi degli assi
+        vol_range = [np.inf, -np.inf]
+        ret_range = [np.inf, -np.inf]
+        for chunk in iter_samples(samples_path, chunk_size):
+            vol_range = [
+                min(vol_range[0], chunk[:, vol_col].min()),
+                max(vol_range[1], chunk[:, vol_col].max()),
+            ]
+            ret_range = [
+                min(ret_range[0], chunk[:, ret_col].min()),
+                max(ret_range[1], chunk[:, ret_col].max()),
+            ]
+        if not np.isfinite(vol_range[0]):
+            logger.error(f"File dei campioni Monte Carlo vuoto: {samples_path}")
+            raise ValueError("Nessun campione Monte Carlo disponibile")
+
+        # Secondo passaggio: istogramma cumulato
+        density = np.zeros((bins, bins))
+        for chunk in iter_samples(samples_path, chunk_size):
+            counts, _, _ = np.histogram2d(
+                chunk[:, vol_col],
+                chunk[:, ret_col],
+                bins=bins,
+                range=[vol_range, ret_range],
+            )
+            density += counts
+        logger.info(f"Campioni Monte Carlo rappresentati: {int(density.sum())}")
+
+        plt = _pyplot()
+        plt.figure(figsize=figsize, dpi=dpi)
+        plt.imshow(
+            np.ma.masked_equal(density.T, 0),
+            origin="lower",
+            aspect="auto",
+            extent=[*vol_range, *ret_range],
+            cmap="viridis",
+        )
+        plt.colorbar(label="Numero di portafogli")
+
+        if envelope:
+            plt.plot(
+                [p["volatility"] for p in envelope],
+                [p["return"] for p in envelope],
+                "r-",
+                label="Inviluppo Monte Carlo",
+            )
+            plt.legend()
+
+        plt.title("Portafogli casuali Monte Carlo")
+        plt.xlabel("Volatilità (Deviazione Standard)")
+        plt.ylabel("Ritorno Atteso")
+        plt.grid(True)
+
+        if output_path:
+            logger.info(f"Salvataggio grafico Monte Carlo in: {output_path}")
+            plt.savefig(output_path, bbox_inches="tight")
+            plt.close()
+        else:
+            plt.show()
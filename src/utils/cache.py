@@ -0,0 +1,152 @@
+"""Cache LRU dei risultati in memoria e, opzionalmente, su disco.
+
+Le chiavi sono impronte SHA-256 dei dati e della configurazione (``fingerprint``):
+un risultato viene riusato solo se rendimenti e parametri sono identici. Su
+disco ogni voce è un file pickle scritto in modo atomico; l'ordine LRU segue la
+data di modifica (aggiornata a ogni lettura) e le voci meno recenti vengono
+eliminate quando la dimensione totale supera ``max_bytes``.
+"""
+
+import copy
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger(name=__name__)
+
+SUFFIX = ".pkl"
+
+
+def _update(digest: Any, value: Any) -> None:
+    if isinstance(value, np.ndarray):
+        # Gli array di oggetti contengono puntatori:
+        # si confrontano le rappresentazioni testuali
+        array = np.ascontiguousarray(
+            value.astype(str) if value.dtype == object else value
+        )
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    elif hasattr(value, "to_numpy") and hasattr(value, "index"):
+        _update(digest, value.to_numpy())
+        _update(digest, np.asarray(value.index, dtype=str))
+        if hasattr(value, "columns"):
+            _update(digest, np.asarray(value.columns, dtype=str))
+    elif hasattr(value, "model_dump_json"):
+        digest.update(value.model_dump_json().encode())
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b"\0")
+
+
+def fingerprint(*parts: Any) -> str:
+    """Impronta SHA-256 di array, DataFrame/Series, modelli pydantic e scalari."""
+    digest = hashlib.sha256()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int = 32,
+        path: Optional[Path] = None,
+        max_bytes: int = 256 * 2**20,
+    ):
+        self.max_entries = max_entries
+        self.path = Path(path) if path is not None else None
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Copia del valore associato alla chiave, ``None`` se assente."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(self._memory[key])
+        value = self._load(key)
+        if value is not None:
+            self._remember(key, value)
+            return copy.deepcopy(value)
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, copy.deepcopy(value))
+        if self.path is not None:
+            self._store(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.path is not None:
+            for file in self.path.glob(f"*{SUFFIX}"):
+                file.unlink(missing_ok=True)
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}{SUFFIX}"
+
+    def _load(self, key: str) -> Optional[Any]:
+        if self.path is None or not self._file(key).exists():
+            return None
+        try:
+            with open(self._file(key), "rb") as f:
+                value = pickle.load(f)
+            os.utime(self._file(key))
+            return value
+        except (
+            OSError,
+            pickle.UnpicklingError,
+            EOFError,
+            # Pickle di una versione precedente (classi spostate o rinominate)
+            AttributeError,
+            ImportError,
+        ) as e:
+            logger.warning(f"Voce della cache su disco non leggibile ({key}): {e}")
+            self._file(key).unlink(missing_ok=True)
+            return None
+
+    def _store(self, key: str, value: Any) -> None:
+        tmp = self.path / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._file(key))
+        except OSError as e:
+            logger.warning(f"Scrittura della cache su disco fallita ({key}): {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Elimina le voci più vecchie finché il disco occupato supera ``max_bytes``."""
+        entries = []
+        for file in self.path.glob(f"*{SUFFIX}"):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file))
+        total = sum(size for _, size, _ in entries)
+        for _, size, file in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            file.unlink(missing_ok=True)
+            total -= size
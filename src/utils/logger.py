@@ -3,27 +3,35 @@ import logging.config
 import yaml
 from pathlib import Path
 
-def setup_logger(name: str = __name__, 
-                config_path: Path = Path('config/logging.yaml'),
-                default_level=logging.INFO):
-    """Configura il logger da file YAML"""
+# La configurazione del logging viene applicata una sola volta per processo
+_configured = False
+
+
+def _configure(config_path: Path, default_level: int) -> None:
     try:
-        config_path = Path(config_path) 
-        
         if config_path.exists():
-            with open(config_path, 'r') as f:
+            with open(config_path, "r") as f:
                 config = yaml.safe_load(f)
                 logging.config.dictConfig(config)
         else:
             logging.basicConfig(level=default_level)
             logging.warning(f"File di configurazione {config_path} non trovato")
-        
-        logger = logging.getLogger(name)
-        logger.info(f"Logger configurato per il modulo {name}")
-        return logger
-
     except Exception as e:
         logging.basicConfig(level=default_level)
-        logger = logging.getLogger(name)
-        logger.error(f"Errore configurazione logger: {str(e)}")
-        return logger
\ No newline at end of file
+        logging.getLogger(__name__).error(f"Errore configurazione logger: {str(e)}")
+
+
+def setup_logger(
+    name: str = __name__,
+    config_path: Path = Path("config/logging.yaml"),
+    default_level=logging.INFO,
+):
+    """Configura il logging (solo alla prima chiamata) e restituisce il logger"""
+    global _configured
+    if not _configured:
+        _configured = True
+        _configure(Path(config_path), default_level)
+
+    logger = logging.getLogger(name)
+    logger.debug(f"Logger configurato per il modulo {name}")
+    return logger
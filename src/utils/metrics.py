@@ -0,0 +1,130 @@
+"""Strumentazione delle prestazioni: contatori e timer in formato Prometheus.
+
+Le metriche sono disabilitate per default: ``increment`` e ``observe`` tornano
+subito e ``timer`` restituisce un context manager vuoto condiviso, quindi il
+costo sul percorso critico è un solo controllo di attributo. Le metriche
+raccolte nei worker di un pool di processi non vengono riportate al processo
+principale.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_NULL_TIMER = nullcontext()
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False, prefix: str = "efqo"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._summaries: Dict[str, Dict[Labels, list]] = {}
+
+    def enable(self) -> "Metrics":
+        self.enabled = True
+        return self
+
+    def disable(self) -> "Metrics":
+        self.enabled = False
+        return self
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Incrementa un contatore (esportato come ``<prefix>_<name>_total``)."""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra un'osservazione (conteggio, somma e massimo)."""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            summary = self._summaries.setdefault(name, {}).setdefault(
+                key, [0, 0.0, 0.0]
+            )
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def timer(self, name: str, **labels: Any):
+        """Context manager che registra la durata del blocco in secondi."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timed(name, labels)
+
+    @contextmanager
+    def _timed(self, name: str, labels: Dict[str, Any]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia dei valori correnti: contatori e riepiloghi per label."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_format_labels(k): v for k, v in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "summaries": {
+                    name: {
+                        _format_labels(k): {"count": s[0], "sum": s[1], "max": s[2]}
+                        for k, s in series.items()
+                    }
+                    for name, series in self._summaries.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Esportazione nel formato testuale di Prometheus."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(
+                    f"{metric}{_format_labels(k)} {v:g}"
+                    for k, v in sorted(series.items())
+                )
+            for name, series in sorted(self._summaries.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} summary")
+                for k, (count, total, _) in sorted(series.items()):
+                    lines.append(f"{metric}_count{_format_labels(k)} {count}")
+                    lines.append(f"{metric}_sum{_format_labels(k)} {total:.9g}")
+                lines.append(f"# TYPE {metric}_max gauge")
+                lines.extend(
+                    f"{metric}_max{_format_labels(k)} {s[2]:.9g}"
+                    for k, s in sorted(series.items())
+                )
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# Istanza condivisa usata quando non ne viene passata una esplicita
+metrics = Metrics()
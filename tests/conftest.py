@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src"), str(ROOT / "src" / "data_pipelines")]
+
+
+def synthetic_returns(
+    n_assets: int = 12, n_periods: int = 500, seed: int = 0
+) -> pd.DataFrame:
+    """Rendimenti giornalieri sintetici: tre fattori comuni e rumore idiosincratico."""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(size=(n_assets, 3)) * 0.01
+    factors = rng.normal(size=(n_periods, 3))
+    noise = rng.normal(size=(n_periods, n_assets)) * 0.01
+    values = factors @ loadings.T + noise + rng.uniform(0, 0.001, n_assets)
+    return pd.DataFrame(
+        values,
+        index=pd.bdate_range("2020-01-01", periods=n_periods),
+        columns=[f"A{i}" for i in range(n_assets)],
+    )
+
+
+@pytest.fixture
+def returns() -> pd.DataFrame:
+    return synthetic_returns()
+
+
+@pytest.fixture
+def make_optimizer():
+    """Costruttore di ``MarkowitzOptimizer`` in memoria e senza cache."""
+    from model.efficient_frontier.markowitz_optimizer import (
+        CacheConfig,
+        CovarianceConfig,
+        MarkowitzOptimizer,
+        ModelConfig,
+        OptimizationConfig,
+    )
+
+    def build(returns, covariance=None, **optimization):
+        settings = {"min_weight": 0.0, "max_weight": 0.3, "risk_free_rate": 0.0}
+        settings.update(optimization)
+        config = ModelConfig(
+            covariance=CovarianceConfig(**(covariance or {"method": "empirical"})),
+            optimization=OptimizationConfig(**settings),
+            cache=CacheConfig(enabled=False),
+        )
+        return MarkowitzOptimizer(returns, config=config)
+
+    return build
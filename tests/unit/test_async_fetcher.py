@@ -0,0 +1,105 @@
+import asyncio
+import random
+import time
+import pytest
+from src.data_pipelines.async_fetcher import AsyncFetchEngine, backoff_delay
+
+
+class RateLimitedProvider:
+    """Provider finto che rifiuta le richieste oltre ``rate`` al secondo."""
+
+    def __init__(self, rate: float, burst: float = 1.0, failures: int = 0):
+        self.rate, self.burst = rate, burst
+        self.failures = failures
+        self.tokens, self.updated = burst, time.monotonic()
+        self.calls: dict = {}
+        self.rejected = 0
+
+    def request(self, ticker: str) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.calls[ticker] = self.calls.get(ticker, 0) + 1
+        if self.tokens < 1:
+            self.rejected += 1
+            raise ConnectionError("429 Too Many Requests")
+        self.tokens -= 1
+        if self.calls[ticker] <= self.failures:
+            raise ConnectionError("503 Service Unavailable")
+        return True
+
+
+def run(provider, tickers, **options):
+    async def process(ticker):
+        return provider.request(ticker)
+
+    return AsyncFetchEngine(process, **options).run(tickers)
+
+
+def test_rate_limit_is_respected():
+    tickers = [f"T{i}" for i in range(20)]
+    # Margine sul limite del provider per il ritardo di risveglio del loop
+    provider = RateLimitedProvider(rate=50.0, burst=2.0)
+    report = run(provider, tickers, concurrency=20, rate=40.0, burst=1, max_retries=1)
+    assert report["succeeded"] == len(tickers)
+    assert provider.rejected == 0
+    assert report["elapsed"] >= (len(tickers) - 1) / 40.0 * 0.95
+
+    flooded = RateLimitedProvider(rate=50.0, burst=2.0)
+    report = run(flooded, tickers, concurrency=20, rate=1e6, max_retries=1)
+    assert flooded.rejected > 0 and report["succeeded"] < len(tickers)
+
+
+def test_retries_with_jittered_backoff():
+    provider = RateLimitedProvider(rate=1e6, burst=1e6, failures=2)
+    report = run(provider, ["A"], rate=1e6, max_retries=3, backoff=0.05, seed=7)
+    entry = report["tickers"]["A"]
+    assert entry["success"] and entry["attempts"] == 3 and entry["error"] is None
+    assert provider.calls["A"] == 3
+
+    rng = random.Random(7)
+    delays = [backoff_delay(attempt, 0.05, 60.0, rng) for attempt in range(2)]
+    assert entry["elapsed"] >= sum(delays)
+    assert 0 <= delays[1] <= 0.1
+
+
+def test_retries_exhausted_report_the_error():
+    provider = RateLimitedProvider(rate=1e6, burst=1e6, failures=10)
+    report = run(provider, ["A"], rate=1e6, max_retries=2, backoff=0.0)
+    entry = report["tickers"]["A"]
+    assert not entry["success"] and entry["attempts"] == 2
+    assert entry["error"] == "503 Service Unavailable"
+    assert provider.calls["A"] == 2
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_timeout_is_retried(asynchronous):
+    calls = []
+
+    def slow_once(ticker):
+        calls.append(ticker)
+        if len(calls) == 1:
+            time.sleep(0.3)
+        return True
+
+    async def slow_once_async(ticker):
+        calls.append(ticker)
+        if len(calls) == 1:
+            await asyncio.sleep(0.3)
+        return True
+
+    process = slow_once_async if asynchronous else slow_once
+    engine = AsyncFetchEngine(process, rate=1e6, timeout=0.1, backoff=0.0)
+    entry = engine.run(["A"])["tickers"]["A"]
+    assert entry["success"] and entry["attempts"] == 2 and entry["error"] is None
+    assert len(calls) == 2
+
+    engine = AsyncFetchEngine(
+        lambda ticker: time.sleep(0.3) or True,
+        rate=1e6,
+        timeout=0.05,
+        max_retries=2,
+        backoff=0.0,
+    )
+    entry = engine.run(["A"])["tickers"]["A"]
+    assert not entry["success"] and entry["error"] == "timeout"
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model.covariance.estimators import estimate_covariance
+from model.efficient_frontier.markowitz_optimizer import CovarianceConfig
+from model.efficient_frontier.qp_solver import solve_min_variance
+from model.performance.backtest import walk_forward_backtest
+
+OPTIONS = {"lookback": 120, "rebalance": 20}
+
+
+@pytest.mark.parametrize("window", ["rolling", "expanding"])
+@pytest.mark.parametrize("method", ["empirical", "ledoit-wolf"])
+def test_online_estimate_matches_batch_windows(returns, window, method):
+    config = CovarianceConfig(method=method)
+    result = walk_forward_backtest(returns, config, 0.0, 0.3, window=window, **OPTIONS)
+    values = returns.to_numpy()
+    for date, w in result["weights"].iterrows():
+        position = returns.index.get_loc(date)
+        start = 0 if window == "expanding" else position - OPTIONS["lookback"]
+        sample = values[start:position]
+        expected = solve_min_variance(
+            estimate_covariance(sample, config), sample.mean(axis=0), None, 0.0, 0.3
+        )
+        np.testing.assert_allclose(w.to_numpy(), expected["w"], atol=1e-8)
+
+
+@pytest.mark.parametrize(
+    "executor, chunks", [("serial", 4), ("thread", 3), ("process", None)]
+)
+def test_chunked_execution_matches_serial(returns, executor, chunks):
+    config = CovarianceConfig(method="ledoit-wolf")
+    serial = walk_forward_backtest(returns, config, 0.0, 0.3, **OPTIONS)
+    chunked = walk_forward_backtest(
+        returns,
+        config,
+        0.0,
+        0.3,
+        executor=executor,
+        workers=2,
+        chunks=chunks,
+        **OPTIONS
+    )
+    pd.testing.assert_frame_equal(
+        chunked["weights"], serial["weights"], check_exact=False, atol=1e-10
+    )
+    pd.testing.assert_series_equal(
+        chunked["returns"], serial["returns"], check_exact=False, atol=1e-12
+    )
+
+
+def test_turnover_costs_and_drawdown_by_hand():
+    returns = pd.DataFrame(
+        [[0.01, 0.02], [0.0, -0.01], [0.10, 0.0], [-0.10, 0.10], [0.05, -0.05]],
+        columns=["A", "B"],
+        index=pd.bdate_range("2021-01-01", periods=5),
+    )
+    # Pesi fissati dai vincoli: 50/50 a ogni ribilanciamento (righe 2 e 4)
+    result = walk_forward_backtest(
+        returns,
+        CovarianceConfig(method="empirical"),
+        0.5,
+        0.5,
+        lookback=2,
+        rebalance=2,
+        transaction_cost=0.01,
+    )
+    # Dopo le righe 2-3 i pesi derivano a (0.495, 0.55) / 1.045
+    drift = np.abs(0.5 - np.array([0.495, 0.55]) / 1.045).sum()
+    np.testing.assert_allclose(result["turnover"], [1.0, drift])
+    expected = [
+        1.05 * (1 - 0.01) - 1,
+        1.045 / 1.05 - 1,
+        1.0 * (1 - 0.01 * drift) - 1,
+    ]
+    np.testing.assert_allclose(result["returns"], expected)
+    wealth = np.cumprod(1 + np.array(expected))
+    np.testing.assert_allclose(result["drawdown"], wealth / wealth[0] - 1)
+    assert result["total_return"] == pytest.approx(wealth[-1] - 1)
+    assert result["max_drawdown"] == pytest.approx(wealth[-1] / wealth[0] - 1)
+    assert result["windows"] == 2 and result["failures"] == 0
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pytest
+from model.efficient_frontier.markowitz_optimizer import OptimizationConfig
+from utils.cache import ResultCache, fingerprint
+from utils.metrics import Metrics
+
+TARGETS = {"min": 0.0006, "max": 0.0016, "step": 4}
+
+
+def test_hits_misses_and_isolation():
+    cache = ResultCache(max_entries=2)
+    value = {"w": np.arange(3.0)}
+    assert cache.get("a") is None
+    cache.put("a", value)
+    value["w"][0] = 99.0
+    hit = cache.get("a")
+    np.testing.assert_array_equal(hit["w"], [0.0, 1.0, 2.0])
+    hit["w"][:] = -1.0
+    np.testing.assert_array_equal(cache.get("a")["w"], [0.0, 1.0, 2.0])
+
+    cache.put("b", 1)
+    cache.get("a")
+    cache.put("c", 2)  # "b" è la voce meno recente in memoria
+    assert cache.get("b") is None and cache.get("a") is not None
+
+
+def test_disk_entries_survive_and_are_evicted_lru(tmp_path):
+    payload = np.zeros(1000)  # ~8 KB per voce
+    cache = ResultCache(max_entries=8, path=tmp_path, max_bytes=20_000)
+    cache.put("a", payload)
+    cache.put("b", payload)
+    os.utime(tmp_path / "a.pkl", (1, 1))
+    os.utime(tmp_path / "b.pkl", (2, 2))
+    assert ResultCache(path=tmp_path).get("a") is not None  # rinnova "a"
+    cache.put("c", payload)
+    assert sorted(p.stem for p in tmp_path.glob("*.pkl")) == ["a", "c"]
+    np.testing.assert_array_equal(ResultCache(path=tmp_path).get("c"), payload)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"cno_such_module\nThing\n.",  # ModuleNotFoundError
+        b"cbuiltins\nNoSuchThing\n.",  # AttributeError
+        b"\x80\x05\x95",  # troncato
+    ],
+)
+def test_unreadable_disk_entries_are_misses(tmp_path, content):
+    (tmp_path / "stale.pkl").write_bytes(content)
+    cache = ResultCache(path=tmp_path)
+    assert cache.get("stale") is None
+    assert not (tmp_path / "stale.pkl").exists()
+
+
+def test_fingerprint_tracks_data_and_config(returns):
+    config = OptimizationConfig(min_weight=0.0, max_weight=0.3)
+    key = fingerprint(returns, config)
+    assert fingerprint(returns.copy(), config.model_copy()) == key
+    changed = returns.copy()
+    changed.iloc[0, 0] += 1e-12
+    assert fingerprint(changed, config) != key
+    assert fingerprint(returns.rename(columns={"A0": "X"}), config) != key
+    assert fingerprint(returns, config.model_copy(update={"max_weight": 0.4})) != key
+
+
+def test_optimizer_cache_hits_and_invalidation(returns, make_optimizer, tmp_path):
+    cache, metrics = ResultCache(path=tmp_path), Metrics(enabled=True)
+
+    def frontier(data, **optimization):
+        optimizer = make_optimizer(data, target_return=TARGETS, **optimization)
+        optimizer.cache, optimizer.metrics = cache, metrics
+        return optimizer, optimizer.efficient_frontier()
+
+    def counts():
+        counters = metrics.snapshot()["counters"]
+        label = '{kind="efficient_frontier"}'
+        return [
+            counters.get(name, {}).get(label, 0)
+            for name in ("cache_hits", "cache_misses")
+        ]
+
+    _, first = frontier(returns)
+    assert counts() == [0, 1]
+    first[0]["weights"][:] = 0.0  # il valore in cache non cambia
+    _, again = frontier(returns, executor="thread")  # l'executor non conta
+    assert counts() == [1, 1] and again[0]["weights"].sum() == pytest.approx(1.0)
+    frontier(returns, max_weight=0.25)
+    optimizer, _ = frontier(returns.iloc[:-1])
+    assert counts() == [1, 3]
+
+    optimizer.update(returns.iloc[-1:])
+    optimizer.efficient_frontier()
+    assert counts() == [2, 3]
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cleaning_plan import CleaningPlan
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(1)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (400, 5)), axis=0))
+    values[rng.integers(0, 400, 40), rng.integers(0, 5, 40)] = np.nan
+    values[:6, 2] = np.nan  # ticker quotato in ritardo
+    values[-3:, 4] = np.nan
+    values[[50, 200], [1, 3]] *= 1.8  # picchi anomali
+    return pd.DataFrame(
+        values,
+        index=pd.bdate_range("2021-01-01", periods=400, name="Date"),
+        columns=[f"T{i}" for i in range(5)],
+    )
+
+
+def reference(prices, fill="ffill", threshold=None):
+    """Stessa pulizia con le operazioni pandas di DataCleaner."""
+    cleaned = getattr(prices, fill)().dropna()
+    if threshold is not None:
+        z_scores = (cleaned - cleaned.mean()) / cleaned.std()
+        cleaned = cleaned[(z_scores.abs() < threshold).all(axis=1)]
+    return cleaned
+
+
+@pytest.mark.parametrize("method", ["ffill", "bfill", "interpolate"])
+def test_fill_matches_pandas(prices, method):
+    result = CleaningPlan(prices).fill(method).run()
+    pd.testing.assert_frame_equal(result["data"], reference(prices, method))
+    assert result["report"]["missing_values"] == prices.isna().sum().to_dict()
+
+
+def test_outliers_match_pandas(prices):
+    result = CleaningPlan(prices).fill().remove_outliers(2.5).run()
+    expected = reference(prices, threshold=2.5)
+    pd.testing.assert_frame_equal(result["data"], expected)
+    report = result["report"]
+    assert report["rows_out"] == len(expected)
+    assert report["outlier_rows"] == len(reference(prices)) - len(expected)
+    assert report["passes"] == 3
+
+
+@pytest.mark.parametrize("method", ["minmax", "zscore"])
+def test_normalize_matches_pandas(prices, method):
+    result = CleaningPlan(prices).normalize(method).fill().run()["data"]
+    cleaned = reference(prices)
+    if method == "minmax":
+        expected = (cleaned - cleaned.min()) / (cleaned.max() - cleaned.min())
+    else:
+        expected = (cleaned - cleaned.mean()) / cleaned.std()
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("log_returns", [False, True])
+def test_returns_match_pandas(prices, log_returns):
+    result = (
+        CleaningPlan(prices)
+        .fill()
+        .remove_outliers(3.0)
+        .returns(log_returns)
+        .run()["data"]
+    )
+    cleaned = reference(prices, threshold=3.0)
+    expected = (
+        np.log(cleaned / cleaned.shift()) if log_returns else cleaned.pct_change()
+    )
+    pd.testing.assert_frame_equal(result, expected.iloc[1:], rtol=1e-12)
+
+
+def test_validation_reports_errors(prices):
+    negative = prices.copy()
+    negative.iloc[10, 0] = -1.0
+    report = CleaningPlan(negative).fill().validate().run()["report"]
+    assert not report["valid"] and report["checks"]["negative_prices"] is False
+    report = CleaningPlan(prices).validate(["missing"]).run()["report"]
+    assert report["checks"] == {"missing_values": False}
+
+
+def test_invalid_steps(prices):
+    with pytest.raises(ValueError):
+        CleaningPlan(prices).fill("median")
+    with pytest.raises(ValueError):
+        CleaningPlan(prices).remove_outliers(0)
+    with pytest.raises(ValueError):
+        CleaningPlan(prices).validate(["unknown"])
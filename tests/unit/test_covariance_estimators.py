@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from sklearn.covariance import OAS, LedoitWolf
+from model.covariance.estimators import COVARIANCE_ESTIMATORS, estimate_covariance
+from model.efficient_frontier.markowitz_optimizer import CovarianceConfig
+
+
+def reference_ledoit_wolf(returns, target):
+    """Ledoit-Wolf elemento per elemento dalle definizioni di pi, rho e gamma."""
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    std = np.sqrt(np.diag(sample))
+    if target == "single_factor":
+        market = x.mean(axis=1)
+        cov_market = x.T @ market / t
+        var_market = market @ market / t
+        prior = np.outer(cov_market, cov_market) / var_market
+    else:
+        r_bar = (np.sum(sample / np.outer(std, std)) - n) / (n * (n - 1))
+        prior = r_bar * np.outer(std, std)
+    np.fill_diagonal(prior, np.diag(sample))
+
+    pi = rho = 0.0
+    for i in range(n):
+        for j in range(n):
+            d_ij = x[:, i] * x[:, j] - sample[i, j]
+            pi += np.mean(d_ij**2)
+            if i == j:
+                rho += np.mean(d_ij**2)
+            elif target == "single_factor":
+                d_i0 = x[:, i] * market - cov_market[i]
+                d_j0 = x[:, j] * market - cov_market[j]
+                d_00 = market**2 - var_market
+                gradient = (
+                    cov_market[j] / var_market * d_i0
+                    + cov_market[i] / var_market * d_j0
+                    - cov_market[i] * cov_market[j] / var_market**2 * d_00
+                )
+                rho += np.mean(d_ij * gradient)
+            else:
+                theta_ii = np.mean((x[:, i] ** 2 - sample[i, i]) * d_ij)
+                theta_jj = np.mean((x[:, j] ** 2 - sample[j, j]) * d_ij)
+                rho += (
+                    r_bar
+                    / 2
+                    * (std[j] / std[i] * theta_ii + std[i] / std[j] * theta_jj)
+                )
+    gamma = np.sum((sample - prior) ** 2)
+    shrinkage = max(0.0, min(1.0, (pi - rho) / gamma / t))
+    return shrinkage * prior + (1.0 - shrinkage) * sample
+
+
+@pytest.fixture
+def values(returns):
+    return returns.to_numpy()
+
+
+def test_registry_contains_all_methods():
+    assert set(COVARIANCE_ESTIMATORS) >= {
+        "empirical",
+        "ledoit-wolf",
+        "oas",
+        "ewma",
+        "factor",
+    }
+    with pytest.raises(ValueError):
+        estimate_covariance(
+            np.zeros((5, 2)), CovarianceConfig.model_construct(method="unknown")
+        )
+
+
+def test_empirical_matches_numpy(values):
+    result = estimate_covariance(values, CovarianceConfig(method="empirical"))
+    np.testing.assert_allclose(result, np.cov(values, rowvar=False), rtol=1e-12)
+
+
+def test_ledoit_wolf_matches_sklearn(values):
+    result = estimate_covariance(values, CovarianceConfig(method="ledoit-wolf"))
+    np.testing.assert_allclose(result, LedoitWolf().fit(values).covariance_, rtol=1e-10)
+
+
+def test_oas_matches_sklearn(values):
+    result = estimate_covariance(values, CovarianceConfig(method="oas"))
+    np.testing.assert_allclose(result, OAS().fit(values).covariance_, rtol=1e-10)
+
+
+@pytest.mark.parametrize("target", ["single_factor", "constant_correlation"])
+def test_ledoit_wolf_targets_match_reference(values, target):
+    config = CovarianceConfig(method="ledoit-wolf", shrinkage_target=target)
+    result = estimate_covariance(values[:200, :6], config)
+    np.testing.assert_allclose(
+        result, reference_ledoit_wolf(values[:200, :6], target), rtol=1e-10
+    )
+
+
+def test_fixed_shrinkage_intensity(values):
+    config = CovarianceConfig(method="ledoit-wolf", shrinkage=0.3)
+    result = estimate_covariance(values, config)
+    x = values - values.mean(axis=0)
+    sample = x.T @ x / len(x)
+    prior = np.trace(sample) / sample.shape[0] * np.eye(sample.shape[0])
+    np.testing.assert_allclose(result, 0.3 * prior + 0.7 * sample, rtol=1e-12)
+
+
+def test_ewma_matches_weighted_numpy(values):
+    result = estimate_covariance(values, CovarianceConfig(method="ewma", halflife=30.0))
+    weights = 0.5 ** (np.arange(len(values))[::-1] / 30.0)
+    expected = np.cov(values, rowvar=False, aweights=weights)
+    np.testing.assert_allclose(result, expected, rtol=1e-10)
+
+
+def test_factor_model_keeps_sample_variances(values):
+    result = estimate_covariance(values, CovarianceConfig(method="factor", n_factors=3))
+    np.testing.assert_allclose(
+        np.diag(result), np.var(values, axis=0, ddof=1), rtol=1e-10
+    )
+    assert np.linalg.eigvalsh(result).min() > 0
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from model.efficient_frontier.critical_line import CriticalLineAlgorithm
+from model.efficient_frontier.qp_solver import solve_min_variance
+from tests.conftest import synthetic_returns
+
+
+@pytest.fixture
+def moments(returns):
+    return returns.mean().to_numpy(), np.cov(returns.to_numpy(), rowvar=False)
+
+
+def test_corners_are_feasible_and_ordered(moments):
+    mu, cov = moments
+    corners = CriticalLineAlgorithm(mu, cov, 0.02, 0.3).solve()
+    corner_returns = np.array([corner["return"] for corner in corners])
+    assert np.all(np.diff(corner_returns) <= 1e-15)
+    for corner in corners:
+        w = corner["weights"]
+        assert w.sum() == pytest.approx(1.0)
+        assert w.min() >= 0.02 - 1e-10 and w.max() <= 0.3 + 1e-10
+
+
+def test_last_corner_is_min_variance(moments):
+    mu, cov = moments
+    corners = CriticalLineAlgorithm(mu, cov, 0.0, 0.3).solve()
+    expected = solve_min_variance(cov, mu, None, 0.0, 0.3)["w"]
+    np.testing.assert_allclose(corners[-1]["weights"], expected, atol=1e-8)
+
+
+def test_interpolation_matches_grid(moments):
+    mu, cov = moments
+    cla = CriticalLineAlgorithm(mu, cov, 0.0, 0.3)
+    corners = cla.solve()
+    targets = np.linspace(corners[-1]["return"], corners[0]["return"], 25)
+    for target, point in zip(targets, cla.interpolate(targets)):
+        expected = solve_min_variance(cov, mu, target, 0.0, 0.3)
+        assert point is not None and expected["success"]
+        np.testing.assert_allclose(point["weights"], expected["w"], atol=1e-8)
+        assert point["volatility"] == pytest.approx(expected["fun"], rel=1e-8)
+
+
+def test_targets_outside_frontier_are_none(moments):
+    mu, cov = moments
+    cla = CriticalLineAlgorithm(mu, cov, 0.0, 0.3)
+    corners = cla.solve()
+    below, above = corners[-1]["return"] - 1e-4, corners[0]["return"] + 1e-4
+    assert cla.interpolate([below, above]) == [None, None]
+
+
+@pytest.mark.parametrize("n_assets, seed", [(12, 7), (22, 52)])
+def test_tight_box_matches_active_set(n_assets, seed):
+    # Con upper = 2/n gli asset appena liberati raggiungono di nuovo un bound
+    returns = synthetic_returns(n_assets=n_assets, seed=seed).to_numpy()
+    mu, cov = returns.mean(axis=0), np.cov(returns, rowvar=False)
+    upper = 2.0 / n_assets
+    corners = CriticalLineAlgorithm(mu, cov, 0.0, upper).solve()
+    for corner in corners:
+        w = corner["weights"]
+        assert w.min() >= 0.0 and w.max() <= upper
+        expected = solve_min_variance(cov, mu, corner["return"], 0.0, upper)
+        assert expected["success"]
+        assert corner["volatility"] == pytest.approx(expected["fun"], rel=1e-8)
+
+
+def test_optimizer_cla_matches_grid(returns, make_optimizer):
+    target_return = {"min": 0.0006, "max": 0.0016, "step": 6}
+    grid = make_optimizer(returns, target_return=target_return).efficient_frontier()
+    cla = make_optimizer(
+        returns, target_return=target_return, frontier_method="cla"
+    ).efficient_frontier()
+    assert len(cla) == len(grid) == 6
+    for exact, reference in zip(cla, grid):
+        assert exact["return"] == pytest.approx(reference["return"])
+        np.testing.assert_allclose(exact["weights"], reference["weights"], atol=1e-8)
+        assert exact["volatility"] == pytest.approx(reference["volatility"], rel=1e-8)
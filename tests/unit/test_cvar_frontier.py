@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from model.efficient_frontier import cvar_frontier
+from model.efficient_frontier.cvar_frontier import (
+    _linprog_solver,
+    cvar_lp,
+    solve_cvar_frontier,
+)
+from model.efficient_frontier.qp_solver import solve_min_variance
+from model.performance.risk_metrics import batch_risk_metrics
+
+
+@pytest.fixture
+def scenarios(returns):
+    return returns.to_numpy()[:300]
+
+
+def frontier_targets(mu, count=5):
+    return np.linspace(np.quantile(mu, 0.5), np.quantile(mu, 0.8), count)
+
+
+@pytest.mark.parametrize("confidence", [0.9, 0.95])
+def test_lp_cvar_equals_historical_cvar(scenarios, confidence):
+    targets = frontier_targets(scenarios.mean(axis=0))
+    frontier = solve_cvar_frontier(scenarios, targets, 0.0, 0.3, confidence)
+    assert all(point["success"] for point in frontier)
+    weights = np.array([point["w"] for point in frontier])
+    metrics = batch_risk_metrics(weights, scenarios, confidence=confidence)
+    np.testing.assert_allclose(
+        [p["cvar"] for p in frontier], metrics["cvar_historical"], rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        [p["var"] for p in frontier], metrics["var_historical"], rtol=1e-6
+    )
+    np.testing.assert_allclose(weights @ scenarios.mean(axis=0), targets, atol=1e-9)
+
+
+def test_lp_cvar_not_above_min_variance_portfolio(scenarios):
+    mu = scenarios.mean(axis=0)
+    cov = np.cov(scenarios, rowvar=False)
+    for target in frontier_targets(mu):
+        optimum = solve_cvar_frontier(scenarios, [target], 0.0, 0.3)[0]
+        # Il portafoglio a minima varianza allo stesso rendimento
+        # è ammissibile per il LP
+        w = solve_min_variance(cov, mu, target, 0.0, 0.3)["w"]
+        historical = batch_risk_metrics(w, scenarios)["cvar_historical"][0]
+        assert optimum["cvar"] <= historical + 1e-12
+
+
+def test_warm_started_frontier_matches_independent_lps(scenarios):
+    targets = frontier_targets(scenarios.mean(axis=0), 6)
+    frontier = solve_cvar_frontier(scenarios, targets, 0.0, 0.3)
+    mu = scenarios.mean(axis=0)
+    lower, upper = np.zeros(mu.shape[0]), np.full(mu.shape[0], 0.3)
+    solve = _linprog_solver(cvar_lp(scenarios, mu, lower, upper, 0.95))
+    for target, point in zip(targets, frontier):
+        x, status, _ = solve(target)
+        assert status == "optimal"
+        cvar = cvar_lp(scenarios, mu, lower, upper, 0.95)["cost"] @ x
+        assert point["cvar"] == pytest.approx(cvar, rel=1e-7)
+    if frontier[0]["solver"] == "highspy":
+        assert all(point["warm_start"] for point in frontier[1:])
+
+
+def test_infeasible_target_is_reported(scenarios):
+    result = solve_cvar_frontier(scenarios, [1.0], 0.0, 0.3)[0]
+    assert not result["success"] and "w" not in result
+
+
+def test_warm_start_only_after_a_successful_solve(scenarios):
+    feasible = frontier_targets(scenarios.mean(axis=0), 2)
+    frontier = solve_cvar_frontier(scenarios, [feasible[0], 1.0, *feasible], 0.0, 0.3)
+    assert [point["success"] for point in frontier] == [True, False, True, True]
+    warm = frontier[0]["solver"] == "highspy"
+    assert [point["warm_start"] for point in frontier] == [False, warm, False, warm]
+
+
+def test_weights_off_the_constraints_are_rejected(scenarios, monkeypatch):
+    mu = scenarios.mean(axis=0)
+    target = frontier_targets(mu)[2]
+    exact = solve_cvar_frontier(scenarios, [target], 0.0, 0.3)[0]
+    shifts = {"noise": -1e-12, "negative": -1e-3}
+
+    def fake_solver(lp):
+        def solve(target):
+            x = np.concatenate((exact["w"], np.zeros(lp["cost"].size - mu.size)))
+            x[np.argmin(exact["w"])] += shifts[case]
+            return x, "optimal", 1
+
+        return solve
+
+    monkeypatch.setattr(cvar_frontier, "_highs_solver", fake_solver)
+    case = "noise"
+    point = solve_cvar_frontier(scenarios, [target], 0.0, 0.3)[0]
+    assert point["success"] and (point["w"] >= 0).all()
+    assert point["w"] @ mu == pytest.approx(target, abs=1e-9)
+    # Rinormalizzare sposterebbe il rendimento: la soluzione va scartata
+    case = "negative"
+    point = solve_cvar_frontier(scenarios, [target], 0.0, 0.3)[0]
+    assert not point["success"] and "w" not in point
+    assert point["status"] == "pesi fuori dai vincoli"
+
+
+def test_invalid_inputs(scenarios):
+    with pytest.raises(ValueError):
+        solve_cvar_frontier(scenarios, [0.0], 0.0, 0.3, confidence=1.0)
+    with pytest.raises(ValueError):
+        solve_cvar_frontier(scenarios, [0.0], 0.0, 0.05)
@@ -0,0 +1,208 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_pipelines import async_fetcher, data_fetcher
+from src.data_pipelines.price_store import PriceStore
+
+DATES = pd.bdate_range("2020-01-01", "2020-12-31", name="Date")
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def fake_download(tickers, start, end, **kwargs):
+    """Risposta multi-ticker come yfinance (colonne ticker x campo), deterministica."""
+    tickers = tickers if isinstance(tickers, list) else [tickers]
+    index = DATES[(DATES >= start) & (DATES < end)]
+    columns = pd.MultiIndex.from_product([tickers, FIELDS], names=["Ticker", "Price"])
+    offsets = np.array(
+        [100 * int(t[1:]) + k for t in tickers for k in range(len(FIELDS))], dtype=float
+    )
+    frame = pd.DataFrame(
+        np.add.outer(DATES.get_indexer(index), offsets) + 1.0,
+        index=index,
+        columns=columns,
+    )
+    for ticker in tickers:
+        frame[(ticker, "Volume")] = frame[(ticker, "Volume")].astype("int64")
+    if "T1" in tickers:
+        frame.loc[index[:5], "T1"] = np.nan  # quotato in ritardo
+    return frame
+
+
+@pytest.fixture
+def configure(monkeypatch, tmp_path):
+    def build(**overrides):
+        settings = {
+            "tickers": [f"T{i}" for i in range(7)],
+            "start_date": "2020-01-01",
+            "end_date": "2020-09-30",
+            "path_raw": tmp_path / "raw",
+            "path_store": tmp_path / "store",
+            "strict_validation": False,
+        }
+        settings.update(overrides)
+        config = data_fetcher.DataConfig(**settings)
+        monkeypatch.setattr(data_fetcher, "params", config)
+        return config
+
+    return build
+
+
+@pytest.mark.parametrize("format", ["csv", "parquet"])
+def test_batch_download_matches_per_ticker(configure, tmp_path, format):
+    reference = configure(
+        format=format, path_raw=tmp_path / "ref", path_store=tmp_path / "ref_store"
+    )
+    data_fetcher.main(downloader=fake_download)
+    config = configure(format=format, batch_size=3)
+    data_fetcher.main(downloader=fake_download)
+
+    for field in ("Close", "Volume"):
+        expected = PriceStore(reference.path_store).read(field)
+        pd.testing.assert_frame_equal(
+            PriceStore(config.path_store).read(field), expected
+        )
+    read = pd.read_parquet if format == "parquet" else pd.read_csv
+    for ticker in config.tickers:
+        name = f"{ticker}.{format}"
+        batch, single = read(config.path_raw / name), read(reference.path_raw / name)
+        # Il percorso per ticker salva il volume come float
+        pd.testing.assert_frame_equal(batch, single, check_dtype=False)
+    assert (
+        data_fetcher.load_manifest()["T1"]["rows"]
+        == len(DATES[DATES < "2020-09-30"]) - 5
+    )
+
+
+def test_incremental_batch_appends_new_dates(configure):
+    config = configure(format="parquet", batch_size=4)
+    data_fetcher.main(downloader=fake_download)
+    config = configure(
+        format="parquet", batch_size=4, incremental=True, end_date="2020-10-31"
+    )
+    requests = []
+
+    def recording_download(tickers, start, end, **kwargs):
+        requests.append(start)
+        return fake_download(tickers, start, end, **kwargs)
+
+    data_fetcher.main(downloader=recording_download)
+    assert requests == ["2020-09-30", "2020-09-30"]
+    manifest = data_fetcher.load_manifest()
+    assert manifest["T3"]["last_date"] == "2020-10-30"
+    stored = pd.read_parquet(config.path_raw / "T3.parquet")
+    assert stored["Date"].is_unique and stored["Date"].is_monotonic_increasing
+    assert len(stored) == len(DATES[DATES < "2020-10-31"])
+
+
+def test_async_engine_retries_through_the_token_bucket(
+    configure, monkeypatch, tmp_path
+):
+    reference = configure(
+        path_raw=tmp_path / "ref", path_store=tmp_path / "ref_store", tickers=["T0"]
+    )
+    data_fetcher.main(downloader=fake_download)
+    config = configure(engine="async", rate_limit=1000.0, backoff=0, tickers=["T0"])
+    acquired, calls = [], []
+    acquire = async_fetcher.TokenBucket.acquire
+
+    async def counting_acquire(bucket):
+        acquired.append(1)
+        await acquire(bucket)
+
+    def failing_once(tickers, start, end, **kwargs):
+        calls.append(tickers)
+        if len(calls) == 1:
+            raise ConnectionError("503 Service Unavailable")
+        return fake_download(tickers, start, end, **kwargs)
+
+    monkeypatch.setattr(async_fetcher.TokenBucket, "acquire", counting_acquire)
+    data_fetcher.main(downloader=failing_once)
+    # Nessun retry interno: ogni richiesta al provider è un tentativo del motore
+    assert len(calls) == len(acquired) == 2
+    pd.testing.assert_frame_equal(
+        pd.read_csv(config.path_raw / "T0.csv"),
+        pd.read_csv(reference.path_raw / "T0.csv"),
+    )
+
+
+def test_async_engine_drops_abandoned_attempts(configure, monkeypatch, tmp_path):
+    reference = configure(
+        path_raw=tmp_path / "ref", path_store=tmp_path / "ref_store", tickers=["T0"]
+    )
+    data_fetcher.main(downloader=fake_download)
+    config = configure(
+        engine="async", rate_limit=1000.0, timeout=0.2, backoff=0, tickers=["T0"]
+    )
+    calls, saved = [], []
+    save_ticker = data_fetcher.save_ticker
+
+    def slow_once(tickers, start, end, **kwargs):
+        calls.append(tickers)
+        if len(calls) == 1:
+            time.sleep(0.6)
+        return fake_download(tickers, start, end, **kwargs)
+
+    def recording_save(ticker, *args):
+        saved.append(ticker)
+        return save_ticker(ticker, *args)
+
+    monkeypatch.setattr(data_fetcher, "save_ticker", recording_save)
+    data_fetcher.main(downloader=slow_once)
+    # Il tentativo scaduto termina prima della fine di main ma non salva
+    assert len(calls) == 2 and saved == ["T0"]
+    pd.testing.assert_frame_equal(
+        pd.read_csv(config.path_raw / "T0.csv"),
+        pd.read_csv(reference.path_raw / "T0.csv"),
+    )
+    assert data_fetcher.load_manifest()["T0"]["rows"] == len(
+        pd.read_csv(config.path_raw / "T0.csv")
+    )
+
+
+@pytest.mark.parametrize("format", ["csv", "parquet"])
+def test_incremental_per_ticker_resumes_from_manifest(configure, format):
+    config = configure(format=format, tickers=["T0", "T2", "T3"])
+    data_fetcher.main(downloader=fake_download)
+    # File di T2 modificato dopo il download: il checksum non corrisponde più
+    corrupted = config.path_raw / f"T2.{format}"
+    read = pd.read_parquet if format == "parquet" else pd.read_csv
+    frame = read(corrupted)
+    frame.loc[0, "Close"] += 1.0
+    if format == "parquet":
+        frame.to_parquet(corrupted, index=False)
+    else:
+        frame.to_csv(corrupted, index=False)
+
+    config = configure(
+        format=format,
+        tickers=["T0", "T2", "T3"],
+        incremental=True,
+        end_date="2020-10-31",
+    )
+    requests = {}
+
+    def recording_download(tickers, start, end, **kwargs):
+        frame = fake_download(tickers, start, end, **kwargs)
+        requests[tickers] = (start, len(frame))
+        return frame
+
+    data_fetcher.main(downloader=recording_download)
+    new_rows = len(DATES[(DATES >= "2020-09-30") & (DATES < "2020-10-31")])
+    assert requests["T0"] == requests["T3"] == ("2020-09-30", new_rows)
+    assert requests["T2"] == ("2020-01-01", len(DATES[DATES < "2020-10-31"]))
+
+    manifest = data_fetcher.load_manifest()
+    for ticker in config.tickers:
+        stored = read(config.path_raw / f"{ticker}.{format}")
+        assert len(stored) == len(DATES[DATES < "2020-10-31"])
+        assert pd.to_datetime(stored["Date"]).is_monotonic_increasing
+        assert manifest[ticker]["rows"] == len(stored)
+        assert manifest[ticker]["last_date"] == "2020-10-30"
+        expected = fake_download(ticker, "2020-01-01", "2020-10-31")[ticker]
+        np.testing.assert_allclose(stored["Close"], expected["Close"])
+
+    # Già aggiornati: nessuna richiesta al provider
+    requests.clear()
+    data_fetcher.main(downloader=recording_download)
+    assert requests == {}
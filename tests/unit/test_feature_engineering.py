@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from feature_engineering import FeatureEngineer
+
+WINDOWS, SPANS = (5, 21), (10,)
+
+
+@pytest.fixture
+def prices(returns):
+    prices = 100.0 * (1.0 + returns.iloc[:, :6]).cumprod()
+    prices.iloc[:40, 1] = np.nan  # quotato in ritardo
+    prices.iloc[100:103, 2] = np.nan  # giorni mancanti, forward-fill
+    prices.iloc[200:260, 3] = prices.iloc[200, 3]  # prezzo costante
+    return prices
+
+
+def pandas_reference(prices):
+    filled = prices.ffill()
+    simple = filled / filled.shift() - 1.0
+    market = simple.mean(axis=1)
+    expected = {"returns_1": simple, "log_returns_1": np.log(filled / filled.shift())}
+    for window in WINDOWS:
+        rolling = simple.rolling(window)
+        expected[f"volatility_{window}"] = rolling.std()
+        expected[f"correlation_{window}"] = rolling.corr(market)
+    for span in SPANS:
+        ewm = simple.ewm(span=span, adjust=False)
+        expected[f"ewma_mean_{span}"] = ewm.mean()
+        expected[f"ewma_volatility_{span}"] = np.sqrt(ewm.var(bias=True))
+    return expected
+
+
+def test_compute_matches_pandas(tmp_path, prices):
+    features = FeatureEngineer(tmp_path, windows=WINDOWS, spans=SPANS).compute(prices)
+    expected = pandas_reference(prices)
+    assert set(features) == set(expected)
+    for name, frame in expected.items():
+        if name.startswith("correlation"):
+            # pandas non restituisce NaN sulle finestre a varianza nulla
+            frame = frame.where(expected[name.replace("correlation", "volatility")] > 0)
+        pd.testing.assert_frame_equal(
+            features[name], frame, check_exact=False, atol=1e-10, check_freq=False
+        )
+
+
+@pytest.mark.parametrize("log_returns", [False, True])
+def test_incremental_updates_match_full_build(tmp_path, prices, log_returns):
+    options = {"windows": WINDOWS, "spans": SPANS, "log_returns": log_returns}
+    full = FeatureEngineer(tmp_path / "full", **options)
+    full.build(prices)
+    incremental = FeatureEngineer(tmp_path / "incremental", **options)
+    assert incremental.update(prices.iloc[:30])["mode"] == "full"
+    for stop in (31, 102, 230, len(prices)):
+        report = incremental.update(prices.iloc[:stop])
+        assert report["mode"] == "incremental"
+    assert incremental.update(prices)["rows"] == 0
+
+    for name in full.fields:
+        feature, window = name.rsplit("_", 1)
+        pd.testing.assert_frame_equal(
+            incremental.read(feature, int(window)),
+            full.read(feature, int(window)),
+            check_exact=False,
+            atol=1e-12,
+        )
+
+
+def test_changed_configuration_rebuilds(tmp_path, prices):
+    FeatureEngineer(tmp_path, windows=WINDOWS).build(prices.iloc[:100])
+    report = FeatureEngineer(tmp_path, windows=(10,)).update(prices)
+    assert report["mode"] == "full" and report["rows"] == len(prices)
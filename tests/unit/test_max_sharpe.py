@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from model.covariance.factor_model import FactorRiskModel
+from model.efficient_frontier.max_sharpe import SHARPE_SOLVERS, solve_max_sharpe
+
+
+@pytest.fixture
+def moments(returns):
+    return np.cov(returns.to_numpy(), rowvar=False), returns.mean().to_numpy()
+
+
+@pytest.mark.parametrize("lower, upper", [(0.0, 1.0), (0.0, 0.3), (0.02, 0.2)])
+@pytest.mark.parametrize("risk_free_rate", [0.0, 2e-4])
+def test_solvers_agree(moments, lower, upper, risk_free_rate):
+    cov, mu = moments
+    results = {
+        method: solve_max_sharpe(cov, mu, risk_free_rate, lower, upper, method=method)
+        for method in SHARPE_SOLVERS
+    }
+    exact = results["active-set"]
+    assert exact["solver"] == "active-set" and "fallback" not in exact
+    assert exact["w"].sum() == pytest.approx(1.0)
+    assert exact["w"].min() >= lower - 1e-12 and exact["w"].max() <= upper + 1e-12
+    convex = results["convex"]
+    np.testing.assert_allclose(convex["w"], exact["w"], atol=1e-6)
+    assert convex["sharpe"] == pytest.approx(exact["sharpe"], rel=1e-9)
+    # SLSQP converge in modo approssimato ma non supera mai l'ottimo esatto
+    slsqp = results["slsqp"]
+    np.testing.assert_allclose(slsqp["w"], exact["w"], atol=1e-3)
+    assert slsqp["sharpe"] <= exact["sharpe"] * (1 + 1e-9)
+    assert slsqp["sharpe"] == pytest.approx(exact["sharpe"], rel=1e-5)
+
+
+def test_factor_model_solvers_agree(returns):
+    model = FactorRiskModel.from_returns(returns.to_numpy(), n_factors=3)
+    mu = returns.mean().to_numpy()
+    exact = solve_max_sharpe(model, mu, 0.0, 0.0, 0.3, method="active-set")
+    convex = solve_max_sharpe(model, mu, 0.0, 0.0, 0.3, method="convex")
+    np.testing.assert_allclose(convex["w"], exact["w"], atol=1e-6)
+
+
+def test_warm_start_gives_same_portfolio(moments):
+    cov, mu = moments
+    cold = solve_max_sharpe(cov, mu, 0.0, 0.0, 0.3)
+    warm = solve_max_sharpe(cov, mu * 1.01, 0.0, 0.0, 0.3, warm_start=cold)
+    reference = solve_max_sharpe(cov, mu * 1.01, 0.0, 0.0, 0.3)
+    np.testing.assert_allclose(warm["w"], reference["w"], atol=1e-10)
+
+
+def test_falls_back_to_slsqp_without_excess_return(moments):
+    cov, mu = moments
+    result = solve_max_sharpe(cov, mu, mu.max() + 1e-3, 0.0, 0.3)
+    assert result["solver"] == "slsqp" and "fallback" in result
+
+
+def test_invalid_solver(moments):
+    cov, mu = moments
+    with pytest.raises(ValueError):
+        solve_max_sharpe(cov, mu, 0.0, 0.0, 0.3, method="newton")
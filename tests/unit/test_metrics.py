@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils import metrics as metrics_module
+from utils.metrics import Metrics
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = iter([10.0, 10.5, 20.0, 22.0, 30.0, 30.25])
+    monkeypatch.setattr(metrics_module.time, "perf_counter", lambda: next(ticks))
+
+
+def test_counters_and_timers_accumulate(clock):
+    metrics = Metrics(enabled=True)
+    metrics.increment("cache_hits", kind="frontier")
+    metrics.increment("cache_hits", 2, kind="frontier")
+    metrics.increment("cache_hits", kind="covariance")
+    with metrics.timer("solve_seconds", solver="qp"):
+        pass
+    with metrics.timer("solve_seconds", solver="qp"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.timer("solve_seconds", solver="slsqp"):
+            raise RuntimeError("errore nel blocco")  # la durata viene registrata
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == {
+        "cache_hits": {'{kind="frontier"}': 3, '{kind="covariance"}': 1}
+    }
+    assert snapshot["summaries"]["solve_seconds"] == {
+        '{solver="qp"}': {"count": 2, "sum": 2.5, "max": 2.0},
+        '{solver="slsqp"}': {"count": 1, "sum": 0.25, "max": 0.25},
+    }
+
+
+def test_prometheus_text():
+    metrics = Metrics(enabled=True, prefix="test")
+    metrics.increment("requests", b=2, a=1)
+    metrics.increment("requests")
+    metrics.observe("latency_seconds", 0.5, step="fit")
+    metrics.observe("latency_seconds", 1.5, step="fit")
+    assert metrics.to_prometheus() == (
+        "# TYPE test_requests_total counter\n"
+        "test_requests_total 1\n"
+        'test_requests_total{a="1",b="2"} 1\n'
+        "# TYPE test_latency_seconds summary\n"
+        'test_latency_seconds_count{step="fit"} 2\n'
+        'test_latency_seconds_sum{step="fit"} 2\n'
+        "# TYPE test_latency_seconds_max gauge\n"
+        'test_latency_seconds_max{step="fit"} 1.5\n'
+    )
+    metrics.reset()
+    assert metrics.to_prometheus() == ""
+
+
+def test_disabled_default_records_nothing(monkeypatch):
+    metrics = Metrics()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("timer attivo con metriche disabilitate")
+
+    monkeypatch.setattr(metrics, "_timed", fail)
+    # Nessuna allocazione per chiamata: lo stesso context manager vuoto
+    assert metrics.timer("a") is metrics.timer("b", label=1)
+    with metrics.timer("a"):
+        metrics.increment("calls")
+        metrics.observe("size", 3.0)
+    assert metrics.snapshot() == {"counters": {}, "summaries": {}}
+    assert metrics.to_prometheus() == ""
+    assert not metrics_module.metrics.enabled
+
+    metrics.enable().increment("calls")
+    metrics.disable().increment("calls")
+    assert metrics.snapshot()["counters"] == {"calls": {"": 1}}
+
+
+def test_concurrent_updates_are_not_lost():
+    metrics = Metrics(enabled=True)
+
+    def work(_):
+        for _ in range(1000):
+            metrics.increment("calls")
+            metrics.observe("size", 1.0)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(8)))
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["calls"][""] == 8000
+    assert snapshot["summaries"]["size"][""]["count"] == 8000
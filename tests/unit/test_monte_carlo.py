@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from model.efficient_frontier.monte_carlo import (
+    SAMPLE_COLUMNS,
+    MonteCarloFrontier,
+    iter_samples,
+)
+from model.efficient_frontier.qp_solver import solve_min_variance
+
+
+@pytest.fixture
+def generator(returns):
+    mu = returns.mean().to_numpy()
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    return MonteCarloFrontier(mu, cov, 0.0, 0.3, chunk_size=5_000, buckets=50, seed=7)
+
+
+def test_envelope_is_pareto_efficient(generator):
+    envelope = generator.run(20_000)["envelope"]
+    returns = np.array([point["return"] for point in envelope])
+    volatilities = np.array([point["volatility"] for point in envelope])
+    assert len(envelope) > 1
+    assert np.all(np.diff(returns) > 0)
+    assert np.all(np.diff(volatilities) > 0)
+
+
+def test_envelope_lies_on_or_above_frontier(generator):
+    envelope = generator.run(20_000)["envelope"]
+    min_variance = solve_min_variance(generator.cov, generator.mu, None, 0.0, 0.3)
+    assert envelope[0]["return"] >= min_variance["w"] @ generator.mu - 1e-4
+    for point in envelope:
+        exact = solve_min_variance(
+            generator.cov, generator.mu, point["return"], 0.0, 0.3
+        )
+        assert point["volatility"] >= exact["fun"] - 1e-12
+        w = point["weights"]
+        assert w.sum() == pytest.approx(1.0)
+        assert w @ generator.mu == pytest.approx(point["return"])
+
+
+def test_samples_are_streamed_to_file(generator, tmp_path):
+    chunks = []
+    path = tmp_path / "samples.npy"
+    result = generator.run(12_000, output_path=path, callback=chunks.append)
+    assert [len(chunk["returns"]) for chunk in chunks] == [5_000, 5_000, 2_000]
+    samples = np.concatenate(list(iter_samples(path, chunk_size=4_000)))
+    assert samples.shape == (12_000, len(SAMPLE_COLUMNS))
+    np.testing.assert_array_equal(
+        samples[:, 0], np.concatenate([c["returns"] for c in chunks])
+    )
+    assert 0 < result["acceptance_rate"] <= 1
+
+
+def test_runs_are_reproducible_with_seed(generator):
+    first = generator.run(5_000)["envelope"]
+    second = generator.run(5_000)["envelope"]
+    np.testing.assert_array_equal(
+        [point["volatility"] for point in first],
+        [point["volatility"] for point in second],
+    )
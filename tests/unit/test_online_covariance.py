@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from sklearn.covariance import LedoitWolf
+from model.covariance.online import OnlineCovarianceEstimator
+
+
+def feed(estimator, values, sizes=(1, 7, 50, 3, 120)):
+    """Aggiorna lo stimatore con blocchi di dimensione variabile."""
+    start, step = 0, 0
+    while start < len(values):
+        size = sizes[step % len(sizes)]
+        estimator.update(values[start : start + size])
+        start += size
+        step += 1
+    return estimator
+
+
+@pytest.fixture
+def values(returns):
+    return returns.to_numpy()
+
+
+def test_expanding_matches_batch(values):
+    estimator = feed(OnlineCovarianceEstimator(values.shape[1], shrinkage=None), values)
+    np.testing.assert_allclose(
+        estimator.mean, values.mean(axis=0), rtol=1e-10, atol=1e-14
+    )
+    np.testing.assert_allclose(
+        estimator.covariance, np.cov(values, rowvar=False), rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize("window", [60, 250])
+def test_rolling_matches_batch_window(values, window):
+    estimator = OnlineCovarianceEstimator(
+        values.shape[1], mode="rolling", window=window, shrinkage=None
+    )
+    feed(estimator, values)
+    tail = values[-window:]
+    np.testing.assert_allclose(estimator.mean, tail.mean(axis=0), rtol=1e-9, atol=1e-14)
+    np.testing.assert_allclose(
+        estimator.covariance, np.cov(tail, rowvar=False), rtol=1e-8
+    )
+
+
+def test_ewm_matches_weighted_batch(values):
+    halflife = 40.0
+    estimator = OnlineCovarianceEstimator(
+        values.shape[1], mode="ewm", halflife=halflife, shrinkage=None
+    )
+    feed(estimator, values)
+    weights = 0.5 ** (np.arange(len(values))[::-1] / halflife)
+    np.testing.assert_allclose(
+        estimator.mean,
+        np.average(values, axis=0, weights=weights),
+        rtol=1e-9,
+        atol=1e-14,
+    )
+    np.testing.assert_allclose(
+        estimator.covariance, np.cov(values, rowvar=False, aweights=weights), rtol=1e-8
+    )
+
+
+def test_ledoit_wolf_matches_sklearn(values):
+    estimator = feed(OnlineCovarianceEstimator(values.shape[1]), values)
+    reference = LedoitWolf().fit(values)
+    assert estimator.shrinkage_intensity == pytest.approx(
+        reference.shrinkage_, rel=1e-8
+    )
+    np.testing.assert_allclose(estimator.covariance, reference.covariance_, rtol=1e-9)
+
+
+def test_rolling_ledoit_wolf_matches_sklearn_on_window(values):
+    estimator = OnlineCovarianceEstimator(values.shape[1], mode="rolling", window=100)
+    feed(estimator, values)
+    reference = LedoitWolf().fit(values[-100:])
+    np.testing.assert_allclose(estimator.covariance, reference.covariance_, rtol=1e-8)
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        OnlineCovarianceEstimator(3, mode="rolling")
+    with pytest.raises(ValueError):
+        OnlineCovarianceEstimator(3, mode="ewm")
+    with pytest.raises(ValueError):
+        OnlineCovarianceEstimator(3).update(np.zeros((2, 4)))
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from model.covariance.factor_model import FactorRiskModel
+from model.efficient_frontier.parallel import map_frontier, map_tasks, run_scenarios
+
+
+@pytest.fixture
+def problem(returns):
+    mu = returns.mean().to_numpy()
+    targets = np.linspace(mu.mean(), np.quantile(mu, 0.8), 8)
+    return np.cov(returns.to_numpy(), rowvar=False), mu, targets
+
+
+def assert_same_frontier(actual, expected):
+    assert len(actual) == len(expected)
+    for a, b in zip(actual, expected):
+        assert a["success"] == b["success"]
+        np.testing.assert_allclose(a["w"], b["w"], rtol=0, atol=1e-12)
+        assert a["fun"] == pytest.approx(b["fun"], rel=1e-12)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_map_frontier_matches_serial(problem, executor):
+    cov, mu, targets = problem
+    serial = map_frontier(cov, mu, targets, 0.0, 0.3)
+    assert all(result["success"] for result in serial)
+    parallel = map_frontier(cov, mu, targets, 0.0, 0.3, executor=executor, workers=2)
+    assert_same_frontier(parallel, serial)
+
+
+def test_map_frontier_factor_model_matches_serial(returns, problem):
+    _, mu, targets = problem
+    model = FactorRiskModel.from_returns(returns.to_numpy(), n_factors=3)
+    serial = map_frontier(model, mu, targets, 0.0, 0.3)
+    parallel = map_frontier(model, mu, targets, 0.0, 0.3, executor="process", workers=2)
+    assert_same_frontier(parallel, serial)
+
+
+def test_map_tasks_rejects_unknown_executor():
+    with pytest.raises(ValueError):
+        map_tasks("gpu", abs, [1, 2], None)
+
+
+def test_run_scenarios_process_matches_serial(returns):
+    configs = [
+        {
+            "covariance": {"method": method},
+            "optimization": {
+                "min_weight": 0.0,
+                "max_weight": 0.3,
+                "target_return": {"min": 0.0006, "max": 0.0012, "step": 4},
+                "risk_free_rate": 0.0,
+            },
+            "cache": {"enabled": False},
+        }
+        for method in ("empirical", "ledoit-wolf")
+    ]
+    serial = run_scenarios(returns, configs)
+    parallel = run_scenarios(returns, configs, executor="process", workers=2)
+    for a, b in zip(parallel, serial):
+        assert len(a["frontier"]) == len(b["frontier"]) == 4
+        for x, y in zip(a["frontier"], b["frontier"]):
+            np.testing.assert_allclose(x["weights"], y["weights"], atol=1e-12)
+        np.testing.assert_allclose(
+            a["max_sharpe"]["weights"], b["max_sharpe"]["weights"], atol=1e-12
+        )
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from model.covariance.factor_model import FactorRiskModel
+from model.performance.portfolio_analytics import (
+    batch_portfolio_statistics,
+    batch_returns,
+    batch_volatility,
+)
+
+RISK_FREE = 1e-4
+
+
+@pytest.fixture
+def weights(returns):
+    rng = np.random.default_rng(5)
+    weights = rng.dirichlet(np.ones(returns.shape[1]), size=7)
+    weights[0] = 0.0  # portafoglio nullo: volatilità 0, Sharpe NaN
+    return weights
+
+
+@pytest.mark.parametrize("representation", ["dense", "factor"])
+def test_batch_statistics_match_per_portfolio_formulas(
+    returns, weights, representation
+):
+    values = returns.to_numpy()
+    mu = values.mean(axis=0)
+    model = FactorRiskModel.from_returns(values, n_factors=3)
+    cov = np.cov(values, rowvar=False) if representation == "dense" else model
+    dense = cov if representation == "dense" else model.to_dense()
+
+    stats = batch_portfolio_statistics(weights, mu, cov, RISK_FREE)
+    np.testing.assert_allclose(batch_returns(weights, mu), stats["returns"])
+    np.testing.assert_allclose(batch_volatility(weights, cov), stats["volatility"])
+    for k, w in enumerate(weights):
+        volatility = np.sqrt(w @ dense @ w)
+        assert stats["returns"][k] == pytest.approx(w @ mu, rel=1e-12, abs=0)
+        assert stats["volatility"][k] == pytest.approx(volatility, rel=1e-12, abs=0)
+        if volatility > 0:
+            sharpe = (w @ mu - RISK_FREE) / volatility
+            assert stats["sharpe_ratio"][k] == pytest.approx(sharpe, rel=1e-10)
+            contributions = w * (dense @ w) / volatility
+            np.testing.assert_allclose(
+                stats["risk_contributions"][k], contributions, rtol=1e-10, atol=1e-16
+            )
+            assert contributions.sum() == pytest.approx(volatility, rel=1e-12)
+        else:
+            assert np.isnan(stats["sharpe_ratio"][k])
+            assert not stats["risk_contributions"][k].any()
+
+
+def test_single_portfolio_and_shape_errors(returns):
+    values = returns.to_numpy()
+    mu, cov = values.mean(axis=0), np.cov(values, rowvar=False)
+    w = np.full(mu.shape[0], 1.0 / mu.shape[0])
+    stats = batch_portfolio_statistics(w, mu, cov)
+    assert stats["volatility"].shape == (1,)
+    assert stats["volatility"][0] == pytest.approx(np.sqrt(w @ cov @ w))
+    with pytest.raises(ValueError, match="Matrice dei pesi non valida"):
+        batch_returns(w[:-1], mu)
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+from price_store import PriceStore
+
+FIELDS = ["Close", "Volume"]
+DATES = pd.bdate_range("2021-01-04", periods=12, name="Date")
+
+
+def long_frame(ticker, dates, offset):
+    values = np.arange(len(dates), dtype=float) + offset
+    return pd.DataFrame(
+        {"Date": dates, "Close": values, "Volume": values * 10, "Ticker": ticker}
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(tmp_path / "store")
+    store.write(
+        {
+            "T1": long_frame("T1", DATES[:10], 100.0),
+            "T0": long_frame("T0", DATES[2:10], 0.0),  # quotato in ritardo
+        },
+        ["Date", *FIELDS],
+    )
+    return store
+
+
+def test_read_slices_dates_and_tickers(store):
+    assert store.tickers == ["T0", "T1"] and store.fields == FIELDS
+    close = store.read("Close")
+    assert close.index.equals(DATES[:10]) and np.isnan(close["T0"].iloc[:2]).all()
+
+    # Estremi inclusi, anche se cadono in un fine settimana
+    window = store.read("Close", ["T1", "T0"], start="2021-01-09", end="2021-01-13")
+    assert list(window.columns) == ["T1", "T0"]
+    assert window.index.equals(DATES[5:8])
+    np.testing.assert_array_equal(window["T0"], [3.0, 4.0, 5.0])
+    with pytest.raises(KeyError):
+        store.read("Close", ["T9"])
+    with pytest.raises(KeyError):
+        store.read("Open")
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 100])
+def test_iter_chunks_match_read(store, chunk_rows):
+    options = {"tickers": ["T1", "T0"], "start": "2021-01-05", "end": "2021-01-14"}
+    chunks = list(store.iter_chunks("Volume", chunk_rows=chunk_rows, **options))
+    assert all(len(dates) <= chunk_rows for dates, _ in chunks)
+    assert all(values.flags.f_contiguous for _, values in chunks)
+    expected = store.read("Volume", **options)
+    np.testing.assert_array_equal(
+        np.concatenate([d for d, _ in chunks]), expected.index
+    )
+    np.testing.assert_array_equal(np.vstack([v for _, v in chunks]), expected)
+    with pytest.raises(ValueError):
+        next(store.iter_chunks(chunk_rows=0))
+
+
+def test_update_merges_rows_and_tickers(store):
+    store.update(
+        {
+            "T1": long_frame("T1", DATES[8:], 500.0),  # sovrapposto: prevale il nuovo
+            "T2": long_frame("T2", DATES[10:], 900.0),
+        }
+    )
+    close = store.read("Close")
+    assert list(close.columns) == ["T0", "T1", "T2"] and close.index.equals(DATES)
+    np.testing.assert_array_equal(close["T1"].iloc[:8], np.arange(8) + 100.0)
+    np.testing.assert_array_equal(close["T1"].iloc[8:], np.arange(4) + 500.0)
+    np.testing.assert_array_equal(close["T0"].iloc[2:10], np.arange(8.0))
+    assert np.isnan(close["T0"].iloc[10:]).all()
+    assert np.isnan(close["T2"].iloc[:10]).all()
+    assert store.read("Volume")["T2"].iloc[-1] == 9010.0
+
+
+def test_update_creates_a_missing_store(tmp_path):
+    store = PriceStore(tmp_path / "new")
+    store.update({"T0": long_frame("T0", DATES, 0.0)})
+    assert store.fields == FIELDS
+    np.testing.assert_array_equal(store.read("Close")["T0"], np.arange(12.0))
+
+
+def test_append_grows_the_npy_header_in_place(store):
+    path = store.root / "Close.npy"
+    offset = path.stat().st_size - store.array("Close").nbytes
+    with open(path, "ab") as f:
+        f.write(b"\0" * 5)  # coda di una scrittura interrotta
+    expected = store.read("Close").to_numpy()
+
+    for n_rows in (2, 100_000):
+        dates = pd.date_range(store.dates[-1], periods=n_rows + 1, freq="min")[1:]
+        values = np.arange(2 * n_rows, dtype=float).reshape(n_rows, 2)
+        store.append(dates, {"Close": values, "Volume": -values})
+        expected = np.vstack([expected, values])
+
+    assert store.manifest["n_dates"] == len(expected) == 100_012
+    np.testing.assert_array_equal(np.load(path), expected)
+    assert path.stat().st_size - expected.nbytes == offset
+    assert store.dates.is_monotonic_increasing and len(store.dates) == len(expected)
+    np.testing.assert_array_equal(store.read("Volume").iloc[-1], -expected[-1])
+
+
+def test_append_rejects_invalid_rows(store):
+    last = store.dates[-1]
+    with pytest.raises(ValueError, match="crescenti"):
+        store.append([last], {"Close": np.zeros((1, 2)), "Volume": np.zeros((1, 2))})
+    later = [last + pd.Timedelta(days=1)]
+    with pytest.raises(ValueError, match="campi"):
+        store.append(later, {"Close": np.zeros((1, 2))})
+    with pytest.raises(ValueError, match="Forma"):
+        store.append(later, {"Close": np.zeros((1, 3)), "Volume": np.zeros((1, 3))})
+    assert len(PriceStore(store.root).dates) == 10
+
+
+@pytest.mark.parametrize("format", ["csv", "parquet"])
+def test_from_files(tmp_path, format):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    frames = {"T0": long_frame("T0", DATES, 0.0), "T1": long_frame("T1", DATES, 50.0)}
+    for ticker, frame in frames.items():
+        if format == "parquet":
+            frame.to_parquet(raw / f"{ticker}.parquet", index=False)
+        else:
+            frame.to_csv(raw / f"{ticker}.csv", index=False)
+
+    store = PriceStore.from_files(tmp_path / "store", raw, ["T0", "T1", "T9"], format)
+    assert store.tickers == ["T0", "T1"] and store.fields == FIELDS
+    np.testing.assert_array_equal(store.read("Close")["T1"], np.arange(12.0) + 50.0)
+    with pytest.raises(ValueError, match="Nessun file"):
+        PriceStore.from_files(tmp_path / "empty", raw, ["T9"], format)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+from model.efficient_frontier.markowitz_optimizer import OptimizationConfig
+from model.efficient_frontier.qp_solver import solve_frontier, solve_min_variance
+from scipy.optimize import minimize
+
+
+def frontier_targets(mu, count=5):
+    return np.linspace(np.quantile(mu, 0.5), np.quantile(mu, 0.8), count)
+
+
+def test_default_solver_is_active_set():
+    assert OptimizationConfig().solver == "active-set"
+
+
+def reference_weights(cov, mu, target, lower, upper):
+    """SLSQP sulla varianza con tolleranza stretta, come riferimento indipendente."""
+    n = mu.shape[0]
+    cov = (
+        cov / np.trace(cov) * n
+    )  # varianze di ordine 1: ftol altrimenti è troppo lasco
+    result = minimize(
+        lambda w: w @ cov @ w,
+        np.full(n, 1.0 / n),
+        jac=lambda w: 2.0 * cov @ w,
+        method="SLSQP",
+        bounds=[(lower, upper)] * n,
+        constraints=[
+            {"type": "eq", "fun": lambda w: w.sum() - 1.0},
+            {"type": "eq", "fun": lambda w: w @ mu - target},
+        ],
+        options={"ftol": 1e-15, "maxiter": 1000},
+    )
+    assert result.success
+    return result.x
+
+
+def test_active_set_matches_slsqp_reference(returns):
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    mu = returns.mean().to_numpy()
+    for target in frontier_targets(mu):
+        result = solve_min_variance(cov, mu, target, 0.0, 0.3)
+        assert result["success"]
+        expected = reference_weights(cov, mu, target, 0.0, 0.3)
+        np.testing.assert_allclose(result["w"], expected, atol=1e-5)
+
+
+def test_optimizer_solvers_agree(returns, make_optimizer):
+    active = make_optimizer(returns, solver="active-set")
+    slsqp = make_optimizer(returns, solver="slsqp")
+    for target in frontier_targets(active._mu):
+        exact = active._optimize(target)
+        approximate = slsqp._optimize(target)
+        assert exact["success"] and approximate["success"]
+        # SLSQP con le tolleranze di default arriva vicino all'ottimo
+        # ma non sui pesi esatti
+        assert exact["fun"] <= approximate["fun"] * (1 + 1e-6)
+        assert exact["fun"] == pytest.approx(approximate["fun"], rel=1e-2)
+
+
+def test_active_set_respects_constraints(returns):
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    mu = returns.mean().to_numpy()
+    target = frontier_targets(mu)[0]
+    result = solve_min_variance(cov, mu, target, 0.02, 0.25)
+    w = result["w"]
+    assert result["success"]
+    assert w.sum() == pytest.approx(1.0)
+    assert w @ mu == pytest.approx(target)
+    assert w.min() >= 0.02 - 1e-12 and w.max() <= 0.25 + 1e-12
+
+
+def test_slsqp_is_deterministic(returns, make_optimizer):
+    optimizer = make_optimizer(returns, solver="slsqp")
+    target = frontier_targets(optimizer._mu)[2]
+    first = optimizer._optimize(target)["w"]
+    np.testing.assert_array_equal(first, optimizer._optimize(target)["w"])
+
+
+def test_frontier_warm_start_matches_cold_solves(returns):
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    mu = returns.mean().to_numpy()
+    targets = np.linspace(mu.mean(), np.quantile(mu, 0.8), 15)
+    frontier = solve_frontier(cov, mu, targets, 0.0, 0.3)
+    assert all(result["success"] for result in frontier)
+    assert any(result["warm_start"] for result in frontier[1:])
+    for target, result in zip(targets, frontier):
+        cold = solve_min_variance(cov, mu, target, 0.0, 0.3)
+        np.testing.assert_allclose(result["w"], cold["w"], atol=1e-8)
+    warm_iterations = sum(result["iterations"] for result in frontier[1:])
+    cold_iterations = sum(
+        solve_min_variance(cov, mu, target, 0.0, 0.3)["iterations"]
+        for target in targets[1:]
+    )
+    assert warm_iterations < cold_iterations
+
+
+def test_frontier_with_infeasible_first_target(returns):
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    mu = returns.mean().to_numpy()
+    frontier = solve_frontier(cov, mu, [-1.0, mu.mean()], 0, 1)
+    assert not frontier[0]["success"] and frontier[0]["status"] == "infeasible"
+    assert frontier[1]["success"]
+    expected = solve_min_variance(cov, mu, mu.mean(), 0, 1)["w"]
+    np.testing.assert_allclose(frontier[1]["w"], expected, atol=1e-8)
+
+
+def test_infeasible_cold_start_returns_full_result(returns):
+    cov = np.cov(returns.to_numpy(), rowvar=False)
+    mu = returns.mean().to_numpy()
+    result = solve_min_variance(cov, mu, 1.0, 0.0, 0.3)
+    assert result["status"] == "infeasible"
+    assert {"factor", "at_lower", "at_upper"} <= result.keys()
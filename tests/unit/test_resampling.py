@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from model.covariance.estimators import estimate_covariance
+from model.efficient_frontier import resampling
+from model.efficient_frontier.markowitz_optimizer import CovarianceConfig
+from model.efficient_frontier.qp_solver import solve_min_variance
+from model.efficient_frontier.resampling import frontier_weights, resampled_frontier
+
+CONFIG = CovarianceConfig(method="empirical")
+
+
+@pytest.fixture
+def values(returns):
+    return returns.to_numpy()
+
+
+def test_process_executor_matches_serial(values):
+    options = {"n_points": 6, "n_resamples": 8, "seed": 11}
+    serial = resampled_frontier(values, CONFIG, 0.0, 0.3, **options)
+    parallel = resampled_frontier(
+        values, CONFIG, 0.0, 0.3, executor="process", workers=2, **options
+    )
+    for a, b in zip(parallel["frontier"], serial["frontier"]):
+        np.testing.assert_array_equal(a["weights"], b["weights"])
+    np.testing.assert_array_equal(parallel["weights_std"], serial["weights_std"])
+
+    again = resampled_frontier(values, CONFIG, 0.0, 0.3, **options)
+    for a, b in zip(again["frontier"], serial["frontier"]):
+        np.testing.assert_array_equal(a["weights"], b["weights"])
+
+
+@pytest.mark.parametrize("lower, upper", [(0.0, 0.3), (0.02, 0.25), (0.0, 2 / 12)])
+def test_averaged_weights_are_feasible(values, lower, upper):
+    result = resampled_frontier(
+        values, CONFIG, lower, upper, n_points=8, n_resamples=20, seed=3
+    )
+    weights = np.array([point["weights"] for point in result["frontier"]])
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, atol=1e-12)
+    assert weights.min() >= lower - 1e-12 and weights.max() <= upper + 1e-12
+    assert result["weights_std"].max() > 0
+
+
+def test_single_replicate_on_the_full_sample_is_the_frontier(values, monkeypatch):
+    # Replica degenere: il bootstrap restituisce la storia completa
+    monkeypatch.setattr(resampling, "_bootstrap", lambda returns, seed: returns)
+    result = resampled_frontier(values, CONFIG, 0.0, 0.3, n_points=6, n_resamples=1)
+    assert np.all(result["weights_std"] == 0)
+
+    mu, cov = values.mean(axis=0), estimate_covariance(values, CONFIG)
+    expected = frontier_weights(mu, cov, 0.0, 0.3, 6)
+    for point, w in zip(result["frontier"], expected):
+        np.testing.assert_array_equal(point["weights"], w)
+        reference = solve_min_variance(cov, mu, point["return"], 0.0, 0.3)
+        assert reference["success"]
+        np.testing.assert_allclose(point["weights"], reference["w"], atol=1e-8)
+        assert point["volatility"] == pytest.approx(reference["fun"], rel=1e-8)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cleaning_plan import CleaningPlan
+from price_store import PriceStore
+from streaming import RunningMoments, stream_clean
+
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(2)
+    values = 100 + rng.standard_t(5, (3_000, 6))
+    values[rng.integers(0, 3_000, 150), rng.integers(0, 6, 150)] = np.nan
+    values[:25, 3] = np.nan
+    dates = pd.date_range("2022-01-03", periods=3_000, freq="min")
+    store = PriceStore(tmp_path / "store")
+    store.write_arrays(dates.to_numpy(), [f"T{i}" for i in range(6)], {"Close": values})
+    return store
+
+
+def reference(prices, threshold):
+    cleaned = prices.ffill().dropna()
+    z_scores = (cleaned - cleaned.mean()) / cleaned.std()
+    return cleaned[(z_scores.abs() < threshold).all(axis=1)]
+
+
+def test_running_moments_match_numpy():
+    values = np.random.default_rng(3).normal(size=(1_000, 4))
+    moments = RunningMoments(4)
+    for start in range(0, 1_000, 137):
+        moments.update(values[start : start + 137])
+    np.testing.assert_allclose(moments.mean, values.mean(axis=0), atol=1e-15)
+    np.testing.assert_allclose(moments.std, values.std(axis=0, ddof=1), rtol=1e-12)
+
+
+@pytest.mark.parametrize("chunk_rows", [97, 1_000, 10_000])
+@pytest.mark.parametrize("log_returns", [False, True])
+def test_stream_clean_matches_pandas(store, tmp_path, chunk_rows, log_returns):
+    prices_path, returns_path = (
+        tmp_path / "prices.parquet",
+        tmp_path / "returns.parquet",
+    )
+    report = stream_clean(
+        store,
+        prices_path,
+        returns_path,
+        chunk_rows=chunk_rows,
+        outlier_threshold=3.0,
+        log_returns=log_returns,
+    )
+    expected = reference(store.read("Close"), 3.0)
+    prices = pd.read_parquet(prices_path)
+    np.testing.assert_array_equal(prices.index, expected.index)
+    np.testing.assert_array_equal(prices.to_numpy(), expected.to_numpy())
+
+    returns = pd.read_parquet(returns_path)
+    ratio = expected / expected.shift()
+    expected_returns = (np.log(ratio) if log_returns else ratio - 1.0).iloc[1:]
+    np.testing.assert_array_equal(returns.index, expected_returns.index)
+    np.testing.assert_allclose(
+        returns.to_numpy(), expected_returns.to_numpy(), rtol=1e-12
+    )
+
+    assert report["chunks"] == -(-3_000 // chunk_rows)
+    assert report["rows_out"] == len(expected)
+    assert report["returns_rows"] == len(expected) - 1
+    assert report["valid"]
+
+
+def test_stream_clean_report_matches_plan(store):
+    prices = store.read("Close")
+    plan = CleaningPlan(prices).fill().remove_outliers(3.0).validate().run()["report"]
+    report = stream_clean(store, chunk_rows=500, outlier_threshold=3.0)
+    for key in (
+        "rows_in",
+        "rows_out",
+        "incomplete_rows",
+        "outlier_rows",
+        "missing_values",
+        "checks",
+        "valid",
+    ):
+        assert report[key] == plan[key]